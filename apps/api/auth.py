@@ -1,4 +1,5 @@
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
 from django.contrib.auth.models import User
 from django.http import HttpRequest
 from ninja.security import HttpBearer
@@ -20,6 +21,21 @@ class JWTAuthHandler:
                 message="유효하지 않은 토큰입니다. 다시 로그인 해주세요."
             )
 
+    async def aauthenticate(self, request: HttpRequest, token: str) -> User | None:
+        """authenticate의 비동기 버전입니다. 사용자 조회를 비동기 ORM으로 합니다."""
+        try:
+            validated_token = self.jwt_auth.get_validated_token(token.encode())
+            user = await User.objects.aget(**{api_settings.USER_ID_FIELD: validated_token[api_settings.USER_ID_CLAIM]})
+            if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+                raise PermissionError("비활성화된 사용자입니다.")
+            request.user = user
+            return user
+        except Exception:
+            raise HttpError(
+                status_code=401, 
+                message="유효하지 않은 토큰입니다. 다시 로그인 해주세요."
+            )
+
     def get_user_info(self, token: str) -> dict | None:
         try:
             validated_token = self.jwt_auth.get_validated_token(token.encode())
@@ -36,4 +52,16 @@ class JWTAuthHandler:
 
 class JWTAuth(HttpBearer):
     def authenticate(self, request: HttpRequest, token: str):
-        return JWTAuthHandler().authenticate(request, token)
\ No newline at end of file
+        return JWTAuthHandler().authenticate(request, token)
+
+
+class AsyncJWTAuth(HttpBearer):
+    """
+    비동기 API용 JWTAuth입니다.
+
+    동기 authenticate는 ninja가 sync_to_async로 감싸 호출하므로, 비동기 API에는 이 클래스를 씁니다.
+    동기 API에 쓰면 요청마다 async_to_sync로 이벤트 루프를 만들게 되므로 JWTAuth를 씁니다.
+    """
+
+    async def authenticate(self, request: HttpRequest, token: str):
+        return await JWTAuthHandler().aauthenticate(request, token)
@@ -0,0 +1,29 @@
+from django.http import HttpRequest, HttpResponseNotModified
+from django.utils.http import parse_etags
+
+
+def etag_matches(request: HttpRequest, etag: str) -> bool:
+    """If-None-Match 헤더에 etag가 있는지 약한 비교(W/ 무시)로 확인합니다."""
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    target = etag.removeprefix("W/")
+    return any(tag.removeprefix("W/") == target for tag in parse_etags(header))
+
+
+def not_modified(etag: str) -> HttpResponseNotModified:
+    """본문 없이 304와 검증자만 반환합니다."""
+    return with_etag(HttpResponseNotModified(), etag)
+
+
+def with_etag(response, etag: str):
+    """
+    응답에 ETag를 붙입니다.
+
+    사용자별 응답이므로 공유 캐시에는 저장하지 않고, 클라이언트는 매번 재검증하도록 합니다.
+    """
+    response["ETag"] = etag
+    response["Cache-Control"] = "private, no-cache"
+    return response
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import AIDailySummary
+from .models import AIDailySummary, AISummaryJob
 
 # Register your models here.
 @admin.register(AIDailySummary)
@@ -7,4 +7,12 @@ class AIDailySummaryAdmin(admin.ModelAdmin):
     list_display = ('user', 'date', 'created_at')
     list_filter = ('date', 'user')
     search_fields = ('user__username', 'message')
-    ordering = ('-date',)
\ No newline at end of file
+    ordering = ('-date',)
+
+
+@admin.register(AISummaryJob)
+class AISummaryJobAdmin(admin.ModelAdmin):
+    list_display = ('user', 'date', 'status', 'attempts', 'next_attempt_at', 'updated_at')
+    list_filter = ('status',)
+    search_fields = ('user__username', 'last_error')
+    ordering = ('-updated_at',)
@@ -1,12 +1,16 @@
 from typing import Optional
 import datetime
+from asgiref.sync import sync_to_async
 from ninja import Router, Query
 from ninja.errors import HttpError
 from ninja.responses import Response
+from django.conf import settings
 from django.http import HttpRequest
+from django.urls import reverse
 from django.utils import timezone
+from django.utils.http import quote_etag
 
-from .models import AIDailySummary
+from .models import AIDailySummary, AISummaryJob
 from apps.api.schema import (
     ResponseSchema,
     BadRequestSchema,
@@ -14,9 +18,17 @@ from apps.api.schema import (
     ForbiddenSchema,
     NotFoundSchema
 )
-from .schema import AISummary
-from .services.gemini_service import generate_summary
-from apps.api.auth import JWTAuth
+from .schema import AISummary, AISummaryJobSchema
+from .services.gemini_service import SummaryParseError
+from .services.generation import NoUsageError, SummaryPendingError, aget_or_generate_summary
+from .services.jobs import enqueue_summary_job
+from .services.llm_backends import LLMUnavailableError, get_backend
+from .services.prompt_compaction import compaction_stats
+from .services.summary_cache import summary_cache
+from apps.api.auth import AsyncJWTAuth, JWTAuth
+from apps.api.conditional import etag_matches, not_modified, with_etag
+from apps.usage.models import UsageRecord
+from apps.usage.services.intervals import auser_timezone, local_today
 
 
 router = Router(tags=["AI 요약"], auth=JWTAuth())
@@ -25,17 +37,31 @@ router = Router(tags=["AI 요약"], auth=JWTAuth())
 @router.get(
     path="",
     summary="AI 요약 API",
+    auth=AsyncJWTAuth(),
     description="""
 선택한 날짜의 요약이 있으면 제공, 없으면 생성 후 제공합니다.
-- 날짜를 지정하지 않으면 오늘 날짜의 요약을 제공합니다.
+- 날짜를 지정하지 않으면 오늘 날짜(사용자 프로필 시간대 기준)의 요약을 제공합니다.
 - 날짜 형식은 `YYYY-MM-DD`입니다.
+- 응답의 ETag를 다음 요청의 If-None-Match 헤더로 보내면, 요약이 그대로인 경우 본문 없이 304를 반환합니다.
+- 같은 날짜의 요약을 다른 요청이 생성 중이면 그 결과를 기다렸다가 제공합니다.
+    - `SUMMARY_SINGLE_FLIGHT_TIMEOUT`초 안에 생성이 끝나지 않으면 503과 Retry-After 헤더를 반환합니다.
+- LLM이 응답하지 않거나(시간 초과, 재시도 후에도 오류) 장애로 회로 차단기가 열려 있으면 503과 Retry-After 헤더를 반환합니다.
+- LLM 응답에서 요약(summary, feedback)을 꺼내지 못하면 502를 반환합니다.
+- 서버가 비동기 모드(`SUMMARY_ASYNC`)로 동작하면 요약이 없을 때 생성 작업을 등록하고 202를 반환합니다.
+    - 결과값의 status_url(`/summary/jobs/{job_id}`)을 조회해서 작업 상태를 확인합니다.
+    - 같은 날짜를 다시 요청하면 새 작업을 만들지 않고 기존 작업을 반환합니다.
+    - 작업이 완료되면 이 API를 다시 호출해 요약을 받습니다.
     """,
     response={
         200: ResponseSchema[AISummary],
+        202: ResponseSchema[AISummaryJobSchema],
         401: UnauthorizedSchema,
+        404: NotFoundSchema,
+        502: ResponseSchema[None],
+        503: ResponseSchema[None],
     },
 )
-def get_or_generate_ai_summary(
+async def get_or_generate_ai_summary(
     request: HttpRequest,
     date: Optional[datetime.date] = Query(
         None, 
@@ -47,25 +73,114 @@ def get_or_generate_ai_summary(
     if not user.is_authenticated:
         raise HttpError(401, message="로그인이 필요합니다.")
 
-    target_date = date or timezone.now().date()
+    target_date = date or local_today(await auser_timezone(user.id))
 
-    summary = AIDailySummary.objects.filter(user=user, date=target_date).first()
+    summary = await AIDailySummary.objects.filter(user=user, date=target_date).afirst()
+    if summary and etag_matches(request, summary_etag(summary)):
+        return not_modified(summary_etag(summary))
 
-    if not summary:
-        success, generated = generate_summary(user, target_date)
-        if not success:
-            raise HttpError(404, message=generated)
-
-        summary = AIDailySummary.objects.create(
-            user=user,
-            date=target_date,
-            message=generated
+    if not summary and settings.SUMMARY_ASYNC:
+        if not await UsageRecord.objects.overlapping(user, target_date).aexists():
+            raise HttpError(404, message=f"{target_date}에는 사용 기록이 없습니다.")
+        job, created = await sync_to_async(enqueue_summary_job)(user, target_date)
+        return Response(
+            {
+                "message": "요약 생성 작업을 등록했습니다." if created else "요약을 생성하고 있습니다.",
+                "data": await sync_to_async(summary_job_data)(job),
+            },
+            status=202,
         )
-        # summary.save()
 
-    return Response(
+    if not summary:
+        # 같은 (사용자, 날짜)를 동시에 요청하면 한 요청만 Gemini를 호출하고 나머지는 그 결과를 기다립니다.
+        # 인증, DB, Gemini 호출이 모두 비동기라서, 생성 중인 요청이 많아도 Django가 요청마다 두는 스레드 외에 스레드가 늘지 않습니다.
+        try:
+            summary = await aget_or_generate_summary(user, target_date)
+        except NoUsageError as e:
+            raise HttpError(404, message=str(e))
+        except SummaryPendingError as e:
+            response = Response({"message": f"{e} 잠시 후 다시 시도해주세요.", "data": None}, status=503)
+            response["Retry-After"] = "5"
+            return response
+        except LLMUnavailableError as e:
+            response = Response({"message": f"{e} 잠시 후 다시 시도해주세요.", "data": None}, status=503)
+            response["Retry-After"] = str(e.retry_after)
+            return response
+        except SummaryParseError:
+            return Response({"message": "요약 응답을 해석하지 못했습니다. 잠시 후 다시 시도해주세요.", "data": None}, status=502)
+
+    response = Response(
         ResponseSchema[str](
             message=f"{target_date} 요약 제공",
             data=summary.message,
         )
     )
+    return with_etag(response, summary_etag(summary))
+
+
+def summary_etag(summary: AIDailySummary) -> str:
+    """요약은 생성된 뒤 바뀌지 않으므로 행 id와 생성 시각으로 검증합니다."""
+    return quote_etag(f"s{summary.id}-{int(summary.created_at.timestamp() * 1000)}")
+
+
+def summary_job_data(job: AISummaryJob) -> dict:
+    return {
+        "id": job.id,
+        "date": job.date,
+        "status": job.status,
+        "attempts": job.attempts,
+        "last_error": job.last_error or None,
+        "next_attempt_at": job.next_attempt_at if job.status == AISummaryJob.Status.PENDING else None,
+        "status_url": reverse("api-1.0.0:summary_job", kwargs={"job_id": job.id}),
+        "summary": job.summary.message if job.summary else None,
+    }
+
+
+@router.get(
+    path="/jobs/{job_id}",
+    url_name="summary_job",
+    summary="AI 요약 생성 작업 조회 API",
+    description="""
+비동기 모드에서 등록된 요약 생성 작업의 상태를 조회합니다.
+- status는 pending(대기) / running(생성 중) / done(완료) / failed(실패) 중 하나입니다.
+- 완료되면 summary에 요약이 담깁니다.
+- 실패해서 다시 시도할 예정이면 pending 상태로 last_error와 next_attempt_at(다음 시도 시각)이 제공됩니다.
+    """,
+    response={
+        200: ResponseSchema[AISummaryJobSchema],
+        401: UnauthorizedSchema,
+        404: NotFoundSchema,
+    },
+)
+def get_summary_job(request: HttpRequest, job_id: int) -> Response:
+    job = AISummaryJob.objects.filter(id=job_id, user=request.user).select_related("summary").first()
+    if job is None:
+        raise HttpError(404, message="요약 작업을 찾을 수 없습니다.")
+    return Response(ResponseSchema[AISummaryJobSchema](message="요약 작업 조회 성공", data=summary_job_data(job)))
+
+
+@router.get(
+    path="/metrics",
+    summary="AI 요약 내부 지표 조회 API",
+    description="""
+AI 요약 생성 경로의 내부 지표를 조회합니다.
+- 관리자(staff) 계정만 조회할 수 있습니다.
+- cache: Gemini 응답 캐시의 hit/miss/저장 횟수와 적중률 (프로세스별 집계)
+- llm: 사용 중인 LLM 백엔드, 호출 수와 시도 결과별 횟수(success/timeout/error/retry/rejected), 입출력 토큰 수, 회로 차단기 상태 (프로세스별 집계)
+- prompt: 프롬프트 압축 전후의 입력 토큰 수(어림값)와 절감 비율, 토큰 예산 때문에 앱을 뺀 횟수
+    """,
+    response={
+        200: ResponseSchema[dict],
+        401: UnauthorizedSchema,
+        403: ForbiddenSchema,
+    },
+)
+def get_summary_metrics(request: HttpRequest) -> Response:
+    if not request.user.is_staff:
+        raise HttpError(403, message="관리자만 조회할 수 있습니다.")
+    metrics = {
+        "cache": summary_cache.stats(),
+        "llm": get_backend().stats(),
+        "prompt": compaction_stats.stats(),
+    }
+    return Response(ResponseSchema[dict](message="지표 조회 성공", data=metrics))
@@ -0,0 +1,243 @@
+import asyncio
+import datetime
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.summary.services.fake_gemini import FakeGeminiServer
+from apps.summary.services.gemini_service import arequest_summary, request_summary
+from apps.summary.services.llm_backends import FakeBackend, GeminiBackend, get_backend
+from apps.usage.models import AppInfo, UsageRecord
+from apps.usage.services.intervals import user_timezone
+
+
+class ThreadSampler:
+    """실행 중 프로세스의 최대 스레드 수를 기록합니다."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.peak = threading.active_count()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, threading.active_count())
+
+
+class Command(BaseCommand):
+    help = (
+        "요약 요청 N개를 동시에 보내 동기 호출(스레드 풀)과 비동기 호출의 소요 시간과 스레드 사용량을 비교합니다. "
+        "--backend server는 로컬 가짜 Gemini 서버에 실제 Gemini 클라이언트로, fake는 FakeBackend로 요청합니다. 네트워크/API 키가 필요 없습니다. "
+        "--mode endpoint는 ASGI 앱으로 GET /api/summary를 보내(인증, DB, 생성 경로 전체) 최대 스레드 수를 확인하고, "
+        "요청 수 + --max-extra-threads를 넘으면 실패합니다. 임시 사용자와 사용 기록을 만들고 끝나면 지웁니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=300, help="동시에 보낼 요약 요청 수")
+        parser.add_argument("--backend", choices=["server", "fake"], default="server")
+        parser.add_argument("--latency", type=float, default=1.0, help="가짜 서버/백엔드의 응답 지연(초)")
+        parser.add_argument("--error-rate", type=float, default=0.0, help="가짜 서버(503 응답)/백엔드의 오류 비율")
+        parser.add_argument("--sync-threads", type=int, default=40, help="동기 호출에 쓸 스레드 수 (sync_to_async 실행기 크기에 해당)")
+        parser.add_argument("--mode", choices=["both", "async", "sync", "endpoint"], default="both")
+        parser.add_argument(
+            "--ramp-up", type=float, default=0.0,
+            help="endpoint 모드에서 요청 시작을 이 시간(초)에 걸쳐 고르게 나눕니다. 지연보다 짧으면 모든 요청이 함께 응답을 기다립니다.",
+        )
+        parser.add_argument(
+            "--max-extra-threads", type=int, default=5,
+            help="endpoint 모드에서 시작 시 스레드 수 + 요청 수 외에 허용할 스레드 수",
+        )
+
+    def handle(self, *args, **options):
+        n = options["requests"]
+        if n < 1 or options["sync_threads"] < 1:
+            raise CommandError("--requests와 --sync-threads는 1 이상이어야 합니다.")
+
+        if options["backend"] == "fake":
+            backend = FakeBackend(latency=options["latency"], error_rate=options["error_rate"], seed=0)
+            self.stdout.write(
+                f"가짜 LLM 백엔드 (지연 {options['latency']:g}초, 오류 비율 {options['error_rate']:g}), 요청 {n}개"
+            )
+            self._compare(backend, None, n, options)
+        else:
+            with FakeGeminiServer(latency=options["latency"], error_rate=options["error_rate"], seed=0) as server:
+                self.stdout.write(
+                    f"가짜 Gemini 서버 {server.base_url} (지연 {options['latency']:g}초, 오류 비율 {options['error_rate']:g}), "
+                    f"요청 {n}개"
+                )
+                self._compare(GeminiBackend(base_url=server.base_url), server, n, options)
+
+    def _compare(self, backend, server, n: int, options):
+        if options["mode"] == "endpoint":
+            self._run_endpoint(server, n, options)
+            return
+        if options["mode"] in ("both", "async"):
+            self._report("async", server, *self._run_async(backend, self._texts("async", n)))
+        if options["mode"] in ("both", "sync"):
+            self._report("sync", server, *self._run_sync(backend, self._texts("sync", n), options["sync_threads"]))
+        stats = backend.stats()
+        outcomes = ", ".join(f"{name} {count}" for name, count in stats["outcomes"].items())
+        self.stdout.write(
+            f"{stats['backend']}: 호출 {stats['calls']}건 ({outcomes}), "
+            f"입력 토큰 {stats['input_tokens']}, 출력 토큰 {stats['output_tokens']}, "
+            f"회로 차단기 {stats['breaker']['state']} (열린 횟수 {stats['breaker']['opened']})"
+        )
+
+    @staticmethod
+    def _texts(prefix: str, n: int) -> list[str]:
+        # 입력이 모두 달라야 응답 캐시에 걸리지 않고 매번 서버로 요청합니다.
+        return [f"{prefix} 부하 테스트 앱{i} - {i % 120 + 1}분" for i in range(n)]
+
+    @staticmethod
+    def _run_async(backend, texts):
+        async def main():
+            return await asyncio.gather(*(arequest_summary(text, backend) for text in texts), return_exceptions=True)
+
+        with ThreadSampler() as sampler:
+            started = time.perf_counter()
+            results = asyncio.run(main())
+            elapsed = time.perf_counter() - started
+        return results, elapsed, sampler.peak
+
+    @staticmethod
+    def _run_sync(backend, texts, threads: int):
+        def call(text):
+            try:
+                return request_summary(text, backend)
+            except Exception as e:
+                return e
+
+        with ThreadSampler() as sampler:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                results = list(pool.map(call, texts))
+            elapsed = time.perf_counter() - started
+        return results, elapsed, sampler.peak
+
+    def _run_endpoint(self, server, n: int, options):
+        """
+        요약이 없는 날짜 n개를 동시에 요청합니다. 모든 요청이 LLM 응답을 기다리는 동안의 스레드 수를 잽니다.
+
+        Django ASGI 핸들러는 요청마다 스레드 하나(ThreadSensitiveContext 실행기)를 두고 동기 미들웨어와 비동기 ORM을 거기서 실행합니다.
+        그래서 요청당 한 개까지는 허용하고, 인증이나 DB, LLM 호출이 그 밖에 스레드를 더 쓰면 실패로 봅니다.
+        """
+        if server is None:
+            backend_settings = {
+                "SUMMARY_LLM_BACKEND": "apps.summary.services.llm_backends.FakeBackend",
+                "SUMMARY_FAKE_LLM_LATENCY": options["latency"],
+                "SUMMARY_FAKE_LLM_ERROR_RATE": options["error_rate"],
+            }
+        else:
+            backend_settings = {
+                "SUMMARY_LLM_BACKEND": "apps.summary.services.llm_backends.GeminiBackend",
+                "GEMINI_BASE_URL": server.base_url,
+            }
+        user = User.objects.create_user(username=f"loadtest-{uuid.uuid4().hex[:12]}")
+        app, app_created = AppInfo.objects.get_or_create(
+            package_name="loadtest.summary", defaults={"app_name": "부하 테스트"}
+        )
+        try:
+            dates = self._seed_records(user, app, n)
+            token = str(RefreshToken.for_user(user).access_token)
+            with override_settings(
+                SUMMARY_ASYNC=False, ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"], **backend_settings
+            ):
+                get_backend.cache_clear()
+                try:
+                    results, elapsed, peak, baseline = asyncio.run(
+                        self._request_endpoint(dates, token, options["ramp_up"])
+                    )
+                    stats = get_backend().stats()
+                finally:
+                    get_backend.cache_clear()
+        finally:
+            user.delete()
+            if app_created:
+                app.delete()
+
+        outcomes = [
+            r if isinstance(r, Exception) or r.status_code == 200 else RuntimeError(f"HTTP {r.status_code}: {r.text[:200]}")
+            for r in results
+        ]
+        self._report("endpoint", server, outcomes, elapsed, peak)
+        self.stdout.write(
+            f"시작 시 스레드 {baseline}개, 요청 {n}개 동시 처리 중 최대 {peak}개 "
+            f"(요청당 {(peak - baseline) / n:.2f}개), LLM 호출 {stats['calls']}건"
+        )
+        limit = baseline + n + options["max_extra_threads"]
+        if peak > limit:
+            raise CommandError(f"최대 스레드 {peak}개가 허용치 {limit}개(시작 {baseline} + 요청 {n} + 여유 {options['max_extra_threads']})를 넘었습니다.")
+
+    @staticmethod
+    def _seed_records(user: User, app: AppInfo, n: int) -> list[datetime.date]:
+        # 날짜마다 사용 시간이 달라야 프롬프트가 달라져 응답 캐시에 걸리지 않습니다.
+        tz = user_timezone(user.id)
+        today = datetime.datetime.now(tz).date()
+        dates = [today - datetime.timedelta(days=i + 1) for i in range(n)]
+        records = []
+        for i, day in enumerate(dates):
+            start = int(datetime.datetime.combine(day, datetime.time(12), tz).timestamp() * 1000)
+            usage_ms = (i + 1) * 60 * 1000
+            records.append(UsageRecord(
+                user=user, app=app, usage_time_ms=usage_ms, start_time=start, end_time=start + usage_ms, local_date=day,
+            ))
+        UsageRecord.objects.bulk_create(records)
+        return dates
+
+    @staticmethod
+    async def _request_endpoint(dates, token: str, ramp_up: float):
+        application = get_asgi_application()
+        peak = baseline = threading.active_count()
+
+        async def sample():
+            nonlocal peak
+            while True:
+                peak = max(peak, threading.active_count())
+                await asyncio.sleep(0.01)
+
+        sampler = asyncio.create_task(sample())
+        transport = httpx.ASGITransport(app=application)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver", timeout=None) as client:
+
+            async def request(i: int, day: datetime.date):
+                await asyncio.sleep(ramp_up * i / len(dates))
+                return await client.get(
+                    "/api/summary", params={"date": day.isoformat()}, headers={"Authorization": f"Bearer {token}"}
+                )
+
+            started = time.perf_counter()
+            results = await asyncio.gather(*(request(i, day) for i, day in enumerate(dates)), return_exceptions=True)
+            elapsed = time.perf_counter() - started
+        sampler.cancel()
+        return results, elapsed, peak, baseline
+
+    def _report(self, name: str, server, results, elapsed: float, peak_threads: int):
+        failed = [r for r in results if isinstance(r, Exception)]
+        line = (
+            f"{name:>5}: {elapsed:6.2f}초, 초당 {len(results) / elapsed:7.1f}건, 실패 {len(failed)}건, "
+            f"최대 스레드 {peak_threads}개"
+        )
+        if server is not None:
+            line += f", 서버 최대 동시 요청 {server.peak_in_flight}개"
+            server.reset_stats()
+        self.stdout.write(line)
+        if failed:
+            self.stderr.write(f"  첫 실패: {failed[0]!r}")
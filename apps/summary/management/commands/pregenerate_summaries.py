@@ -0,0 +1,78 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.summary.services.pregenerate import (
+    Checkpoint,
+    PregenerateReport,
+    checkpoint_path,
+    local_yesterdays,
+    pregenerate_summaries,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "지정한 날짜에 사용 기록이 있지만 AI 요약이 없는 사용자들의 요약을 미리 생성합니다. (cron 실행용)\n"
+        "중단되면 같은 날짜로 다시 실행해 이어서 처리합니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--date", type=str, help="요약할 날짜 (YYYY-MM-DD, 기본값: 사용자 시간대 기준 어제)")
+        parser.add_argument("--threads", type=int, default=settings.SUMMARY_PREGENERATE_THREADS, help="동시에 생성할 요약 수")
+        parser.add_argument("--rpm", type=float, default=settings.SUMMARY_GEMINI_RPM, help="Gemini 분당 요청 수 제한 (0이면 제한 없음)")
+        parser.add_argument("--restart", action="store_true", help="체크포인트를 무시하고 처음부터 처리")
+
+    def handle(self, *args, **options):
+        if options["date"]:
+            try:
+                targets = {datetime.date.fromisoformat(options["date"]): None}
+            except ValueError:
+                raise CommandError("--date는 YYYY-MM-DD 형식이어야 합니다.")
+        else:
+            # 사용자마다 자기 시간대의 어제가 대상입니다. 날짜별로 나눠 체크포인트도 날짜마다 따로 둡니다.
+            targets = local_yesterdays()
+        if options["threads"] < 1:
+            raise CommandError("--threads는 1 이상이어야 합니다.")
+
+        def progress(user_id, outcome):
+            if options["verbosity"] > 1:
+                self.stdout.write(f"user {user_id}: {outcome}")
+
+        retry = False
+        for target_date, user_ids in targets.items():
+            checkpoint = Checkpoint(checkpoint_path(target_date), target_date)
+            if not options["restart"]:
+                checkpoint.load()
+
+            self.stdout.write(f"{target_date} 요약 미리 생성 시작 (스레드 {options['threads']}개, 분당 {options['rpm']:g}회)")
+            report = pregenerate_summaries(
+                target_date,
+                threads=options["threads"],
+                rate_per_minute=options["rpm"],
+                checkpoint=checkpoint,
+                progress=progress,
+                user_ids=user_ids,
+            )
+            self._write_report(report)
+            retry = retry or bool(report.failed or report.pending)
+
+        if not targets:
+            self.stdout.write("어제 사용 기록이 있는 사용자가 없습니다.")
+        if retry:
+            self.stdout.write(self.style.WARNING("실패하거나 시간이 초과된 사용자는 다음 실행에서 다시 시도합니다."))
+        else:
+            self.stdout.write(self.style.SUCCESS("완료"))
+
+    def _write_report(self, report: PregenerateReport) -> None:
+        for user_id, error in sorted(report.errors.items()):
+            self.stderr.write(f"user {user_id}: {error}")
+        self.stdout.write(
+            f"대상 {report.candidates}명 (체크포인트로 건너뜀 {report.skipped}명)\n"
+            f"생성 {report.generated}건, 사용 기록 없음 {report.no_usage}건, "
+            f"생성 중(시간 초과) {report.pending}건, 실패 {report.failed}건\n"
+            f"소요 {report.elapsed:.1f}초, 분당 {report.per_minute:.1f}건, "
+            f"생성 시간 p50 {report.latency(0.5):.2f}초 / p95 {report.latency(0.95):.2f}초, "
+            f"속도 제한 대기 합계 {report.rate_limited:.1f}초"
+        )
@@ -0,0 +1,66 @@
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from apps.summary.services.jobs import claim_jobs, requeue_stale_jobs, run_job
+
+
+def process(job) -> str:
+    try:
+        return run_job(job)
+    finally:
+        # 워커 스레드마다 열린 DB 연결을 작업이 끝날 때 닫습니다.
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = "AI 요약 작업(AISummaryJob)을 크기가 제한된 스레드 풀로 처리합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=settings.SUMMARY_WORKER_THREADS, help="동시에 처리할 작업 수")
+        parser.add_argument(
+            "--poll-interval", type=float, default=settings.SUMMARY_WORKER_POLL_INTERVAL, help="새 작업 조회 간격(초)"
+        )
+        parser.add_argument("--once", action="store_true", help="지금 처리할 수 있는 작업이 없으면 종료")
+
+    def handle(self, *args, **options):
+        threads = options["threads"]
+        if threads < 1:
+            raise CommandError("--threads는 1 이상이어야 합니다.")
+        poll_interval = options["poll_interval"]
+        results = Counter()
+
+        self.stdout.write(f"요약 워커 시작 (스레드 {threads}개)")
+        with ThreadPoolExecutor(max_workers=threads, thread_name_prefix="summary-worker") as pool:
+            running = set()
+            try:
+                while True:
+                    requeue_stale_jobs()
+                    # 빈 스레드 수만큼만 가져와서, 처리하지 못한 작업을 워커가 붙잡아 두지 않게 합니다.
+                    for job in claim_jobs(threads - len(running)):
+                        running.add(pool.submit(process, job))
+
+                    if not running:
+                        if options["once"]:
+                            break
+                        time.sleep(poll_interval)
+                        continue
+
+                    done, running = wait(running, timeout=poll_interval, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        status = future.result()
+                        results[status] += 1
+                        if options["verbosity"] > 1:
+                            self.stdout.write(f"작업 처리: {status}")
+            except KeyboardInterrupt:
+                self.stdout.write("종료 요청을 받았습니다. 처리 중인 작업이 끝나길 기다립니다.")
+                for future in running:
+                    results[future.result()] += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"완료 {results['done']}건, 재시도 대기 {results['pending']}건, 실패 {results['failed']}건"
+        ))
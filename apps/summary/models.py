@@ -16,4 +16,41 @@ class AIDailySummary(models.Model):
         unique_together = ('user', 'date')
     
     def __str__(self):
-        return f"{self.user.username} - {self.date}"
\ No newline at end of file
+        return f"{self.user.username} - {self.date}"
+
+
+class AISummaryJob(models.Model):
+    """
+    AI 요약 생성 작업입니다. (run_summary_worker 명령이 처리)
+
+    (user, date)마다 하나만 존재하며, 같은 날짜를 다시 요청하면 기존 작업을 가리킵니다.
+    실패하면 next_attempt_at까지 기다렸다가 max 시도 횟수까지 다시 시도합니다.
+    """
+    class Status(models.TextChoices):
+        PENDING = 'pending', '대기'
+        RUNNING = 'running', '생성 중'
+        DONE = 'done', '완료'
+        FAILED = 'failed', '실패'
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='summary_jobs')
+    date = models.DateField()
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+    next_attempt_at = models.DateTimeField()
+    started_at = models.DateTimeField(null=True, blank=True)
+    summary = models.ForeignKey(AIDailySummary, null=True, blank=True, on_delete=models.SET_NULL, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'date'], name='summary_job_key'),
+        ]
+        indexes = [
+            # 워커가 처리할 작업을 찾는 조회 (status, next_attempt_at)
+            models.Index(fields=['status', 'next_attempt_at'], name='summary_job_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.date} ({self.status})"
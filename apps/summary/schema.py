@@ -1,7 +1,17 @@
 from ninja import Schema
 from typing import Optional, List
-from datetime import datetime
+from datetime import datetime, date
 
 class AISummary(Schema):
     message: str
-    date: str
\ No newline at end of file
+    date: str
+
+class AISummaryJobSchema(Schema):
+    id: int
+    date: date
+    status: str
+    attempts: int
+    last_error: Optional[str] = None
+    next_attempt_at: Optional[datetime] = None
+    status_url: str
+    summary: Optional[str] = None
@@ -0,0 +1,91 @@
+import math
+import threading
+import time
+
+
+class CircuitBreaker:
+    """
+    업스트림 호출의 연속 실패를 세어, failure_threshold번 연속 실패하면 reset_seconds 동안 호출을 막는 회로 차단기입니다.
+
+    - closed: 호출을 허용합니다.
+    - open: 호출을 바로 거절합니다. reset_seconds가 지나면 half_open이 됩니다.
+    - half_open: 시험 호출 하나만 허용합니다. 성공하면 closed, 실패하면 다시 open이 됩니다.
+    failure_threshold가 0 이하이면 막지 않습니다.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_seconds: float, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened = 0
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._refresh()
+
+    def _refresh(self) -> str:
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_seconds:
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = False
+        return self._state
+
+    def allow(self) -> bool:
+        """호출해도 되면 True를 반환합니다. half_open에서는 시험 호출 하나에만 True입니다."""
+        if self.failure_threshold <= 0:
+            return True
+        with self._lock:
+            state = self._refresh()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._state = self.CLOSED
+            self._trial_in_flight = False
+
+    def release(self) -> None:
+        """
+        결과 없이 끝난 시도(취소 등)를 되돌립니다. 성공/실패로 세지 않고, half_open이면 다음 호출이 시험 호출이 됩니다.
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            state = self._refresh()
+            if state == self.HALF_OPEN or (state == self.CLOSED and 0 < self.failure_threshold <= self.failures):
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+                self._trial_in_flight = False
+                self.opened += 1
+
+    def retry_after(self) -> int:
+        """다시 호출해 볼 수 있을 때까지 남은 시간(초, 올림)입니다. 열려 있지 않으면 0입니다. (Retry-After 헤더용)"""
+        with self._lock:
+            if self._refresh() != self.OPEN:
+                return 0
+            return max(math.ceil(self.reset_seconds - (self._clock() - self._opened_at)), 1)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "state": self._refresh(),
+                "consecutive_failures": self.failures,
+                "opened": self.opened,
+            }
@@ -0,0 +1,157 @@
+import asyncio
+import json
+import random
+import threading
+from typing import Optional
+
+from apps.summary.services.llm_backends import FAKE_SUMMARY_TEXT
+
+
+class FakeGeminiServer:
+    """
+    Gemini generateContent 요청에 latency초 뒤 고정 요약으로 응답하는 로컬 HTTP 서버입니다. (부하 테스트, 장애 테스트용)
+
+    error_rate 확률로 503 UNAVAILABLE을 응답합니다. latency와 error_rate는 실행 중에 바꿀 수 있어,
+    업스트림이 느려지거나 장애가 났다가 회복되는 상황을 흉내 낼 수 있습니다.
+
+    별도 스레드의 이벤트 루프에서 동작하며, 동시에 응답을 기다리는 요청 수(in_flight)와 그 최대값을 기록합니다.
+    GeminiBackend(base_url=server.base_url)로 이 서버에 요청합니다. (실제 Gemini 클라이언트 경로를 그대로 거침)
+    """
+
+    def __init__(
+        self,
+        latency: float = 1.0,
+        error_rate: float = 0.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        seed: Optional[int] = None,
+    ):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.errors = 0
+        self._random = random.Random(seed)
+        self.host = host
+        self.port = port
+        self.requests = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> "FakeGeminiServer":
+        self._thread = threading.Thread(target=self._run, name="fake-gemini", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def stop(self) -> None:
+        if self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(timeout=5)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def reset_stats(self) -> None:
+        self.requests = 0
+        self.errors = 0
+        self.peak_in_flight = self.in_flight
+
+    def __enter__(self) -> "FakeGeminiServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        # 기본 backlog(100)로는 수백 개의 동시 연결을 받지 못하므로 늘려 둡니다.
+        self._server = self._loop.run_until_complete(
+            asyncio.start_server(self._handle, self.host, self.port, backlog=4096)
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._loop.close()
+
+    async def _shutdown(self) -> None:
+        self._server.close()
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            # keep-alive 연결에서 요청을 계속 받습니다.
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                length = 0
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    if name.strip().lower() == "content-length":
+                        length = int(value.strip())
+                if length:
+                    await reader.readexactly(length)
+
+                self.requests += 1
+                self.in_flight += 1
+                self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+                try:
+                    await asyncio.sleep(self.latency)
+                finally:
+                    self.in_flight -= 1
+
+                if self._random.random() < self.error_rate:
+                    self.errors += 1
+                    status, payload = "503 Service Unavailable", self._error_response()
+                else:
+                    status, payload = "200 OK", self._response(length)
+                body = json.dumps(payload).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status}\r\n".encode("ascii")
+                    + b"Content-Type: application/json; charset=UTF-8\r\n"
+                    + f"Content-Length: {len(body)}\r\n\r\n".encode("ascii")
+                    + body
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _error_response() -> dict:
+        return {"error": {"code": 503, "message": "The model is overloaded.", "status": "UNAVAILABLE"}}
+
+    @staticmethod
+    def _response(request_length: int) -> dict:
+        # 토큰 수는 요청 본문 길이로 어림합니다. (4바이트당 1토큰)
+        input_tokens = max(request_length // 4, 1)
+        output_tokens = max(len(FAKE_SUMMARY_TEXT) // 2, 1)
+        return {
+            "candidates": [
+                {
+                    "content": {"role": "model", "parts": [{"text": FAKE_SUMMARY_TEXT}]},
+                    "finishReason": "STOP",
+                }
+            ],
+            "usageMetadata": {
+                "promptTokenCount": input_tokens,
+                "candidatesTokenCount": output_tokens,
+                "totalTokenCount": input_tokens + output_tokens,
+            },
+        }
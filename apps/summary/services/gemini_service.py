@@ -1,18 +1,19 @@
 import json
+import logging
 import re
 import datetime
-import os
-from dotenv import load_dotenv
+from typing import Optional
+from zoneinfo import ZoneInfo
 
 from django.contrib.auth.models import User
 
-from google import genai
-from google.genai import types
 from apps.usage.models import UsageRecord
+from apps.usage.services.intervals import auser_timezone, user_timezone
+from apps.summary.services.llm_backends import LLMBackend, get_backend
+from apps.summary.services.prompt_compaction import compact_records
+from apps.summary.services.summary_cache import summary_cache
 
-
-load_dotenv()
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+logger = logging.getLogger(__name__)
 
 # user_data = """
 # YouTube - 2시간 30분 (쉬는 시간에 봄. 너무 오래 본 것 같음)
@@ -22,10 +23,13 @@ client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
 # 게임 - 1시간 (스트레스 풀려고 함)
 # """
 
+# PROMPT_TEMPLATE을 바꾸면 함께 올립니다. 응답 캐시 키에 포함되어, 이전 프롬프트로 만든 요약을 다시 쓰지 않게 합니다.
+PROMPT_VERSION = "2"
+
 PROMPT_TEMPLATE = """
 당신은 사용자의 스마트폰 사용 습관을 분석하는 요약 및 피드백 전문가입니다.
 
-다음은 사용자의 하루 스마트폰 사용 기록입니다. 각 항목은 사용한 앱 이름, 사용 시간, 그리고 사용자가 직접 남긴 간단한 메모로 구성되어 있습니다.
+다음은 사용자의 하루 스마트폰 사용 기록을 앱별로 합친 것입니다. 각 항목은 앱 이름, 하루 총 사용 시간과 사용 횟수, 시간대(새벽/오전/오후/저녁)별 사용 시간, 그리고 사용자가 직접 남긴 간단한 메모로 구성되어 있습니다.
 
 다음 지시사항을 반드시 지켜서 분석을 수행해 주세요:
 
@@ -67,7 +71,7 @@ def prompt(user_data: str) -> str:
     return PROMPT_TEMPLATE.format(user_data=user_data)
 
 
-def extract_json(text: str) -> dict:
+def extract_json(text: str) -> Optional[dict]:
     # ```json ... ``` 또는 ``` ... ``` 안의 JSON만 추출
     match = re.search(r"```(?:json)?\s*(\{.*?\})\s*```", text, re.DOTALL)
     if match:
@@ -79,23 +83,13 @@ def extract_json(text: str) -> dict:
         return json.loads(json_text)
     
     except json.JSONDecodeError as e:
-        print("❗ JSON 파싱 실패:", e)
-        print("원본 응답:", text)
+        # 응답 원문에는 사용자의 메모가 섞여 있을 수 있어 DEBUG 레벨에서만 남깁니다.
+        logger.warning("LLM 응답 JSON 파싱 실패: %s (응답 길이 %d자)", e, len(text))
+        logger.debug("파싱하지 못한 LLM 응답: %s", text)
         return None
     
 
-def generate_summary(user: User, target_date: datetime.date) -> tuple[bool, str]: 
-    start_of_day = datetime.datetime.combine(target_date, datetime.time.min)
-    end_of_day = datetime.datetime.combine(target_date, datetime.time.max)
-    
-    records = UsageRecord.objects.filter(
-        user=user,
-        created_at__range=(start_of_day, end_of_day)
-    ).select_related('app').order_by('start_time')
-    
-    if not records.exists():
-        return False, f"{target_date}에는 사용 기록이 없습니다."
-
+def build_user_data_text(records) -> str:
     # 앱 이름 + 사용 시간 + 메모 기반으로 텍스트 생성
     record_lines = []
     for record in records:
@@ -107,15 +101,78 @@ def generate_summary(user: User, target_date: datetime.date) -> tuple[bool, str]
         if memo:
             line += f" ({memo})"
         record_lines.append(line)
+    return "\n".join(record_lines)
+
+
+def _user_data_text(records: list, tz: ZoneInfo) -> str:
+    # 기록마다 한 줄인 기존 형식은 압축 전 토큰 수를 재는 데만 씁니다.
+    return compact_records(records, tz, uncompacted_text=build_user_data_text(records)).text
+
+
+def _records(user: User, target_date: datetime.date):
+    # 업로드 시각(created_at)이 아니라 사용자 시간대 기준 사용 날짜(local_date)가 같은 기록을 사용합니다.
+    return UsageRecord.objects.overlapping(user, target_date).select_related('app').order_by('start_time')
+
+
+class SummaryParseError(ValueError):
+    """LLM 응답에서 summary/feedback을 꺼내지 못했습니다. (API는 502로 응답)"""
+
+
+def _parsed(text: str) -> dict:
+    """응답에서 summary/feedback만 꺼냅니다. 형식이 맞지 않으면 SummaryParseError를 냅니다. (캐시에 넣지 않음)"""
+    data = extract_json(text)
+    if not isinstance(data, dict):
+        raise SummaryParseError("요약 응답이 JSON 객체가 아닙니다.")
+    missing = [key for key in ("summary", "feedback") if not isinstance(data.get(key), str)]
+    if missing:
+        raise SummaryParseError(f"요약 응답에 {', '.join(missing)} 항목이 없습니다.")
+    return {"summary": data["summary"], "feedback": data["feedback"]}
 
-    user_data_text = "\n".join(record_lines)
+
+def request_summary(user_data_text: str, backend: Optional[LLMBackend] = None) -> dict:
+    """
+    사용 기록 텍스트로 LLM 백엔드(기본값 SUMMARY_LLM_BACKEND)에 요약을 요청하고 파싱된 JSON을 반환합니다. 같은 입력의 응답은 캐시에서 꺼냅니다.
+
+    응답 형식이 맞지 않으면 SummaryParseError를 냅니다.
+    """
+    backend = backend or get_backend()
+    # 같은 모델, 프롬프트, 사용 기록 텍스트로 이미 받은 응답이 있으면 LLM을 호출하지 않습니다.
+    cache_key = summary_cache.key(backend.model, PROMPT_VERSION, user_data_text)
+    data = summary_cache.get(cache_key)
+    if data is None:
+        data = _parsed(backend.generate(prompt(user_data_text)).text)
+        summary_cache.set(cache_key, data)
+    return data
+
+
+async def arequest_summary(user_data_text: str, backend: Optional[LLMBackend] = None) -> dict:
+    """request_summary의 비동기 버전입니다. 응답을 기다리는 동안 스레드를 점유하지 않습니다."""
+    backend = backend or get_backend()
+    cache_key = summary_cache.key(backend.model, PROMPT_VERSION, user_data_text)
+    data = await summary_cache.aget(cache_key)
+    if data is None:
+        data = _parsed((await backend.agenerate(prompt(user_data_text))).text)
+        await summary_cache.aset(cache_key, data)
+    return data
+
+
+def generate_summary(user: User, target_date: datetime.date) -> tuple[bool, str]: 
+    records = list(_records(user, target_date))
     
-    response = client.models.generate_content(
-        model="gemini-2.5-flash",
-        contents=prompt(user_data_text),
-        config=types.GenerateContentConfig(
-            thinking_config=types.ThinkingConfig(thinking_budget=0)
-        ),
-    )
-    data = extract_json(response.text)
+    if not records:
+        return False, f"{target_date}에는 사용 기록이 없습니다."
+
+    data = request_summary(_user_data_text(records, user_timezone(user.id)))
+    return True, f"{data['summary']} {data['feedback']}"
+
+
+async def agenerate_summary(user: User, target_date: datetime.date) -> tuple[bool, str]:
+    """generate_summary의 비동기 버전입니다. (비동기 ORM, LLMBackend.agenerate 사용)"""
+    records = [record async for record in _records(user, target_date)]
+
+    if not records:
+        return False, f"{target_date}에는 사용 기록이 없습니다."
+
+    tz = await auser_timezone(user.id)
+    data = await arequest_summary(_user_data_text(records, tz))
     return True, f"{data['summary']} {data['feedback']}"
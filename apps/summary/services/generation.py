@@ -0,0 +1,377 @@
+import asyncio
+import datetime
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db.models import F, Q
+from django.utils import timezone
+
+from apps.summary.models import AIDailySummary, AISummaryJob
+from apps.summary.services.gemini_service import agenerate_summary, generate_summary
+
+Status = AISummaryJob.Status
+
+# 다른 프로세스가 생성 중일 때 결과를 확인하는 간격(초)
+POLL_INTERVAL = 0.25
+
+
+class NoUsageError(LookupError):
+    """요약할 사용 기록이 없는 날짜입니다."""
+
+
+class SummaryPendingError(TimeoutError):
+    """다른 요청이 생성 중인 요약을 기다리다가 시간이 초과되었습니다."""
+
+
+@dataclass
+class _Flight:
+    done: threading.Event = field(default_factory=threading.Event)
+    summary: Optional[AIDailySummary] = None
+    error: Optional[BaseException] = None
+
+
+class SummaryFlights:
+    """같은 프로세스 안에서 (user, date)마다 한 스레드만 요약을 생성하도록 묶어 줍니다."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: dict[tuple[int, datetime.date], _Flight] = {}
+
+    def join(self, key) -> tuple[_Flight, bool]:
+        """(진행 중인 생성, 이 호출이 생성을 맡는지)를 반환합니다."""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                return flight, False
+            flight = self._flights[key] = _Flight()
+            return flight, True
+
+    def finish(self, key, flight: _Flight) -> None:
+        with self._lock:
+            self._flights.pop(key, None)
+        flight.done.set()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._flights)
+
+
+summary_flights = SummaryFlights()
+
+
+class AsyncSummaryFlights:
+    """
+    SummaryFlights의 비동기 버전입니다. 이벤트 루프 안에서 (user, date)마다 한 코루틴만 요약을 생성합니다.
+
+    이벤트 루프 스레드에서만 쓰이므로 잠금이 필요 없습니다.
+    """
+
+    def __init__(self):
+        self._flights: dict[tuple[int, datetime.date], asyncio.Future] = {}
+
+    def join(self, key) -> tuple[asyncio.Future, bool]:
+        future = self._flights.get(key)
+        if future is not None:
+            return future, False
+        future = self._flights[key] = asyncio.get_running_loop().create_future()
+        # 기다리는 요청이 없어도 예외가 "retrieved되지 않음" 경고로 남지 않게 합니다.
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        return future, True
+
+    def finish(self, key) -> None:
+        self._flights.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+
+async_summary_flights = AsyncSummaryFlights()
+
+
+def save_summary(user: User, target_date: datetime.date, message: str) -> AIDailySummary:
+    """(user, date) 요약을 upsert합니다. 동시에 저장되어도 unique 제약 위반 없이 마지막 값이 남습니다."""
+    AIDailySummary.objects.bulk_create(
+        [AIDailySummary(user=user, date=target_date, message=message)],
+        update_conflicts=True,
+        unique_fields=["user", "date"],
+        update_fields=["message", "created_at"],
+    )
+    return AIDailySummary.objects.get(user=user, date=target_date)
+
+
+@dataclass
+class GenerationClaim:
+    """claim_generation으로 얻은 생성 권한입니다. 생성하지 못하면 작업을 previous_status로 되돌립니다."""
+    job: AISummaryJob
+    previous_status: str
+
+
+def _claimable(job: AISummaryJob, now) -> Q:
+    # 조회한 상태 그대로일 때만 선점해서, 되돌릴 이전 상태가 정확하도록 합니다.
+    cutoff = now - datetime.timedelta(seconds=settings.SUMMARY_JOB_LEASE_SECONDS)
+    return Q(id=job.id, status=job.status) & (~Q(status=Status.RUNNING) | Q(started_at__lt=cutoff))
+
+
+def claim_generation(user: User, target_date: datetime.date) -> Optional[GenerationClaim]:
+    """
+    (user, date)의 작업 행을 running으로 바꿔 생성 권한을 얻습니다. (프로세스 간 조정)
+
+    요청 경로의 선점은 잠금으로만 쓰며 워커의 시도 횟수(attempts)와 재시도 일정(next_attempt_at)은 바꾸지 않습니다.
+    다른 프로세스나 워커가 생성 중이면(lease 이내의 running) None을 반환합니다.
+    """
+    now = timezone.now()
+    job, _ = AISummaryJob.objects.get_or_create(user=user, date=target_date, defaults={"next_attempt_at": now})
+    previous_status = job.status
+    if not AISummaryJob.objects.filter(_claimable(job, now)).update(
+        status=Status.RUNNING, started_at=now, updated_at=now
+    ):
+        return None
+    job.refresh_from_db()
+    return GenerationClaim(job, previous_status)
+
+
+def complete_generation(job: AISummaryJob, summary: AIDailySummary) -> None:
+    AISummaryJob.objects.filter(id=job.id).update(
+        status=Status.DONE, summary=summary, last_error="", updated_at=timezone.now()
+    )
+
+
+def _released_status(claim: GenerationClaim) -> str:
+    # lease가 지난 running을 이어받았던 경우는 requeue_stale_jobs처럼 대기 상태로 돌려놓습니다.
+    return Status.PENDING if claim.previous_status == Status.RUNNING else claim.previous_status
+
+
+def _release_fields(claim: GenerationClaim, error: Optional[str]) -> dict:
+    fields = {"status": _released_status(claim), "updated_at": timezone.now()}
+    if error is not None:
+        fields["last_error"] = error
+    return fields
+
+
+def release_generation(claim: GenerationClaim, error: Optional[str] = None) -> None:
+    """
+    생성하지 못한 선점을 풉니다. 작업은 선점 전 상태로 돌아가고, error를 주면 last_error에 남깁니다.
+
+    워커 대기열의 작업이면 원래 일정대로 워커가 다시 시도합니다.
+    """
+    AISummaryJob.objects.filter(id=claim.job.id).update(**_release_fields(claim, error))
+
+
+def fail_generation(job: AISummaryJob, error: str) -> None:
+    """다시 시도해도 결과가 같은 실패(사용 기록 없음)입니다. 워커처럼 바로 실패로 끝냅니다."""
+    AISummaryJob.objects.filter(id=job.id).update(status=Status.FAILED, last_error=error, updated_at=timezone.now())
+
+
+# 비동기 요청 경로(aget_or_generate_summary)에서 쓰는 비동기 ORM 버전입니다.
+
+async def asave_summary(user: User, target_date: datetime.date, message: str) -> AIDailySummary:
+    await AIDailySummary.objects.abulk_create(
+        [AIDailySummary(user=user, date=target_date, message=message)],
+        update_conflicts=True,
+        unique_fields=["user", "date"],
+        update_fields=["message", "created_at"],
+    )
+    return await AIDailySummary.objects.aget(user=user, date=target_date)
+
+
+async def aclaim_generation(user: User, target_date: datetime.date) -> Optional[GenerationClaim]:
+    now = timezone.now()
+    job, _ = await AISummaryJob.objects.aget_or_create(user=user, date=target_date, defaults={"next_attempt_at": now})
+    previous_status = job.status
+    if not await AISummaryJob.objects.filter(_claimable(job, now)).aupdate(
+        status=Status.RUNNING, started_at=now, updated_at=now
+    ):
+        return None
+    await job.arefresh_from_db()
+    return GenerationClaim(job, previous_status)
+
+
+async def acomplete_generation(job: AISummaryJob, summary: AIDailySummary) -> None:
+    await AISummaryJob.objects.filter(id=job.id).aupdate(
+        status=Status.DONE, summary=summary, last_error="", updated_at=timezone.now()
+    )
+
+
+async def arelease_generation(claim: GenerationClaim, error: Optional[str] = None) -> None:
+    await AISummaryJob.objects.filter(id=claim.job.id).aupdate(**_release_fields(claim, error))
+
+
+async def afail_generation(job: AISummaryJob, error: str) -> None:
+    await AISummaryJob.objects.filter(id=job.id).aupdate(
+        status=Status.FAILED, last_error=error, updated_at=timezone.now()
+    )
+
+
+def get_or_generate_summary(user: User, target_date: datetime.date, timeout: Optional[float] = None) -> AIDailySummary:
+    """
+    저장된 요약을 반환하고, 없으면 생성해서 저장한 뒤 반환합니다.
+
+    - 같은 프로세스의 동시 요청은 한 스레드만 생성하고 나머지는 그 결과를 기다립니다.
+    - 다른 프로세스와는 AISummaryJob 행을 running으로 선점해서 조정하며, 선점하지 못하면 저장된 요약이 생길 때까지 기다립니다.
+    - timeout(초, 기본값 SUMMARY_SINGLE_FLIGHT_TIMEOUT) 안에 결과가 없으면 SummaryPendingError를 던집니다.
+    - 사용 기록이 없는 날짜면 NoUsageError를 던집니다.
+    """
+    timeout = settings.SUMMARY_SINGLE_FLIGHT_TIMEOUT if timeout is None else timeout
+    summary = AIDailySummary.objects.filter(user=user, date=target_date).first()
+    if summary:
+        return summary
+
+    key = (user.pk, target_date)
+    flight, leader = summary_flights.join(key)
+    if not leader:
+        if not flight.done.wait(timeout):
+            raise SummaryPendingError(f"{target_date} 요약을 생성하고 있습니다.")
+        if flight.error is not None:
+            raise flight.error
+        return flight.summary
+
+    try:
+        flight.summary = _generate_once(user, target_date, timeout)
+        return flight.summary
+    except BaseException as e:
+        flight.error = e
+        raise
+    finally:
+        summary_flights.finish(key, flight)
+
+
+def _generate_once(user: User, target_date: datetime.date, timeout: float) -> AIDailySummary:
+    deadline = time.monotonic() + timeout
+    while True:
+        claim = claim_generation(user, target_date)
+        if claim is not None:
+            break
+        # 다른 프로세스가 생성 중입니다. 요약이 저장되면 그 결과를 쓰고,
+        # 저장 없이 끝나면(실패) 다시 선점을 시도해서 이 요청이 직접 생성합니다.
+        summary = _wait_for_other(user, target_date, deadline)
+        if summary:
+            return summary
+
+    # 선점하기 직전에 다른 프로세스가 생성을 마쳤을 수 있습니다.
+    summary = AIDailySummary.objects.filter(user=user, date=target_date).first()
+    if summary:
+        complete_generation(claim.job, summary)
+        return summary
+
+    try:
+        success, message = generate_summary(user, target_date)
+    except Exception as e:
+        release_generation(claim, f"{type(e).__name__}: {e}")
+        raise
+    if not success:
+        fail_generation(claim.job, message)
+        raise NoUsageError(message)
+
+    summary = save_summary(user, target_date, message)
+    complete_generation(claim.job, summary)
+    return summary
+
+
+def _wait_for_other(user: User, target_date: datetime.date, deadline: float) -> Optional[AIDailySummary]:
+    """요약이 저장되거나 다른 프로세스의 running 상태가 끝날 때까지 기다립니다. 시간이 지나면 SummaryPendingError를 던집니다."""
+    while True:
+        summary = AIDailySummary.objects.filter(user=user, date=target_date).first()
+        if summary:
+            return summary
+        if not AISummaryJob.objects.filter(user=user, date=target_date, status=Status.RUNNING).exists():
+            return None
+        if time.monotonic() >= deadline:
+            raise SummaryPendingError(f"{target_date} 요약을 생성하고 있습니다.")
+        time.sleep(POLL_INTERVAL)
+
+
+async def aget_or_generate_summary(
+    user: User, target_date: datetime.date, timeout: Optional[float] = None
+) -> AIDailySummary:
+    """
+    get_or_generate_summary의 비동기 버전입니다.
+
+    DB 조회와 저장은 비동기 ORM, Gemini 호출은 비동기 클라이언트로 합니다.
+    비동기 ORM은 Django ASGI 핸들러가 요청마다 두는 스레드에서 실행되므로, 생성을 기다리는 요청이 많아도 스레드가 그 이상 늘지 않습니다.
+    같은 이벤트 루프의 동시 요청은 한 코루틴의 결과를 함께 기다립니다.
+    생성을 맡은 요청이 취소되면 작업 선점을 풀고, 기다리던 요청 중 하나가 생성을 이어받습니다.
+    프로세스 간 조정(AISummaryJob 선점)과 예외는 동기 버전과 같습니다.
+    """
+    timeout = settings.SUMMARY_SINGLE_FLIGHT_TIMEOUT if timeout is None else timeout
+    summary = await AIDailySummary.objects.filter(user=user, date=target_date).afirst()
+    if summary:
+        return summary
+
+    key = (user.pk, target_date)
+    deadline = time.monotonic() + timeout
+    while True:
+        future, leader = async_summary_flights.join(key)
+        if leader:
+            break
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), max(deadline - time.monotonic(), 0))
+        except asyncio.TimeoutError:
+            raise SummaryPendingError(f"{target_date} 요약을 생성하고 있습니다.")
+        except asyncio.CancelledError:
+            # 생성을 맡은 요청이 취소되었으면 다시 참여해서 이 요청이 생성을 이어받습니다.
+            # (이 요청 자신이 취소된 경우에는 future가 취소되지 않았으므로 그대로 전파합니다.)
+            if not future.cancelled():
+                raise
+
+    try:
+        summary = await _agenerate_once(user, target_date, max(deadline - time.monotonic(), 0))
+        future.set_result(summary)
+        return summary
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        async_summary_flights.finish(key)
+
+
+async def _agenerate_once(user: User, target_date: datetime.date, timeout: float) -> AIDailySummary:
+    deadline = time.monotonic() + timeout
+    while True:
+        claim = await aclaim_generation(user, target_date)
+        if claim is not None:
+            break
+        summary = await _await_other(user, target_date, deadline)
+        if summary:
+            return summary
+
+    summary = await AIDailySummary.objects.filter(user=user, date=target_date).afirst()
+    if summary:
+        await acomplete_generation(claim.job, summary)
+        return summary
+
+    try:
+        success, message = await agenerate_summary(user, target_date)
+    except asyncio.CancelledError:
+        # 요청이 취소되어도(클라이언트 연결 종료 등) lease가 끝날 때까지 running으로 남지 않도록 선점을 풉니다.
+        # 실패가 아니므로 작업은 선점 전 상태 그대로 돌아갑니다.
+        await asyncio.shield(arelease_generation(claim))
+        raise
+    except Exception as e:
+        await arelease_generation(claim, f"{type(e).__name__}: {e}")
+        raise
+    if not success:
+        await afail_generation(claim.job, message)
+        raise NoUsageError(message)
+
+    summary = await asave_summary(user, target_date, message)
+    await acomplete_generation(claim.job, summary)
+    return summary
+
+
+async def _await_other(user: User, target_date: datetime.date, deadline: float) -> Optional[AIDailySummary]:
+    while True:
+        summary = await AIDailySummary.objects.filter(user=user, date=target_date).afirst()
+        if summary:
+            return summary
+        if not await AISummaryJob.objects.filter(user=user, date=target_date, status=Status.RUNNING).aexists():
+            return None
+        if time.monotonic() >= deadline:
+            raise SummaryPendingError(f"{target_date} 요약을 생성하고 있습니다.")
+        await asyncio.sleep(POLL_INTERVAL)
@@ -0,0 +1,109 @@
+import datetime
+import logging
+import random
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db.models import F
+from django.utils import timezone
+
+from apps.summary.models import AISummaryJob
+from apps.summary.services.gemini_service import generate_summary
+from apps.summary.services.generation import complete_generation, save_summary
+
+logger = logging.getLogger(__name__)
+
+Status = AISummaryJob.Status
+
+
+def enqueue_summary_job(user: User, target_date: datetime.date) -> tuple[AISummaryJob, bool]:
+    """
+    (user, target_date) 요약 작업을 대기열에 넣습니다.
+
+    - 이미 대기 중이거나 생성 중인 작업이 있으면 그 작업을 그대로 반환합니다.
+    - 재시도가 끝나 실패한 작업(또는 요약이 지워진 완료 작업)은 처음부터 다시 시도하도록 되돌립니다.
+    (작업, 새로 대기열에 넣었는지)를 반환합니다.
+    """
+    now = timezone.now()
+    job, created = AISummaryJob.objects.get_or_create(
+        user=user, date=target_date, defaults={"next_attempt_at": now}
+    )
+    if created:
+        return job, True
+    if job.status == Status.FAILED or (job.status == Status.DONE and job.summary_id is None):
+        requeued = AISummaryJob.objects.filter(id=job.id, status=job.status).update(
+            status=Status.PENDING, attempts=0, last_error="", next_attempt_at=now, updated_at=now
+        )
+        job.refresh_from_db()
+        return job, bool(requeued)
+    return job, False
+
+
+def requeue_stale_jobs() -> int:
+    """SUMMARY_JOB_LEASE_SECONDS가 지나도 끝나지 않은 running 작업을 다시 대기열에 넣습니다."""
+    now = timezone.now()
+    cutoff = now - datetime.timedelta(seconds=settings.SUMMARY_JOB_LEASE_SECONDS)
+    return AISummaryJob.objects.filter(status=Status.RUNNING, started_at__lt=cutoff).update(
+        status=Status.PENDING, next_attempt_at=now, updated_at=now
+    )
+
+
+def claim_jobs(limit: int) -> list[AISummaryJob]:
+    """
+    처리할 시각이 된 대기 작업을 최대 limit개 가져와 running으로 바꿉니다.
+
+    상태가 pending일 때만 바꾸는 조건부 UPDATE로 가져가므로, 워커가 여러 개여도 한 작업은 한 번만 처리됩니다.
+    """
+    if limit <= 0:
+        return []
+    now = timezone.now()
+    candidates = list(
+        AISummaryJob.objects.filter(status=Status.PENDING, next_attempt_at__lte=now)
+        .order_by("next_attempt_at", "id")
+        .values_list("id", flat=True)[:limit]
+    )
+    claimed = [
+        job_id
+        for job_id in candidates
+        if AISummaryJob.objects.filter(id=job_id, status=Status.PENDING).update(
+            status=Status.RUNNING, started_at=now, attempts=F("attempts") + 1, updated_at=now
+        )
+    ]
+    return list(AISummaryJob.objects.filter(id__in=claimed).select_related("user").order_by("id"))
+
+
+def backoff_seconds(attempts: int) -> float:
+    """attempts번째 실패 후 기다릴 시간입니다. 시도마다 2배로 늘리고, 작업이 한꺼번에 몰리지 않도록 흩뜨립니다."""
+    delay = min(
+        settings.SUMMARY_JOB_BACKOFF_SECONDS * 2 ** max(attempts - 1, 0),
+        settings.SUMMARY_JOB_MAX_BACKOFF_SECONDS,
+    )
+    return delay * random.uniform(0.5, 1.0)
+
+
+def run_job(job: AISummaryJob) -> str:
+    """claim_jobs로 가져온 작업 하나를 처리하고, 처리 후 상태를 반환합니다."""
+    try:
+        success, message = generate_summary(job.user, job.date)
+    except Exception as e:
+        logger.exception("요약 작업 %s 실패 (시도 %s회)", job.id, job.attempts)
+        return _fail(job, f"{type(e).__name__}: {e}", retry=True)
+
+    if not success:
+        # 사용 기록이 없는 날짜는 다시 시도해도 같은 결과이므로 바로 실패로 끝냅니다.
+        return _fail(job, message, retry=False)
+
+    complete_generation(job, save_summary(job.user, job.date, message))
+    return Status.DONE
+
+
+def _fail(job: AISummaryJob, error: str, retry: bool) -> str:
+    now = timezone.now()
+    if retry and job.attempts < settings.SUMMARY_JOB_MAX_ATTEMPTS:
+        next_attempt_at = now + datetime.timedelta(seconds=backoff_seconds(job.attempts))
+        AISummaryJob.objects.filter(id=job.id).update(
+            status=Status.PENDING, last_error=error, next_attempt_at=next_attempt_at, updated_at=now
+        )
+        return Status.PENDING
+    AISummaryJob.objects.filter(id=job.id).update(status=Status.FAILED, last_error=error, updated_at=now)
+    return Status.FAILED
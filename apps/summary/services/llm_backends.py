@@ -0,0 +1,326 @@
+import asyncio
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+import httpx
+from django.conf import settings
+from django.utils.module_loading import import_string
+from dotenv import load_dotenv
+
+from google import genai
+from google.genai import errors as genai_errors
+from google.genai import types
+
+from apps.summary.services.circuit_breaker import CircuitBreaker
+from apps.summary.services.prompt_compaction import estimate_tokens
+from apps.summary.services.rate_limit import RetryBudget
+
+
+load_dotenv()
+
+
+@dataclass
+class LLMResponse:
+    text: str
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+
+class LLMUnavailableError(RuntimeError):
+    """LLM 업스트림이 장애이거나 회로 차단기가 열려 있어 응답을 받을 수 없을 때 냅니다. (API는 503으로 응답)"""
+
+    def __init__(self, message: str, retry_after: int = 5):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+# 시도별 결과: 성공, 시간 초과, 오류, 재시도, 회로 차단기에 막힘
+OUTCOMES = ("success", "timeout", "error", "retry", "rejected")
+
+
+class LLMBackend:
+    """
+    요약 생성에 쓰는 LLM 백엔드의 기본 클래스입니다.
+
+    하위 클래스는 _generate/_agenerate를 구현합니다. model은 응답 캐시 키에 들어가므로 백엔드마다 달라야 합니다.
+    generate/agenerate는 다음과 같이 업스트림 장애에 대비합니다. (설정: SUMMARY_LLM_*)
+    - 시도마다 timeout초를 넘기면 시간 초과로 봅니다.
+    - 시간 초과와 일시적 오류(retryable)는 흩뜨린 지수 간격으로 max_attempts번까지 재시도합니다.
+      재시도는 재시도 예산(RetryBudget) 안에서만 합니다.
+    - 연속 실패가 쌓이면 회로 차단기가 열려, 업스트림을 부르지 않고 바로 LLMUnavailableError를 냅니다.
+      취소된 시도는 성공/실패로 세지 않고 시험 호출 자리만 돌려 놓습니다.
+    호출/시도 결과별 횟수와 입출력 토큰 수는 프로세스별로 집계합니다.
+    """
+
+    model = ""
+
+    def __init__(self):
+        self.calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.outcomes = dict.fromkeys(OUTCOMES, 0)
+        self.timeout = settings.SUMMARY_LLM_TIMEOUT
+        self.max_attempts = max(settings.SUMMARY_LLM_MAX_ATTEMPTS, 1)
+        self.retry_base_delay = settings.SUMMARY_LLM_RETRY_BASE_DELAY
+        self.retry_max_delay = settings.SUMMARY_LLM_RETRY_MAX_DELAY
+        self.retry_budget = RetryBudget(settings.SUMMARY_LLM_RETRY_BUDGET_RATIO, settings.SUMMARY_LLM_RETRY_BUDGET_MAX)
+        self.breaker = CircuitBreaker(settings.SUMMARY_LLM_BREAKER_FAILURES, settings.SUMMARY_LLM_BREAKER_RESET_SECONDS)
+        self._jitter = random.Random()
+        self._lock = threading.Lock()
+
+    def generate(self, prompt_text: str) -> LLMResponse:
+        self._start()
+        attempt = 0
+        while True:
+            attempt += 1
+            self._admit()
+            try:
+                response = self._generate(prompt_text)
+            except Exception as e:
+                time.sleep(self._retry_delay(e, attempt))
+            except BaseException:
+                self.breaker.release()
+                raise
+            else:
+                return self._succeeded(response)
+
+    async def agenerate(self, prompt_text: str) -> LLMResponse:
+        self._start()
+        attempt = 0
+        while True:
+            attempt += 1
+            self._admit()
+            try:
+                response = await asyncio.wait_for(self._agenerate(prompt_text), self.timeout)
+            except Exception as e:
+                await asyncio.sleep(self._retry_delay(e, attempt))
+            except BaseException:
+                # 호출이 취소되면(asyncio.CancelledError) half_open의 시험 호출 자리를 돌려 놓습니다.
+                self.breaker.release()
+                raise
+            else:
+                return self._succeeded(response)
+
+    def _generate(self, prompt_text: str) -> LLMResponse:
+        """한 번 호출합니다. timeout초 안에 끝나지 않으면 TimeoutError(또는 is_timeout이 True인 예외)를 내야 합니다."""
+        raise NotImplementedError
+
+    async def _agenerate(self, prompt_text: str) -> LLMResponse:
+        raise NotImplementedError
+
+    def is_timeout(self, exc: Exception) -> bool:
+        return isinstance(exc, TimeoutError)
+
+    def retryable(self, exc: Exception) -> bool:
+        """다시 시도하면 성공할 수 있는 일시적 오류인지 반환합니다. (시간 초과는 항상 재시도 대상)"""
+        return isinstance(exc, ConnectionError)
+
+    def backoff(self, attempt: int) -> float:
+        """attempt번째 시도가 실패한 뒤 기다릴 시간입니다. 지수적으로 늘린 상한 안에서 고르게 흩뜨립니다."""
+        ceiling = min(self.retry_base_delay * 2 ** (attempt - 1), self.retry_max_delay)
+        return self._jitter.uniform(0, ceiling)
+
+    def _count(self, outcome: str) -> None:
+        with self._lock:
+            self.outcomes[outcome] += 1
+
+    def _start(self) -> None:
+        with self._lock:
+            self.calls += 1
+        self.retry_budget.deposit()
+
+    def _admit(self) -> None:
+        if not self.breaker.allow():
+            self._count("rejected")
+            raise LLMUnavailableError(
+                "요약 서비스를 일시적으로 사용할 수 없습니다.", retry_after=self.breaker.retry_after() or 5
+            )
+
+    def _succeeded(self, response: LLMResponse) -> LLMResponse:
+        self.breaker.record_success()
+        with self._lock:
+            self.outcomes["success"] += 1
+            self.input_tokens += response.input_tokens
+            self.output_tokens += response.output_tokens
+        return response
+
+    def _retry_delay(self, exc: Exception, attempt: int) -> float:
+        """실패한 시도를 기록하고, 재시도할 거라면 기다릴 시간을 반환합니다. 재시도하지 않으면 예외를 냅니다."""
+        timed_out = self.is_timeout(exc)
+        self._count("timeout" if timed_out else "error")
+        if not (timed_out or self.retryable(exc)):
+            # 업스트림은 응답했으므로(잘못된 요청 등) 장애로 세지 않습니다.
+            self.breaker.record_success()
+            raise exc
+        self.breaker.record_failure()
+        if attempt >= self.max_attempts or not self.retry_budget.withdraw():
+            raise LLMUnavailableError(
+                "요약 서비스가 응답하지 않습니다.", retry_after=self.breaker.retry_after() or 5
+            ) from exc
+        self._count("retry")
+        return self.backoff(attempt)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": type(self).__name__,
+                "model": self.model,
+                "calls": self.calls,
+                "outcomes": dict(self.outcomes),
+                "input_tokens": self.input_tokens,
+                "output_tokens": self.output_tokens,
+                "breaker": self.breaker.stats(),
+            }
+
+
+class GeminiBackend(LLMBackend):
+    """
+    Gemini API 백엔드입니다.
+
+    base_url(기본값 GEMINI_BASE_URL)을 주면 그 주소로 요청합니다. (부하 테스트용 가짜 서버 등)
+    비동기 호출은 GEMINI_ASYNC_CLIENTS개의 클라이언트를 번갈아 쓰며, 이들이 GEMINI_MAX_CONNECTIONS를 나눠 가집니다.
+    httpx 연결 풀은 응답이 끝날 때마다 유휴 연결을 정리하는 비용이 연결 수의 제곱에 비례해,
+    연결 수백 개를 하나의 풀에 두면 응답이 몰릴 때 이벤트 루프가 그 계산에 묶이기 때문입니다.
+    """
+
+    model = "gemini-2.5-flash"
+
+    def __init__(self, base_url: str = "", api_key: Optional[str] = None):
+        super().__init__()
+        self.base_url = base_url or settings.GEMINI_BASE_URL
+        self.api_key = api_key or os.getenv("GEMINI_API_KEY")
+        self.client = self._client(max_connections=100)
+        count = max(settings.GEMINI_ASYNC_CLIENTS, 1)
+        per_client = max(settings.GEMINI_MAX_CONNECTIONS // count, 1)
+        self.async_clients = [self._client(max_connections=per_client) for _ in range(count)]
+        self._next_async_client = itertools.cycle(self.async_clients).__next__
+
+    def _client(self, max_connections: int) -> genai.Client:
+        http_options = {
+            # 시도별 제한 시간 (밀리초). SDK 자체 재시도는 쓰지 않고 LLMBackend가 재시도합니다.
+            "timeout": int(self.timeout * 1000),
+            "async_client_args": {
+                "limits": httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            },
+        }
+        if self.base_url:
+            http_options["base_url"] = self.base_url
+        return genai.Client(api_key=self.api_key, http_options=types.HttpOptions(**http_options))
+
+    def is_timeout(self, exc: Exception) -> bool:
+        return isinstance(exc, (TimeoutError, httpx.TimeoutException))
+
+    def retryable(self, exc: Exception) -> bool:
+        # 요청 시간 초과(408), 요청 한도 초과(429), 서버 오류(5xx)와 연결 오류만 재시도합니다.
+        if isinstance(exc, genai_errors.APIError):
+            return exc.code in (408, 429) or (exc.code or 0) >= 500
+        return isinstance(exc, (ConnectionError, httpx.TransportError))
+
+    @staticmethod
+    def _config() -> types.GenerateContentConfig:
+        return types.GenerateContentConfig(
+            thinking_config=types.ThinkingConfig(thinking_budget=0)
+        )
+
+    @staticmethod
+    def _response(response: types.GenerateContentResponse) -> LLMResponse:
+        usage = response.usage_metadata
+        return LLMResponse(
+            text=response.text or "",
+            input_tokens=(usage.prompt_token_count or 0) if usage else 0,
+            output_tokens=(usage.candidates_token_count or 0) if usage else 0,
+        )
+
+    def _generate(self, prompt_text: str) -> LLMResponse:
+        response = self.client.models.generate_content(
+            model=self.model, contents=prompt_text, config=self._config()
+        )
+        return self._response(response)
+
+    async def _agenerate(self, prompt_text: str) -> LLMResponse:
+        response = await self._next_async_client().aio.models.generate_content(
+            model=self.model, contents=prompt_text, config=self._config()
+        )
+        return self._response(response)
+
+
+# 가짜 백엔드와 가짜 Gemini 서버가 돌려주는 고정 요약 (extract_json으로 파싱 가능한 JSON 문자열)
+FAKE_SUMMARY_TEXT = json.dumps(
+    {"summary": "테스트용 요약입니다.", "feedback": "테스트용 피드백입니다."},
+    ensure_ascii=False,
+)
+
+
+class FakeLLMError(RuntimeError):
+    pass
+
+
+class FakeBackend(LLMBackend):
+    """
+    네트워크와 API 키 없이 고정 요약을 돌려주는 백엔드입니다. (부하 테스트, 벤치마크용)
+
+    - latency초 뒤에 응답하고, error_rate 확률로 FakeLLMError(재시도 대상)를 냅니다. seed를 주면 오류가 나는 순서가 매번 같습니다.
+    - latency가 timeout보다 길면 timeout초 뒤에 시간 초과로 실패합니다.
+    - input_tokens가 0이면 프롬프트 길이로 어림합니다. (estimate_tokens)
+    - 인자를 생략하면 SUMMARY_FAKE_LLM_* 설정을 씁니다.
+    """
+
+    model = "fake"
+
+    def __init__(
+        self,
+        latency: Optional[float] = None,
+        error_rate: Optional[float] = None,
+        input_tokens: Optional[int] = None,
+        output_tokens: Optional[int] = None,
+        seed: Optional[int] = None,
+    ):
+        super().__init__()
+        self.latency = settings.SUMMARY_FAKE_LLM_LATENCY if latency is None else latency
+        self.error_rate = settings.SUMMARY_FAKE_LLM_ERROR_RATE if error_rate is None else error_rate
+        self.fixed_input_tokens = settings.SUMMARY_FAKE_LLM_INPUT_TOKENS if input_tokens is None else input_tokens
+        self.fixed_output_tokens = settings.SUMMARY_FAKE_LLM_OUTPUT_TOKENS if output_tokens is None else output_tokens
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+
+    def retryable(self, exc: Exception) -> bool:
+        return isinstance(exc, (FakeLLMError, ConnectionError))
+
+    def _fails(self) -> bool:
+        with self._random_lock:
+            return self._random.random() < self.error_rate
+
+    def _response(self, prompt_text: str) -> LLMResponse:
+        return LLMResponse(
+            text=FAKE_SUMMARY_TEXT,
+            input_tokens=self.fixed_input_tokens or estimate_tokens(prompt_text),
+            output_tokens=self.fixed_output_tokens,
+        )
+
+    def _generate(self, prompt_text: str) -> LLMResponse:
+        if self.latency > self.timeout:
+            time.sleep(self.timeout)
+            raise TimeoutError(f"가짜 LLM 응답이 {self.timeout:g}초 안에 오지 않았습니다.")
+        time.sleep(self.latency)
+        if self._fails():
+            raise FakeLLMError("가짜 LLM 오류입니다.")
+        return self._response(prompt_text)
+
+    async def _agenerate(self, prompt_text: str) -> LLMResponse:
+        await asyncio.sleep(self.latency)
+        if self._fails():
+            raise FakeLLMError("가짜 LLM 오류입니다.")
+        return self._response(prompt_text)
+
+
+@lru_cache(maxsize=None)
+def get_backend() -> LLMBackend:
+    """SUMMARY_LLM_BACKEND 설정의 백엔드를 프로세스마다 한 번 만들어 씁니다."""
+    return import_string(settings.SUMMARY_LLM_BACKEND)()
@@ -0,0 +1,215 @@
+import datetime
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.utils import timezone
+
+from apps.summary.models import AIDailySummary
+from apps.summary.services.generation import NoUsageError, SummaryPendingError, get_or_generate_summary
+from apps.summary.services.rate_limit import TokenBucket
+from apps.usage.models import UsageRecord
+from apps.usage.services.intervals import default_timezone, parse_timezone
+from apps.users.models import Profile
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PregenerateReport:
+    candidates: int = 0
+    skipped: int = 0  # 체크포인트에서 이미 처리된 사용자
+    generated: int = 0
+    no_usage: int = 0
+    pending: int = 0  # 다른 요청이 생성 중이라 기다리다 시간 초과
+    failed: int = 0
+    elapsed: float = 0.0
+    rate_limited: float = 0.0  # 요청 속도 제한으로 기다린 시간 합계(초)
+    latencies: list[float] = field(default_factory=list)
+    errors: dict[int, str] = field(default_factory=dict)
+
+    @property
+    def per_minute(self) -> float:
+        return self.generated * 60 / self.elapsed if self.elapsed else 0.0
+
+    def latency(self, q: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def checkpoint_path(target_date: datetime.date) -> Path:
+    return Path(settings.SUMMARY_PREGENERATE_CHECKPOINT_DIR) / f"{target_date.isoformat()}.json"
+
+
+class Checkpoint:
+    """
+    처리를 마친 사용자 id를 파일에 기록합니다. 중단된 실행을 다시 시작하면 이 사용자들은 건너뜁니다.
+
+    실패한 사용자는 기록하지 않으므로 다음 실행에서 다시 시도합니다.
+    """
+
+    def __init__(self, path: Path, target_date: datetime.date, flush_every: int = 20):
+        self.path = path
+        self.target_date = target_date
+        self.flush_every = flush_every
+        self.done: set[int] = set()
+        self._unsaved = 0
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        if not self.path.exists():
+            return
+        data = json.loads(self.path.read_text(encoding="utf-8"))
+        if data.get("date") == self.target_date.isoformat():
+            self.done = set(data.get("done", []))
+
+    def mark(self, user_id: int) -> None:
+        with self._lock:
+            self.done.add(user_id)
+            self._unsaved += 1
+            if self._unsaved >= self.flush_every:
+                self._save()
+
+    def save(self) -> None:
+        with self._lock:
+            self._save()
+
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(
+            json.dumps({"date": self.target_date.isoformat(), "done": sorted(self.done)}),
+            encoding="utf-8",
+        )
+        os.replace(tmp, self.path)
+        self._unsaved = 0
+
+
+def local_yesterdays(now: Optional[datetime.datetime] = None) -> dict[datetime.date, list[int]]:
+    """
+    사용자마다 자기 시간대(프로필)의 '어제'를 골라 {날짜: 사용자 id 목록}으로 묶습니다. (--date 없이 실행할 때의 대상)
+
+    local_date가 사용자 시간대 기준이므로 서버 시간대의 어제를 쓰면 시간대가 다른 사용자는 하루 어긋납니다.
+    어느 시간대에서든 어제는 UTC 기준 어제 ±1일 안에 있으므로, 그 사흘 치 기록이 있는 사용자만 확인합니다.
+    """
+    now = now or timezone.now()
+    utc_yesterday = now.astimezone(datetime.timezone.utc).date() - datetime.timedelta(days=1)
+    candidates = [utc_yesterday + datetime.timedelta(days=offset) for offset in (-1, 0, 1)]
+    user_dates = (
+        UsageRecord.objects.filter(local_date__in=candidates)
+        .exclude(user_id=None)
+        .values_list("user_id", "local_date")
+        .distinct()
+    )
+    dates_by_user: dict[int, set[datetime.date]] = {}
+    for user_id, local_date in user_dates:
+        dates_by_user.setdefault(user_id, set()).add(local_date)
+    timezones = dict(Profile.objects.filter(user_id__in=dates_by_user).values_list("user_id", "timezone"))
+
+    targets: dict[datetime.date, list[int]] = {}
+    for user_id in sorted(dates_by_user):
+        tz = parse_timezone(timezones.get(user_id)) or default_timezone()
+        yesterday = now.astimezone(tz).date() - datetime.timedelta(days=1)
+        if yesterday in dates_by_user[user_id]:
+            targets.setdefault(yesterday, []).append(user_id)
+    return dict(sorted(targets.items()))
+
+
+def pending_user_ids(target_date: datetime.date, user_ids: Optional[list[int]] = None) -> list[int]:
+    """
+    target_date(local_date)에 사용 기록이 있고 아직 요약이 없는 사용자 id 목록입니다.
+
+    user_ids가 주어지면 그 사용자들 중에서만 찾습니다.
+    """
+    summarized = AIDailySummary.objects.filter(date=target_date).values("user_id")
+    records = UsageRecord.objects.filter(local_date=target_date)
+    if user_ids is not None:
+        records = records.filter(user_id__in=user_ids)
+    return list(
+        records
+        .exclude(user_id=None)
+        .exclude(user_id__in=summarized)
+        .order_by("user_id")
+        .values_list("user_id", flat=True)
+        .distinct()
+    )
+
+
+def pregenerate_summaries(
+    target_date: datetime.date,
+    threads: int,
+    rate_per_minute: float,
+    checkpoint: Optional[Checkpoint] = None,
+    progress: Optional[Callable[[int, str], None]] = None,
+    user_ids: Optional[list[int]] = None,
+) -> PregenerateReport:
+    """
+    target_date 요약이 없는 사용자들의 요약을 미리 생성합니다. user_ids가 주어지면 그 사용자들만 처리합니다.
+
+    - threads개의 스레드로 동시에 생성하고, Gemini 호출은 분당 rate_per_minute회로 제한합니다.
+    - 생성은 get_or_generate_summary를 거치므로 같은 시각의 사용자 요청과 중복으로 생성하지 않습니다.
+    - checkpoint가 주어지면 처리가 끝난 사용자를 기록하고, 이미 기록된 사용자는 건너뜁니다.
+    """
+    report = PregenerateReport()
+    user_ids = pending_user_ids(target_date, user_ids)
+    report.candidates = len(user_ids)
+    if checkpoint is not None:
+        before = len(user_ids)
+        user_ids = [user_id for user_id in user_ids if user_id not in checkpoint.done]
+        report.skipped = before - len(user_ids)
+
+    bucket = TokenBucket(rate_per_minute)
+    lock = threading.Lock()
+
+    def run(user_id: int) -> None:
+        try:
+            bucket.acquire()
+            started = time.monotonic()
+            user = User.objects.get(pk=user_id)
+            get_or_generate_summary(user, target_date)
+            outcome = "generated"
+        except NoUsageError:
+            outcome = "no_usage"
+        except SummaryPendingError:
+            outcome = "pending"
+        except Exception as e:
+            logger.exception("요약 미리 생성 실패 (user %s, %s)", user_id, target_date)
+            outcome = "failed"
+            with lock:
+                report.errors[user_id] = f"{type(e).__name__}: {e}"
+        finally:
+            connection.close()
+
+        with lock:
+            setattr(report, outcome, getattr(report, outcome) + 1)
+            if outcome == "generated":
+                report.latencies.append(time.monotonic() - started)
+        if checkpoint is not None and outcome in ("generated", "no_usage"):
+            checkpoint.mark(user_id)
+        if progress:
+            progress(user_id, outcome)
+
+    started = time.monotonic()
+    pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="summary-pregenerate")
+    try:
+        for future in [pool.submit(run, user_id) for user_id in user_ids]:
+            future.result()
+    finally:
+        # 중단(Ctrl+C 등)되면 아직 시작하지 않은 사용자는 취소하고, 생성 중인 요약만 마친 뒤 체크포인트를 저장합니다.
+        pool.shutdown(wait=True, cancel_futures=True)
+        if checkpoint is not None:
+            checkpoint.save()
+        report.elapsed = time.monotonic() - started
+        report.rate_limited = bucket.waited
+    return report
@@ -0,0 +1,182 @@
+import datetime
+import logging
+import math
+import threading
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# 시작 시각(사용자 시간대)으로 나누는 시간대: (시작 시, 이름)
+TIME_OF_DAY = ((0, "새벽"), (6, "오전"), (12, "오후"), (18, "저녁"))
+
+
+def estimate_tokens(text: str) -> int:
+    """토큰 수 어림값입니다. 한글 위주 텍스트는 대략 2자당 1토큰입니다."""
+    return math.ceil(len(text) / 2)
+
+
+def format_duration(ms: int) -> str:
+    minutes = round(ms / 1000 / 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours and minutes:
+        return f"{hours}시간 {minutes}분"
+    if hours:
+        return f"{hours}시간"
+    return f"{minutes}분"
+
+
+def time_of_day(ms: int, tz: ZoneInfo) -> str:
+    hour = datetime.datetime.fromtimestamp(ms / 1000, tz).hour
+    name = TIME_OF_DAY[0][1]
+    for start, period in TIME_OF_DAY:
+        if hour >= start:
+            name = period
+    return name
+
+
+@dataclass
+class AppUsage:
+    """한 앱의 하루 사용 기록을 합친 값입니다. (총 사용 시간, 사용 횟수, 시간대별 사용 시간, 중복을 뺀 메모)"""
+
+    app_name: str
+    total_ms: int = 0
+    sessions: int = 0
+    periods: dict[str, int] = field(default_factory=dict)
+    memos: list[str] = field(default_factory=list)
+
+    def add(self, record, tz: ZoneInfo) -> None:
+        usage_ms = record.usage_time_ms or 0
+        self.total_ms += usage_ms
+        self.sessions += 1
+        if record.start_time is not None:
+            period = time_of_day(record.start_time, tz)
+            self.periods[period] = self.periods.get(period, 0) + usage_ms
+        memo = record.memo.strip() if record.memo else ""
+        if memo and memo not in self.memos:
+            self.memos.append(memo)
+
+    def line(self, max_memos: int) -> str:
+        line = f"{self.app_name} - 총 {format_duration(self.total_ms)}, {self.sessions}회"
+        # 1분 미만인 시간대는 빼고, 많이 쓴 시간대부터 적습니다.
+        periods = [
+            f"{period} {format_duration(ms)}"
+            for period, ms in sorted(self.periods.items(), key=lambda item: -item[1])
+            if round(ms / 1000 / 60) > 0
+        ]
+        if periods:
+            line += f" ({', '.join(periods)})"
+        if self.memos:
+            memos = " / ".join(self.memos[:max_memos])
+            if len(self.memos) > max_memos:
+                memos += f" 외 {len(self.memos) - max_memos}개"
+            line += f" - 메모: {memos}"
+        return line
+
+
+def aggregate_records(records: Iterable, tz: ZoneInfo) -> list[AppUsage]:
+    """사용 기록을 앱별로 합쳐 총 사용 시간이 긴 순서로 반환합니다."""
+    apps: dict[str, AppUsage] = {}
+    for record in records:
+        app_name = record.app.app_name if record.app else "알 수 없음"
+        usage = apps.get(app_name)
+        if usage is None:
+            usage = apps[app_name] = AppUsage(app_name)
+        usage.add(record, tz)
+    return sorted(apps.values(), key=lambda usage: (-usage.total_ms, usage.app_name))
+
+
+@dataclass
+class CompactionResult:
+    text: str
+    records: int
+    apps: int
+    included_apps: int
+    tokens_before: int
+    tokens_after: int
+
+
+class CompactionStats:
+    """프롬프트 압축 전후의 입력 토큰 수(어림값)를 프로세스별로 집계합니다."""
+
+    def __init__(self):
+        self.prompts = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+        self.truncated = 0
+        self._lock = threading.Lock()
+
+    def record(self, result: CompactionResult) -> None:
+        with self._lock:
+            self.prompts += 1
+            self.tokens_before += result.tokens_before
+            self.tokens_after += result.tokens_after
+            if result.included_apps < result.apps:
+                self.truncated += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "prompts": self.prompts,
+                "tokens_before": self.tokens_before,
+                "tokens_after": self.tokens_after,
+                "saved_ratio": round(1 - self.tokens_after / self.tokens_before, 4) if self.tokens_before else 0.0,
+                "truncated": self.truncated,
+            }
+
+
+compaction_stats = CompactionStats()
+
+
+def compact_records(
+    records: list,
+    tz: ZoneInfo,
+    token_budget: Optional[int] = None,
+    max_memos: Optional[int] = None,
+    uncompacted_text: str = "",
+) -> CompactionResult:
+    """
+    하루 사용 기록을 앱별 한 줄로 압축한 프롬프트 입력을 만듭니다.
+
+    앱 줄이 token_budget(기본값 SUMMARY_PROMPT_TOKEN_BUDGET, 0이면 제한 없음)을 넘으면
+    사용 시간이 가장 짧은 앱부터 빼고 "그 외 앱 N개" 한 줄로 합칩니다. 사용 시간이 가장 긴 앱은 항상 남깁니다.
+    uncompacted_text(기록마다 한 줄인 기존 형식)를 주면 압축 전 토큰 수로 씁니다.
+    """
+    token_budget = settings.SUMMARY_PROMPT_TOKEN_BUDGET if token_budget is None else token_budget
+    max_memos = settings.SUMMARY_PROMPT_MAX_MEMOS if max_memos is None else max_memos
+
+    apps = aggregate_records(records, tz)
+    lines = [usage.line(max_memos) for usage in apps]
+    included = len(lines)
+    text = "\n".join(lines)
+    if token_budget > 0:
+        while included > 1 and estimate_tokens(text) > token_budget:
+            included -= 1
+            dropped = apps[included:]
+            other = (
+                f"그 외 앱 {len(dropped)}개 - 총 {format_duration(sum(usage.total_ms for usage in dropped))}, "
+                f"{sum(usage.sessions for usage in dropped)}회"
+            )
+            text = "\n".join(lines[:included] + [other])
+
+    result = CompactionResult(
+        text=text,
+        records=len(records),
+        apps=len(apps),
+        included_apps=included,
+        tokens_before=estimate_tokens(uncompacted_text or text),
+        tokens_after=estimate_tokens(text),
+    )
+    compaction_stats.record(result)
+    logger.info(
+        "요약 프롬프트 압축: 기록 %d건 → 앱 %d개 중 %d개, 입력 토큰 %d → %d",
+        result.records,
+        result.apps,
+        result.included_apps,
+        result.tokens_before,
+        result.tokens_after,
+    )
+    return result
@@ -0,0 +1,66 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    분당 rate_per_minute개씩 채워지고 최대 capacity개까지 쌓이는 토큰 버킷입니다.
+
+    acquire()는 토큰이 생길 때까지 기다리므로, 여러 스레드가 함께 써도 전체 호출 속도가 제한됩니다.
+    rate_per_minute가 0 이하이면 제한하지 않습니다.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: float = 1.0, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(capacity, 1.0)
+        self.tokens = self.capacity
+        self.waited = 0.0
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """토큰 하나를 가져가고, 기다린 시간(초)을 반환합니다."""
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    self.waited += waited
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            self._sleep(delay)
+            waited += delay
+
+
+class RetryBudget:
+    """
+    재시도 횟수를 전체 호출 수의 일정 비율로 제한하는 예산입니다.
+
+    호출마다 ratio개씩, 최대 capacity개까지 쌓이고 재시도마다 1개씩 씁니다.
+    업스트림이 오래 장애일 때 모든 호출이 최대 횟수까지 재시도해 부하를 몇 배로 키우는 것을 막습니다.
+    """
+
+    def __init__(self, ratio: float, capacity: float):
+        self.ratio = ratio
+        self.capacity = max(capacity, 0.0)
+        self.tokens = self.capacity
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        """재시도할 수 있으면 토큰 하나를 쓰고 True를 반환합니다."""
+        with self._lock:
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
@@ -0,0 +1,80 @@
+import hashlib
+import threading
+from typing import Optional
+
+from django.core.cache import caches
+
+
+class SummaryCache:
+    """
+    Gemini 요약 응답(파싱된 JSON)을 입력 내용의 해시로 저장하는 캐시입니다.
+
+    - 키는 모델 이름, 프롬프트 버전, 사용 기록 텍스트의 sha256이므로, 입력이 같으면 사용자가 달라도 같은 응답을 씁니다.
+    - 유효 시간과 크기 제한은 CACHES["summary"] 설정(TIMEOUT, MAX_ENTRIES)을 따릅니다.
+    - hit/miss 횟수는 프로세스별로 집계합니다.
+    """
+
+    def __init__(self, alias: str):
+        self.alias = alias
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    @staticmethod
+    def key(model: str, prompt_version: str, user_data: str) -> str:
+        digest = hashlib.sha256("\0".join((model, prompt_version, user_data)).encode("utf-8")).hexdigest()
+        return f"summary:{digest}"
+
+    def get(self, key: str) -> Optional[dict]:
+        data = self.backend.get(key)
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return data
+
+    def set(self, key: str, data: dict) -> None:
+        self.backend.set(key, data)
+        with self._lock:
+            self.stores += 1
+
+    async def aget(self, key: str) -> Optional[dict]:
+        data = await self.backend.aget(key)
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return data
+
+    async def aset(self, key: str, data: dict) -> None:
+        await self.backend.aset(key, data)
+        with self._lock:
+            self.stores += 1
+
+    def clear(self) -> None:
+        self.backend.clear()
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.stores = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "backend": type(self.backend).__name__,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+summary_cache = SummaryCache("summary")
@@ -1,3 +1,500 @@
-from django.test import TestCase
+import asyncio
+import datetime
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from ninja.testing import TestAsyncClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.summary.api import router
+from apps.summary.models import AIDailySummary, AISummaryJob
+from apps.summary.services.circuit_breaker import CircuitBreaker
+from apps.summary.services.fake_gemini import FakeGeminiServer
+from apps.summary.services.gemini_service import SummaryParseError, generate_summary, request_summary
+from apps.summary.services.generation import aget_or_generate_summary, get_or_generate_summary
+from apps.summary.services.llm_backends import (
+    FakeBackend,
+    GeminiBackend,
+    LLMBackend,
+    LLMResponse,
+    LLMUnavailableError,
+    get_backend,
+)
+from apps.summary.services.pregenerate import PregenerateReport, local_yesterdays
+from apps.summary.services.prompt_compaction import compact_records
+from apps.summary.services.summary_cache import summary_cache
+from apps.usage.models import AppInfo, UsageRecord
+from apps.users.models import Profile
+
+
+class AsyncSingleFlightTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="tester", password="pw")
+
+    async def test_cancelled_leader_releases_claim_and_waiter_takes_over(self):
+        target_date = datetime.date(2025, 3, 1)
+        calls = 0
+        leader_started = asyncio.Event()
+
+        async def fake_generate(user, day):
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                leader_started.set()
+                await asyncio.sleep(3600)
+            return True, "오늘의 요약"
+
+        with mock.patch("apps.summary.services.generation.agenerate_summary", fake_generate):
+            leader = asyncio.create_task(aget_or_generate_summary(self.user, target_date, timeout=5))
+            await leader_started.wait()
+            waiter = asyncio.create_task(aget_or_generate_summary(self.user, target_date, timeout=5))
+            await asyncio.sleep(0.05)
+
+            leader.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await leader
+            summary = await waiter
+
+        self.assertEqual(summary.message, "오늘의 요약")
+        self.assertEqual(calls, 2)
+        job = await AISummaryJob.objects.aget(user=self.user, date=target_date)
+        # 취소된 선점은 바로 풀렸고, 이어받은 요청이 다시 선점해서 완료했습니다. (요청 경로의 선점은 워커 시도 횟수를 세지 않음)
+        self.assertEqual((job.status, job.attempts), (AISummaryJob.Status.DONE, 0))
+        self.assertTrue(await AIDailySummary.objects.filter(user=self.user, date=target_date).aexists())
+
+
+class InteractiveClaimTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="tester", password="pw")
+
+    def test_failed_request_leaves_queued_job_to_the_worker(self):
+        target_date = datetime.date(2025, 3, 1)
+        next_attempt_at = timezone.now() + datetime.timedelta(minutes=10)
+        job = AISummaryJob.objects.create(
+            user=self.user, date=target_date, status=AISummaryJob.Status.PENDING, attempts=2, next_attempt_at=next_attempt_at
+        )
+
+        with mock.patch("apps.summary.services.generation.generate_summary", side_effect=RuntimeError("LLM 오류")):
+            with self.assertRaises(RuntimeError):
+                get_or_generate_summary(self.user, target_date)
+
+        job.refresh_from_db()
+        self.assertEqual(
+            (job.status, job.attempts, job.next_attempt_at, job.last_error),
+            (AISummaryJob.Status.PENDING, 2, next_attempt_at, "RuntimeError: LLM 오류"),
+        )
+
+    async def test_cancelled_request_restores_job(self):
+        target_date = datetime.date(2025, 3, 1)
+        next_attempt_at = timezone.now() + datetime.timedelta(minutes=10)
+        job = await AISummaryJob.objects.acreate(
+            user=self.user, date=target_date, status=AISummaryJob.Status.PENDING, attempts=2,
+            last_error="이전 오류", next_attempt_at=next_attempt_at,
+        )
+        started = asyncio.Event()
+
+        async def hanging_generate(user, day):
+            started.set()
+            await asyncio.sleep(3600)
+
+        with mock.patch("apps.summary.services.generation.agenerate_summary", hanging_generate):
+            request = asyncio.create_task(aget_or_generate_summary(self.user, target_date, timeout=5))
+            await started.wait()
+            await job.arefresh_from_db()
+            self.assertEqual(job.status, AISummaryJob.Status.RUNNING)
+
+            request.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await request
+
+        await job.arefresh_from_db()
+        self.assertEqual(
+            (job.status, job.attempts, job.next_attempt_at, job.last_error),
+            (AISummaryJob.Status.PENDING, 2, next_attempt_at, "이전 오류"),
+        )
+
+
+class TextBackend(LLMBackend):
+    """정해진 text를 그대로 응답하는 백엔드입니다. 받은 프롬프트는 prompts에 남깁니다."""
+    model = "text"
+
+    def __init__(self, text: str):
+        super().__init__()
+        self.text = text
+        self.prompts = []
+
+    def _generate(self, prompt_text):
+        self.prompts.append(prompt_text)
+        return LLMResponse(text=self.text)
+
+    async def _agenerate(self, prompt_text):
+        return LLMResponse(text=self.text)
+
+
+class PromptCompactionTests(TestCase):
+    tz = ZoneInfo("Asia/Seoul")
+
+    def record(self, app_name, hour, minutes, memo=None, start_minute=0):
+        start = datetime.datetime(2025, 3, 1, hour, start_minute, tzinfo=self.tz)
+        return SimpleNamespace(
+            app=SimpleNamespace(app_name=app_name),
+            usage_time_ms=minutes * 60 * 1000,
+            start_time=int(start.timestamp() * 1000),
+            memo=memo,
+        )
+
+    def test_records_are_summed_per_app(self):
+        records = [
+            self.record("YouTube", 9, 40),
+            self.record("YouTube", 20, 15, memo="강의 시청"),
+            self.record("YouTube", 21, 5, memo=" 강의 시청 "),
+            self.record("Chrome", 23, 10, memo="검색"),
+        ]
+
+        result = compact_records(records, self.tz, token_budget=0)
+
+        self.assertEqual(result.text.splitlines(), [
+            "YouTube - 총 1시간, 3회 (오전 40분, 저녁 20분) - 메모: 강의 시청",
+            "Chrome - 총 10분, 1회 (저녁 10분) - 메모: 검색",
+        ])
+        self.assertEqual((result.records, result.apps, result.included_apps), (4, 2, 2))
+
+    def test_memos_are_limited(self):
+        records = [self.record("메모장", 10, 1, memo=f"메모 {i}", start_minute=i) for i in range(4)]
+
+        result = compact_records(records, self.tz, token_budget=0, max_memos=2)
+
+        self.assertTrue(result.text.endswith("메모: 메모 0 / 메모 1 외 2개"), result.text)
+
+    def test_shortest_apps_are_folded_into_one_line_over_budget(self):
+        records = [self.record(f"앱{i:02d}", 10, 60 - i, memo="아주 긴 메모 " * 5) for i in range(30)]
+        uncompacted = "\n".join(f"앱{i:02d} - {60 - i}분" for i in range(30))
+
+        result = compact_records(records, self.tz, token_budget=200, uncompacted_text=uncompacted)
+
+        lines = result.text.splitlines()
+        self.assertTrue(lines[0].startswith("앱00 - 총 1시간, 1회"))
+        self.assertEqual(len(lines), result.included_apps + 1)
+        dropped = 30 - result.included_apps
+        self.assertTrue(lines[-1].startswith(f"그 외 앱 {dropped}개 - 총 "), lines[-1])
+        self.assertTrue(lines[-1].endswith(f"{dropped}회"))
+        self.assertLessEqual(result.tokens_after, 200)
+        # 가장 긴 앱 하나는 예산을 넘어도 남깁니다.
+        self.assertEqual(compact_records(records, self.tz, token_budget=1).included_apps, 1)
+
+    def test_generated_prompt_uses_compacted_lines(self):
+        user = User.objects.create_user(username="tester", password="pw")
+        Profile.objects.create(user=user, timezone="Asia/Seoul")
+        app = AppInfo.objects.create(package_name="com.google.youtube", app_name="YouTube")
+        for i, minutes in enumerate((30, 20, 10)):
+            start = self.record("YouTube", 9 + i, minutes).start_time
+            UsageRecord.objects.create(
+                user=user, app=app, usage_time_ms=minutes * 60 * 1000, start_time=start,
+                end_time=start + minutes * 60 * 1000, local_date=datetime.date(2025, 3, 1),
+            )
+        backend = TextBackend('{"summary": "요약", "feedback": "피드백"}')
+        summary_cache.clear()
+        self.addCleanup(summary_cache.clear)
+
+        with mock.patch("apps.summary.services.gemini_service.get_backend", return_value=backend):
+            self.assertEqual(generate_summary(user, datetime.date(2025, 3, 1)), (True, "요약 피드백"))
+
+        self.assertIn("YouTube - 총 1시간, 3회 (오전 1시간)", backend.prompts[0])
+        self.assertNotIn("YouTube - 30분", backend.prompts[0])
+
+
+class SummaryCacheTests(TestCase):
+    def setUp(self):
+        summary_cache.clear()
+        self.addCleanup(summary_cache.clear)
+
+    def test_same_input_is_served_from_cache(self):
+        backend = FakeBackend(latency=0, error_rate=0)
+
+        first = request_summary("앱 - 10분", backend)
+        self.assertEqual(request_summary("앱 - 10분", backend), first)
+        self.assertEqual(backend.calls, 1)
+
+        # 입력이나 모델이 다르면 키가 달라 다시 호출합니다.
+        request_summary("앱 - 20분", backend)
+        self.assertEqual(backend.calls, 2)
+        other = TextBackend('{"summary": "다른 모델", "feedback": "피드백"}')
+        self.assertEqual(request_summary("앱 - 10분", other)["summary"], "다른 모델")
+
+        stats = summary_cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["stores"]), (1, 3, 3))
+
+    def test_unparsable_response_is_logged_without_raw_text_and_not_cached(self):
+        backend = TextBackend("요약할 수 없습니다: 비밀 메모")
+
+        with self.assertLogs("apps.summary.services.gemini_service", "WARNING") as logs:
+            for _ in range(2):
+                with self.assertRaises(SummaryParseError):
+                    request_summary("앱 - 10분", backend)
+
+        self.assertNotIn("비밀 메모", "\n".join(logs.output))
+        # 캐시에 넣지 않았으므로 두 번 모두 백엔드를 호출합니다.
+        self.assertEqual((backend.calls, summary_cache.stats()["stores"]), (2, 0))
+
+    def test_response_without_feedback_is_a_parse_error(self):
+        with self.assertRaisesMessage(SummaryParseError, "feedback"):
+            request_summary("앱 - 10분", TextBackend('{"summary": "요약만 있음"}'))
+        self.assertEqual(summary_cache.stats()["stores"], 0)
+
+
+class BackendSelectionTests(TestCase):
+    def setUp(self):
+        summary_cache.clear()
+        self.addCleanup(summary_cache.clear)
+        get_backend.cache_clear()
+        self.addCleanup(get_backend.cache_clear)
+
+    @override_settings(
+        SUMMARY_LLM_BACKEND="apps.summary.services.llm_backends.FakeBackend",
+        SUMMARY_FAKE_LLM_LATENCY=0,
+        SUMMARY_FAKE_LLM_OUTPUT_TOKENS=7,
+    )
+    def test_backend_comes_from_settings(self):
+        backend = get_backend()
+
+        self.assertIsInstance(backend, FakeBackend)
+        self.assertIs(get_backend(), backend)
+        self.assertEqual(request_summary("앱 - 10분")["summary"], "테스트용 요약입니다.")
+        stats = backend.stats()
+        self.assertEqual((stats["calls"], stats["output_tokens"]), (1, 7))
+        self.assertGreater(stats["input_tokens"], 0)
+
+    @override_settings(SUMMARY_LLM_MAX_ATTEMPTS=1, SUMMARY_LLM_BREAKER_FAILURES=100)
+    def test_seeded_fake_fails_in_the_same_order(self):
+        def outcomes(backend):
+            result = []
+            for _ in range(20):
+                try:
+                    backend.generate("앱 - 10분")
+                    result.append(True)
+                except LLMUnavailableError:
+                    result.append(False)
+            return result
+
+        first = outcomes(FakeBackend(latency=0, error_rate=0.5, seed=3))
+
+        self.assertEqual(outcomes(FakeBackend(latency=0, error_rate=0.5, seed=3)), first)
+        self.assertIn(True, first)
+        self.assertIn(False, first)
+
+
+class SummaryEndpointTests(TestCase):
+    """GET /api/summary를 LLM 백엔드만 바꿔서 호출합니다."""
+
+    target_date = datetime.date(2025, 3, 1)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="tester", password="pw")
+        app = AppInfo.objects.create(package_name="com.example.app", app_name="app")
+        UsageRecord.objects.create(
+            user=cls.user, app=app, usage_time_ms=60000, start_time=0, end_time=60000, local_date=cls.target_date
+        )
+
+    def setUp(self):
+        summary_cache.clear()
+        self.addCleanup(summary_cache.clear)
+        self.client = TestAsyncClient(router)
+        self.headers = {"Authorization": f"Bearer {RefreshToken.for_user(self.user).access_token}"}
+
+    async def get_summary(self, backend: LLMBackend):
+        with mock.patch("apps.summary.services.gemini_service.get_backend", return_value=backend):
+            return await self.client.get(f"?date={self.target_date}", headers=self.headers)
+
+    async def test_repeat_read_is_304(self):
+        response = await self.get_summary(FakeBackend(latency=0, error_rate=0))
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+
+        response = await self.client.get(
+            f"?date={self.target_date}", headers={**self.headers, "If-None-Match": etag}
+        )
+        self.assertEqual((response.status_code, response["ETag"]), (304, etag))
+        response = await self.client.get(
+            f"?date={self.target_date}", headers={**self.headers, "If-None-Match": '"other"'}
+        )
+        self.assertEqual((response.status_code, response["ETag"]), (200, etag))
+
+    async def test_unparsable_response_is_502_and_releases_claim(self):
+        response = await self.get_summary(TextBackend("JSON이 아닌 응답"))
+
+        self.assertEqual(response.status_code, 502)
+        job = await AISummaryJob.objects.aget(user=self.user, date=self.target_date)
+        self.assertEqual(job.status, AISummaryJob.Status.PENDING)
+        self.assertIn("SummaryParseError", job.last_error)
+        self.assertFalse(await AIDailySummary.objects.filter(user=self.user).aexists())
+
+    async def test_open_breaker_is_503_with_retry_after(self):
+        now = [0.0]
+        backend = FakeBackend(latency=0, error_rate=0)
+        backend.breaker = CircuitBreaker(failure_threshold=1, reset_seconds=30, clock=lambda: now[0])
+        backend.breaker.record_failure()
+        now[0] = 12
+
+        response = await self.get_summary(backend)
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "18")
+        # 회로가 열려 있으면 업스트림을 부르지 않습니다.
+        self.assertEqual(backend.stats()["outcomes"]["rejected"], 1)
+        self.assertEqual(backend.stats()["outcomes"]["success"], 0)
+
+
+@override_settings(
+    SUMMARY_LLM_RETRY_BASE_DELAY=0,
+    SUMMARY_LLM_BREAKER_FAILURES=100,
+    SUMMARY_LLM_RETRY_BUDGET_RATIO=0,
+    SUMMARY_LLM_RETRY_BUDGET_MAX=100,
+)
+class LLMResilienceTests(TestCase):
+    """SUMMARY_LLM_* 설정에 따른 시간 초과, 재시도 한도, 재시도 예산을 확인합니다. (재시도 간격 0)"""
+
+    def outcomes(self, backend: LLMBackend) -> dict:
+        return {name: count for name, count in backend.stats()["outcomes"].items() if count}
+
+    @override_settings(SUMMARY_LLM_TIMEOUT=0.05, SUMMARY_LLM_MAX_ATTEMPTS=2)
+    async def test_slow_fake_backend_times_out_on_every_attempt(self):
+        backend = FakeBackend(latency=1, error_rate=0)
+
+        with self.assertRaises(LLMUnavailableError):
+            await backend.agenerate("prompt")
+
+        self.assertEqual(self.outcomes(backend), {"timeout": 2, "retry": 1})
+
+    @override_settings(SUMMARY_LLM_TIMEOUT=0.2, SUMMARY_LLM_MAX_ATTEMPTS=1, GEMINI_ASYNC_CLIENTS=1)
+    def test_gemini_client_times_out_against_slow_server(self):
+        with FakeGeminiServer(latency=2) as server:
+            backend = GeminiBackend(base_url=server.base_url, api_key="fake")
+            with self.assertRaises(LLMUnavailableError):
+                backend.generate("prompt")
+            with self.assertRaises(LLMUnavailableError):
+                asyncio.run(backend.agenerate("prompt"))
+
+        self.assertEqual(self.outcomes(backend), {"timeout": 2})
+
+    @override_settings(SUMMARY_LLM_MAX_ATTEMPTS=3)
+    def test_retries_stop_at_max_attempts(self):
+        backend = FakeBackend(latency=0, error_rate=1)
+
+        with self.assertRaises(LLMUnavailableError):
+            backend.generate("prompt")
+
+        self.assertEqual(self.outcomes(backend), {"error": 3, "retry": 2})
+
+    @override_settings(SUMMARY_LLM_MAX_ATTEMPTS=5, SUMMARY_LLM_RETRY_BUDGET_MAX=1)
+    def test_retries_stop_when_budget_is_spent(self):
+        backend = FakeBackend(latency=0, error_rate=1)
+
+        # 예산 1개: 첫 호출은 한 번 재시도하고, 다음 호출은 재시도 없이 실패합니다.
+        for _ in range(2):
+            with self.assertRaises(LLMUnavailableError):
+                backend.generate("prompt")
+
+        self.assertEqual(self.outcomes(backend), {"error": 3, "retry": 1})
+
+
+class HangingBackend(LLMBackend):
+    model = "hanging"
+
+    def __init__(self):
+        super().__init__()
+        self.started = asyncio.Event()
+
+    async def _agenerate(self, prompt_text):
+        self.started.set()
+        await asyncio.sleep(3600)
+
+
+class CircuitBreakerTests(TestCase):
+    async def test_cancelled_trial_is_released(self):
+        now = [0.0]
+        backend = HangingBackend()
+        backend.timeout = 3600
+        backend.breaker = CircuitBreaker(failure_threshold=1, reset_seconds=10, clock=lambda: now[0])
+        backend.breaker.record_failure()
+        now[0] = 10
+        self.assertEqual(backend.breaker.state, CircuitBreaker.HALF_OPEN)
+
+        trial = asyncio.create_task(backend.agenerate("prompt"))
+        await backend.started.wait()
+        # 시험 호출이 진행 중이면 다른 호출은 막힙니다.
+        self.assertFalse(backend.breaker.allow())
+
+        trial.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await trial
+
+        self.assertEqual(backend.breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertTrue(backend.breaker.allow())
+
+
+class PregenerateTargetDateTests(TestCase):
+    # UTC 3월 2일 03:00 = 서울 3월 2일 12:00 = 로스앤젤레스 3월 1일 19:00
+    now = datetime.datetime(2025, 3, 2, 3, tzinfo=datetime.timezone.utc)
+
+    @classmethod
+    def setUpTestData(cls):
+        app = AppInfo.objects.create(package_name="com.example.app", app_name="app")
+        cls.seoul = User.objects.create_user(username="seoul", password="pw")
+        cls.la = User.objects.create_user(username="la", password="pw")
+        Profile.objects.create(user=cls.seoul, timezone="Asia/Seoul")
+        Profile.objects.create(user=cls.la, timezone="America/Los_Angeles")
+        for i, (user, day) in enumerate([
+            (cls.seoul, datetime.date(2025, 3, 1)),
+            (cls.la, datetime.date(2025, 2, 28)),
+            (cls.la, datetime.date(2025, 3, 1)),  # 로스앤젤레스는 아직 3월 1일이므로 대상이 아님
+        ]):
+            UsageRecord.objects.create(
+                user=user, app=app, usage_time_ms=60000, start_time=i * 60000, end_time=(i + 1) * 60000, local_date=day
+            )
+
+    def test_each_user_targets_yesterday_in_their_timezone(self):
+        self.assertEqual(
+            local_yesterdays(self.now),
+            {datetime.date(2025, 2, 28): [self.la.id], datetime.date(2025, 3, 1): [self.seoul.id]},
+        )
+
+    def test_command_runs_each_date_for_its_users(self):
+        with mock.patch("apps.summary.services.pregenerate.timezone.now", return_value=self.now), \
+                mock.patch("apps.summary.management.commands.pregenerate_summaries.pregenerate_summaries") as run:
+            run.return_value = PregenerateReport()
+            call_command("pregenerate_summaries", stdout=StringIO())
+
+        self.assertEqual(
+            [(call.args[0], call.kwargs["user_ids"]) for call in run.call_args_list],
+            [(datetime.date(2025, 2, 28), [self.la.id]), (datetime.date(2025, 3, 1), [self.seoul.id])],
+        )
+
+
+class SummaryEndpointThreadTests(TransactionTestCase):
+    def test_waiting_requests_add_no_threads_beyond_one_per_request(self):
+        # ASGI 앱으로 인증, DB, 생성 경로 전체를 거칩니다. 스레드가 요청 수 + 여유분을 넘으면 CommandError가 납니다.
+        # 테스트 DB(공유 캐시 메모리 SQLite)는 동시 쓰기를 바로 실패시키므로, 시작을 나눠 DB 작업은 겹치지 않고 LLM 대기만 겹치게 합니다.
+        out = StringIO()
+        call_command(
+            "loadtest_summary", mode="endpoint", backend="fake", requests=10, latency=1.5, ramp_up=0.9,
+            max_extra_threads=2, stdout=out,
+        )
+        self.assertIn("실패 0건", out.getvalue())
+        self.assertIn("LLM 호출 10건", out.getvalue())
+        self.assertFalse(User.objects.filter(username__startswith="loadtest-").exists())
+
+
+class AsyncJWTAuthTests(TestCase):
+    async def test_invalid_token_is_rejected(self):
+        client = TestAsyncClient(router)
+        response = await client.get("", headers={"Authorization": "Bearer invalid"})
+        self.assertEqual(response.status_code, 401)
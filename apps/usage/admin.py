@@ -1,5 +1,30 @@
+import datetime
+
 from django.contrib import admin
-from .models import AppInfo, UsageRecord
+from django.utils import timezone
+
+from .models import AppInfo, DailyAppUsage, HourlyUsage, UsageArchive, UsageRecord
+
+
+class UsageDateFilter(admin.SimpleListFilter):
+    """선택한 날짜(사용자 시간대 기준, local_date)에 시작된 기록만 보여줍니다. (최근 7일)"""
+    title = '사용 날짜'
+    parameter_name = 'usage_date'
+
+    def lookups(self, request, model_admin):
+        today = timezone.localdate()
+        days = [today - datetime.timedelta(days=i) for i in range(7)]
+        return [(d.isoformat(), d.isoformat()) for d in days]
+
+    def queryset(self, request, queryset):
+        if not self.value():
+            return queryset
+        try:
+            target_date = datetime.date.fromisoformat(self.value())
+        except ValueError:
+            return queryset
+        return queryset.overlapping(None, target_date)
+
 
 @admin.register(AppInfo)
 class AppInfoAdmin(admin.ModelAdmin):
@@ -11,9 +36,44 @@ class AppInfoAdmin(admin.ModelAdmin):
 class UsageRecordAdmin(admin.ModelAdmin):   
     list_display = ['id', 'user', 'app', 'usage_time_ms', 'start_time', 'end_time', 'created_at']
     search_fields = ['user__username', 'app__app_name']
-    list_filter = ['user', 'app']
+    list_filter = [UsageDateFilter, 'user', 'app']
     autocomplete_fields = ['user', 'app']
     ordering = ['-created_at']
     
     def has_add_permission(self, request):
         return False
+
+
+@admin.register(DailyAppUsage)
+class DailyAppUsageAdmin(admin.ModelAdmin):
+    list_display = ['id', 'user', 'app', 'date', 'total_ms', 'session_count', 'memo_count']
+    search_fields = ['user__username', 'app__app_name']
+    list_filter = ['date']
+    autocomplete_fields = ['user', 'app']
+    ordering = ['-date']
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(HourlyUsage)
+class HourlyUsageAdmin(admin.ModelAdmin):
+    list_display = ['id', 'user', 'date', 'hour', 'total_ms']
+    search_fields = ['user__username']
+    list_filter = ['date']
+    autocomplete_fields = ['user']
+    ordering = ['-date', 'hour']
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(UsageArchive)
+class UsageArchiveAdmin(admin.ModelAdmin):
+    list_display = ['id', 'user', 'month', 'record_count', 'total_ms', 'first_date', 'last_date', 'size_bytes', 'updated_at']
+    search_fields = ['user__username']
+    autocomplete_fields = ['user']
+    ordering = ['-month']
+
+    def has_add_permission(self, request):
+        return False
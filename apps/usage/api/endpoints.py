@@ -1,28 +1,58 @@
-from typing import Optional
+from typing import List, Optional
+from dataclasses import asdict
 from datetime import date
+from concurrent.futures import TimeoutError as FutureTimeoutError
 
 from ninja import Query
-from datetime import datetime, timedelta
+from datetime import timedelta
 
 from ninja import Router
 from ninja.responses import Response
+from django.conf import settings
 from django.db import IntegrityError
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
 
 from apps.api.auth import JWTAuth
+from apps.api.conditional import etag_matches, not_modified, with_etag
 from apps.api.schema import (
     ResponseSchema,
+    BadRequestSchema,
     UnauthorizedSchema,
     ForbiddenSchema,
     NotFoundSchema,
 )
 from apps.usage.api.schemas import (
     UsageRecordCreateSchema,
-    UsageRecordSchema,
+    UsageRecordCreateResponseSchema,
+    UsageRecordBatchResponseSchema,
+    UsageImportReportSchema,
     UsageListResponseSchema,
+    UsageHeatmapSchema,
+    UsageSessionSchema,
+    UsageStatsSchema,
     MemoSchema,
     MemoResponseSchema,
+    MemoBatchItemSchema,
+    MemoBatchResponseSchema,
+    MemoSearchResponseSchema,
+    OnConflict,
 )
-from apps.usage.models import UsageRecord, AppInfo
+from apps.usage.models import UsageRecord
+from apps.usage.services.app_cache import app_resolver
+from apps.usage.services.archive import archived_rows_for_date
+from apps.usage.services.heatmap import weekly_heatmap
+from apps.usage.services.intervals import local_today, user_timezone
+from apps.usage.services.ingest import DUPLICATE_ERROR, ingest_usage_records, validate_item
+from apps.usage.services.list_serializer import LIST_COLUMNS, astream_usage_list, stream_usage_list
+from apps.usage.services.memo import MEMO_FIELDS, MemoRecordsNotFoundError, set_memo, set_memos
+from apps.usage.services.memo_search import search_memos
+from apps.usage.services.pagination import InvalidCursorError, paginate_by_start_time
+from apps.usage.services.sessions import get_session
+from apps.usage.services.stats import usage_stats
+from apps.usage.services.stream_import import import_ndjson, open_body_stream
+from apps.usage.services.versions import day_list_etag, page_list_etag
+from apps.usage.services.write_buffer import BufferFullError, usage_write_buffer
 
 router = Router(tags=["사용시간 기록 및 메모 기능 API"], auth=JWTAuth())
 
@@ -40,112 +70,439 @@ COMMON_ERROR_RESPONSES = {
     사용 시간을 등록하는 API입니다.
 
     - 패키지 이름, 앱 이름, 사용시간, 시작시간, 종료 시간을 예시와 같이 JSON 문자열로 포함해야 합니다.
+    - 같은 앱, 시작시간, 종료시간의 기록은 한 번만 저장됩니다.
+    - 쿼리파라미터 on_conflict로 재전송된 기록의 처리 방식을 정할 수 있습니다.
+        - error(기본값): 409를 반환합니다.
+        - ignore: 기존 기록을 그대로 두고 기존 record_id를 반환합니다.
+        - update: 기존 기록의 사용시간을 새 값으로 갱신하고 기존 record_id를 반환합니다.
+        - 아카이브된 기록도 재전송으로 판단하며, update에서도 사용시간은 바꾸지 않습니다.
+    - 서버가 write-behind 모드(`USAGE_WRITE_BEHIND`)로 동작하면 기록을 모아서 저장합니다.
+        - `USAGE_WRITE_BEHIND_ACK=enqueue`: 접수 즉시 202를 반환하며 record_id는 제공되지 않습니다.
+        - `USAGE_WRITE_BEHIND_ACK=flush`: 저장이 끝난 뒤 200과 record_id를 반환합니다.
     """,
     response={
-    200: ResponseSchema[None],
+    200: ResponseSchema[UsageRecordCreateResponseSchema],
+    202: ResponseSchema[None],
+    400: BadRequestSchema,
+    409: ResponseSchema[None],
     **COMMON_ERROR_RESPONSES,
 })
-def record_usage(request, data: UsageRecordCreateSchema):
+def record_usage(request, data: UsageRecordCreateSchema, on_conflict: OnConflict = Query("error")):
     user = request.user
 
+    if settings.USAGE_WRITE_BEHIND:
+        response = record_usage_write_behind(user, data, on_conflict)
+        if response is not None:
+            return response
+
     try:
-        app, _ = AppInfo.objects.get_or_create(
-            package_name=data.package_name,
-            defaults={"app_name": data.app_name}
-        )
+        result = ingest_usage_records(user, [data], on_conflict=on_conflict)[0]
 
-        record = UsageRecord.objects.create(
-            user=user,
-            app=app,
-            usage_time_ms=data.usage_time_ms,
-            start_time=data.start_time,
-            end_time=data.end_time,
-        )
+    except IntegrityError:
+        # 동시에 들어온 같은 기록이 먼저 저장된 경우입니다.
+        return Response({"message": DUPLICATE_ERROR, "data": None}, status=409)
 
+    except Exception as e:
         return Response(
-            {"message": "사용시간 기록 성공",
-             "data": {
-                 "record_id": record.id
-                }
-             },
-            status=200
+            {"message": f"기록 저장 실패: {e}", "data": None},
+            status=500
         )
 
-    except IntegrityError as e:
+    return record_result_response(result)
+
+
+def record_usage_write_behind(user, data: UsageRecordCreateSchema, on_conflict: str):
+    # 값 검증은 큐에 넣기 전에 끝내서, 잘못된 기록은 바로 400으로 알려줍니다.
+    error = validate_item(data)
+    if error:
+        return Response({"message": error, "data": None}, status=400)
+
+    try:
+        future = usage_write_buffer.submit(user, data, on_conflict)
+    except BufferFullError:
+        # 버퍼가 가득 차면 None을 반환해 요청 스레드에서 바로 저장하도록 합니다.
+        return None
+
+    if settings.USAGE_WRITE_BEHIND_ACK == "flush":
+        try:
+            return record_result_response(future.result(timeout=settings.USAGE_WRITE_BEHIND_ACK_TIMEOUT))
+        except FutureTimeoutError:
+            pass
+        except IntegrityError:
+            return Response({"message": DUPLICATE_ERROR, "data": None}, status=409)
+        except Exception as e:
+            return Response({"message": f"기록 저장 실패: {e}", "data": None}, status=500)
+
+    return Response({"message": "사용시간 기록 접수", "data": None}, status=202)
+
+
+def record_result_response(result):
+    if result.error == DUPLICATE_ERROR:
+        return Response({"message": result.error, "data": None}, status=409)
+    if result.error:
+        return Response({"message": result.error, "data": None}, status=400)
+
+    return Response(
+        {"message": "사용시간 기록 성공" if result.created else "이미 등록된 사용시간 기록",
+         "data": {
+             "record_id": result.record_id,
+             "created": result.created,
+            }
+         },
+        status=200
+    )
+
+
+@router.post("/record/batch",
+    summary="사용시간 일괄 등록 API",
+    description="""
+    여러 개의 사용 시간을 한 번에 등록하는 API입니다.
+
+    - `/record`와 같은 형식의 기록을 JSON 배열로 전달합니다.
+    - 모든 기록은 하나의 트랜잭션으로 저장됩니다.
+    - 결과값으로 요청 순서(index)별 record_id 또는 저장 실패 사유(error)가 제공됩니다.
+    - 한 번에 등록할 수 있는 기록 수는 최대 `USAGE_BATCH_MAX_RECORDS`개입니다.
+    - 재전송된 기록의 처리 방식(on_conflict)은 `/record`와 같습니다.
+    """,
+    response={
+    200: ResponseSchema[UsageRecordBatchResponseSchema],
+    400: BadRequestSchema,
+    **COMMON_ERROR_RESPONSES,
+})
+def record_usage_batch(request, data: List[UsageRecordCreateSchema], on_conflict: OnConflict = Query("error")):
+    if len(data) > settings.USAGE_BATCH_MAX_RECORDS:
         return Response(
-            {"message": f"앱 정보 저장 실패: {e}", "data": None},
-            status=500
+            {"message": f"한 번에 최대 {settings.USAGE_BATCH_MAX_RECORDS}개까지 등록할 수 있습니다.", "data": None},
+            status=400
         )
 
+    try:
+        results = ingest_usage_records(request.user, data, on_conflict=on_conflict)
     except Exception as e:
         return Response(
             {"message": f"기록 저장 실패: {e}", "data": None},
             status=500
         )
 
+    created = sum(1 for r in results if r.created)
+    failed = sum(1 for r in results if r.error)
+    return Response(
+        {"message": "사용시간 일괄 기록 완료",
+         "data": {
+             "created": created,
+             "existing": len(results) - created - failed,
+             "failed": failed,
+             "results": [
+                 {"index": r.index, "record_id": r.record_id, "created": r.created, "error": r.error}
+                 for r in results
+             ],
+            }
+         },
+        status=200
+    )
+
+
+@router.post("/record/stream",
+    summary="사용시간 NDJSON 스트리밍 등록 API",
+    description="""
+    오랫동안 오프라인이었던 기기의 대량 기록을 한 번에 업로드하는 API입니다.
+
+    - 요청 본문은 한 줄에 하나의 기록(`/record`와 같은 형식)이 담긴 NDJSON입니다.
+    - `Content-Type: application/x-ndjson`을 사용하고, `Content-Encoding: gzip`으로 압축해서 보낼 수 있습니다.
+    - 본문을 한 줄씩 읽으며 `USAGE_STREAM_CHUNK_SIZE`개마다 커밋하므로, 업로드 크기와 관계없이 메모리 사용량이 일정합니다.
+    - 재전송을 고려해 on_conflict 기본값은 ignore입니다.
+    - 결과값으로 처리한 줄 수, 저장/중복/실패 건수와 줄 번호별 에러 목록이 제공됩니다.
+    """,
+    response={
+    200: ResponseSchema[UsageImportReportSchema],
+    **COMMON_ERROR_RESPONSES,
+})
+def record_usage_stream(request, on_conflict: OnConflict = Query("ignore")):
+    report = import_ndjson(
+        request.user,
+        open_body_stream(request),
+        on_conflict=on_conflict,
+        chunk_size=settings.USAGE_STREAM_CHUNK_SIZE,
+        max_errors=settings.USAGE_STREAM_MAX_ERRORS,
+        max_line_bytes=settings.USAGE_STREAM_MAX_LINE_BYTES,
+    )
+
+    return Response(
+        {"message": "사용시간 스트리밍 기록 완료" if not report.aborted else report.aborted,
+         "data": asdict(report)},
+        status=200
+    )
+
 
 @router.get("/list",
     summary="사용시간 리스트 조회 API",
-    description="""
+    description=f"""
     date를 이용한 사용 시간 리스트 조회 API입니다.
     
     - 쿼리파라미터 date에 조회하고자 하는 날짜를 전달합니다.
     - 날짜는 (YYYY-MM-DD)형태로 제공해야 합니다. (ex. 2025-07-30)
-    - 날짜를 입력하지 않으면 전체 기록을 조회합니다.
+    - 날짜와 시간 문자열은 사용자 프로필의 시간대(timezone)를 기준으로 합니다.
+    - 날짜를 입력하지 않으면 전체 기록을 최신순으로 page_size개씩 나누어 조회합니다.
+      - 응답의 next_cursor를 다음 요청의 cursor로 전달하면 이어지는 기록을 조회합니다.
+      - next_cursor가 null이면 마지막 페이지입니다.
+      - page_size 기본값은 {settings.USAGE_LIST_PAGE_SIZE}, 최대값은 {settings.USAGE_LIST_MAX_PAGE_SIZE}입니다.
+      - 전체 기록 조회는 아카이브되지 않은 기록만 대상으로 합니다.
+    - 응답의 ETag를 다음 요청의 If-None-Match 헤더로 보내면, 그 사이 기록이 바뀌지 않은 경우 본문 없이 304를 반환합니다.
+    - 보관 기간이 지나 아카이브된 날짜도 date로 조회하면 아카이브 파일에서 읽어 같은 형식으로 제공합니다.
     - 결과값으로 record_id, 등록 시 작성했던 내용, 변환값(시작시간, 종료시간, 사용시간)이 제공됩니다.
     """,
     response={
     200: ResponseSchema[UsageListResponseSchema],
+    400: BadRequestSchema,
     **COMMON_ERROR_RESPONSES,
 })
-def list_usage(request, date: Optional[date] = Query(None)):
+def list_usage(
+    request,
+    date: Optional[date] = Query(None),
+    cursor: Optional[str] = Query(None),
+    page_size: int = Query(settings.USAGE_LIST_PAGE_SIZE),
+):
     user = request.user
-    target_date = date or datetime.today().date()  # ✅ 이미 date 타입이므로 바로 사용 가능
+    tz = user_timezone(user.id)
+    next_cursor = None
 
     if date:
-        # 날짜 범위 (하루의 시작과 끝) → 밀리초 단위
-        start_of_day = int(datetime.combine(target_date, datetime.min.time()).timestamp() * 1000)
-        end_of_day = int(datetime.combine(target_date, datetime.max.time()).timestamp() * 1000)
-
-        # 해당 날짜와 겹치는 기록 조회 (start_time이나 end_time이 하루에 겹치는 경우)
-        records = UsageRecord.objects.select_related("app").filter(
-            user=user,
-            end_time__gte=start_of_day,
-            start_time__lte=end_of_day,
-        ).order_by("-start_time")
+        etag = day_list_etag(user.id, date, tz)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        # 사용자 시간대 기준으로 해당 날짜에 시작된 기록 조회 ((user, local_date, start_time) 인덱스)
+        records = UsageRecord.objects.overlapping(user, date).order_by("-start_time").values_list(*LIST_COLUMNS)
+        archived = archived_rows_for_date(user, date)
+        if archived:
+            # 아카이브로 옮겨진 날짜는 파일의 기록과 (늦게 업로드되어) hot 테이블에 남은 기록을 합칩니다.
+            # 같은 자연키(package_name, start_time, end_time)의 기록은 아카이브 쪽 하나만 남깁니다.
+            archived_keys = {(row[1], row[4], row[5]) for row in archived}
+            late = [row for row in records if (row[1], row[4], row[5]) not in archived_keys]
+            rows = sorted([*archived, *late], key=lambda row: row[4], reverse=True)
+        else:
+            # 서버 측 커서로 청크 단위로 읽어, 하루 기록이 많아도 메모리에는 한 청크만 유지합니다.
+            rows = records.iterator(chunk_size=settings.USAGE_LIST_CHUNK_SIZE)
     else:
-        # 날짜가 없을 경우 → 전체 기록 조회
-        records = UsageRecord.objects.select_related("app").filter(
-            user=user
-        ).order_by("-start_time")
-
-
-    result = []
-    for r in records:
-        start_str = datetime.fromtimestamp(r.start_time / 1000).strftime("%Y-%m-%d %H:%M:%S")
-        end_str = datetime.fromtimestamp(r.end_time / 1000).strftime("%Y-%m-%d %H:%M:%S")
-        usage_time_str = str(timedelta(milliseconds=r.usage_time_ms))
-
-        record = UsageRecordSchema(
-            id=r.id,
-            package_name=r.app.package_name,
-            app_name=r.app.app_name,
-            usage_time_ms=r.usage_time_ms,
-            start_time=r.start_time,
-            end_time=r.end_time,
-            start_time_str=start_str,
-            end_time_str=end_str,
-            usage_time_str=usage_time_str,
+        # 날짜가 없을 경우 → 전체 기록을 cursor 기준으로 한 페이지씩 조회
+        if not 1 <= page_size <= settings.USAGE_LIST_MAX_PAGE_SIZE:
+            return Response(
+                {"message": f"page_size는 1 ~ {settings.USAGE_LIST_MAX_PAGE_SIZE} 사이여야 합니다.", "data": None},
+                status=400
+            )
+        etag = page_list_etag(user.id, tz, cursor, page_size)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        try:
+            rows, next_cursor = paginate_by_start_time(
+                UsageRecord.objects.filter(user=user).values_list(*LIST_COLUMNS),
+                cursor,
+                page_size,
+                key=lambda row: (row[4], row[0]),
+            )
+        except InvalidCursorError as e:
+            return Response({"message": str(e), "data": None}, status=400)
+
+    # 행마다 스키마 객체를 만들지 않고 ResponseSchema[UsageListResponseSchema]와 같은 JSON을 바로 써 내려갑니다.
+    # ASGI 서버는 동기 이터레이터를 버퍼링하므로 비동기 제너레이터로 스트리밍합니다.
+    stream = astream_usage_list if isinstance(request, ASGIRequest) else stream_usage_list
+    response = StreamingHttpResponse(
+        stream(
+            rows,
+            message="사용시간 리스트 조회 성공",
+            next_cursor=next_cursor,
+            chunk_size=settings.USAGE_LIST_CHUNK_SIZE,
+            tz=tz,
+        ),
+        content_type="application/json",
+        status=200,
+    )
+    return with_etag(response, etag)
+
+
+@router.get("/heatmap",
+    summary="요일 x 시간대 사용시간 히트맵 조회 API",
+    description="""
+    최근 days일 동안의 요일별, 시간대별 사용시간 합계를 조회하는 API입니다.
+
+    - 쿼리파라미터 days로 오늘을 포함한 조회 기간을 전달합니다. (기본 90일)
+    - cells[요일][시]에 사용시간 합계(ms)가 담기며, 요일은 0=월요일 ~ 6=일요일입니다.
+    - 여러 시간대에 걸친 기록은 각 시간대에 걸친 길이만큼 비례해서 나누어 집계됩니다.
+    - weekday_days는 기간 내 요일별 일수로, 요일별 평균을 계산할 때 사용합니다.
+    """,
+    response={
+    200: ResponseSchema[UsageHeatmapSchema],
+    400: BadRequestSchema,
+    **COMMON_ERROR_RESPONSES,
+})
+def get_usage_heatmap(request, days: int = Query(settings.USAGE_HEATMAP_DEFAULT_DAYS)):
+    if not 1 <= days <= settings.USAGE_HEATMAP_MAX_DAYS:
+        return Response(
+            {"message": f"days는 1 ~ {settings.USAGE_HEATMAP_MAX_DAYS} 사이여야 합니다.", "data": None},
+            status=400
         )
-        result.append(record)
 
-    return Response(
-        {
-            "message": "사용시간 리스트 조회 성공",
-            "data": {"records": result}
-        },
-        status=200
+    end_date = local_today(user_timezone(request.user.id))
+    start_date = end_date - timedelta(days=days - 1)
+
+    weekday_days = [0] * 7
+    for offset in range(days):
+        weekday_days[(start_date + timedelta(days=offset)).weekday()] += 1
+
+    return Response({
+        "message": "히트맵 조회 성공",
+        "data": {
+            "start_date": start_date,
+            "end_date": end_date,
+            "days": days,
+            "cells": weekly_heatmap(request.user, start_date, end_date),
+            "weekday_days": weekday_days,
+        }
+    }, status=200)
+
+
+@router.get("/stats",
+    summary="기간별 사용 통계 조회 API",
+    description="""
+    start ~ end 기간(양 끝 포함)의 사용 통계를 조회하는 API입니다. 주간/월간 합계 표시에 사용합니다.
+
+    - 쿼리파라미터 start, end에 (YYYY-MM-DD) 형태의 날짜를 전달합니다. (최대 366일)
+    - top으로 top_apps에 담을 앱 개수를 지정합니다. (기본 5개, 최대 50개)
+    - 전체 합계, 앱별 합계(apps), 사용시간 상위 앱(top_apps), 일별 합계(days)와 평균 세션 길이를 제공합니다.
+    - 날짜는 사용자 프로필의 시간대(timezone) 기준이며, 자정을 넘는 기록은 날짜별로 나누어 집계됩니다.
+    - 자정을 넘는 세션은 전체/앱별 session_count에서 한 번만 세고, 일별(days) session_count에서는 걸친 날마다 셉니다.
+    """,
+    response={
+    200: ResponseSchema[UsageStatsSchema],
+    400: BadRequestSchema,
+    **COMMON_ERROR_RESPONSES,
+})
+def get_usage_stats(request, start: date = Query(...), end: date = Query(...), top: int = Query(5)):
+    if start > end:
+        return Response({"message": "start는 end보다 늦을 수 없습니다.", "data": None}, status=400)
+    if (end - start).days + 1 > settings.USAGE_STATS_MAX_DAYS:
+        return Response(
+            {"message": f"조회 기간은 최대 {settings.USAGE_STATS_MAX_DAYS}일입니다.", "data": None},
+            status=400
+        )
+    if not 1 <= top <= settings.USAGE_STATS_MAX_TOP:
+        return Response(
+            {"message": f"top은 1 ~ {settings.USAGE_STATS_MAX_TOP} 사이여야 합니다.", "data": None},
+            status=400
+        )
+
+    return Response({
+        "message": "사용 통계 조회 성공",
+        "data": usage_stats(request.user, start, end, top)
+    }, status=200)
+
+
+@router.get("/{record_id}/session",
+    summary="원본 사용 기록(세션) 조회 API",
+    description="""
+    자정을 넘어 날짜별 세그먼트로 나뉘어 저장된 기록을 원본 기록 형태로 다시 합쳐서 조회하는 API입니다.
+
+    - 경로파라미터 record_id에 세그먼트 중 하나의 id(record_id)를 전달합니다.
+    - start_time, end_time, usage_time_ms는 원본 기록의 값이며, segments에 날짜별 세그먼트가 담깁니다.
+    - 나뉘지 않은 기록은 session_id가 null이고 segments에 자기 자신만 담깁니다.
+    """,
+    response={
+    200: ResponseSchema[UsageSessionSchema],
+    **COMMON_ERROR_RESPONSES,
+})
+def get_usage_session(request, record_id: int):
+    try:
+        record = UsageRecord.objects.select_related("app").get(id=record_id, user=request.user)
+    except UsageRecord.DoesNotExist:
+        return Response({"message": "사용 기록을 찾을 수 없습니다", "data": None}, status=404)
+
+    return Response({
+        "message": "세션 조회 성공",
+        "data": get_session(record)
+    }, status=200)
+
+
+@router.get("/memo/search",
+    summary="메모 검색 API",
+    description="""
+    사용 기록의 메모를 검색하는 API입니다.
+
+    - 쿼리파라미터 q에 검색어를 전달합니다. 공백으로 구분된 모든 단어를 포함하는 메모를 찾습니다.
+    - 단어 일부만 입력해도 찾을 수 있습니다. (예: "스트레" → "스트레스")
+    - 3글자 이상인 단어가 있으면 관련도(score) 순으로, 모든 단어가 3글자 미만이면 최신순으로 정렬됩니다.
+    - 1~2글자 단어(예: "공부")도 다른 단어와 함께 또는 단독으로 검색할 수 있습니다.
+    - start, end로 기록 날짜(YYYY-MM-DD, 사용자 시간대 기준) 범위를 제한할 수 있습니다.
+    - page(1부터 시작)와 page_size로 결과를 나누어 조회합니다. (page_size 기본 20, 최대 100)
+    - 아카이브된 기록의 메모는 검색되지 않습니다.
+    """,
+    response={
+    200: ResponseSchema[MemoSearchResponseSchema],
+    400: BadRequestSchema,
+    **COMMON_ERROR_RESPONSES,
+})
+def search_usage_memo(
+    request,
+    q: str = Query(...),
+    start: Optional[date] = Query(None),
+    end: Optional[date] = Query(None),
+    page: int = Query(1),
+    page_size: int = Query(settings.USAGE_MEMO_SEARCH_PAGE_SIZE),
+):
+    if not q.strip():
+        return Response({"message": "검색어를 입력해주세요.", "data": None}, status=400)
+    if start and end and start > end:
+        return Response({"message": "start는 end보다 늦을 수 없습니다.", "data": None}, status=400)
+    if page < 1:
+        return Response({"message": "page는 1 이상이어야 합니다.", "data": None}, status=400)
+    if not 1 <= page_size <= settings.USAGE_MEMO_SEARCH_MAX_PAGE_SIZE:
+        return Response(
+            {"message": f"page_size는 1 ~ {settings.USAGE_MEMO_SEARCH_MAX_PAGE_SIZE} 사이여야 합니다.", "data": None},
+            status=400
+        )
+
+    results, has_next = search_memos(
+        request.user, q, start_date=start, end_date=end, offset=(page - 1) * page_size, limit=page_size
     )
+    return Response({
+        "message": "메모 검색 성공",
+        "data": {"page": page, "has_next": has_next, "results": results}
+    }, status=200)
+
+
+@router.post("/memo/batch",
+    summary="사용시간 메모 일괄 등록 API",
+    description="""
+    여러 사용 기록의 메모를 한 번에 등록/수정/삭제하는 API입니다.
+
+    - record_id와 memo 쌍을 JSON 배열로 전달합니다. memo가 null이면 메모를 삭제합니다.
+    - 같은 record_id가 여러 번 나오면 마지막 값이 적용됩니다.
+    - 모든 변경은 하나의 트랜잭션으로 저장되며, 본인의 기록이 아닌 record_id가 하나라도 있으면 아무것도 바뀌지 않고 404를 반환합니다.
+    - 한 번에 수정할 수 있는 항목 수는 최대 `USAGE_MEMO_BATCH_MAX_ITEMS`개입니다.
+    - 결과값으로 record_id별 메모와 실제로 바뀐 기록 수(updated)가 제공됩니다.
+    """,
+    response={
+    200: ResponseSchema[MemoBatchResponseSchema],
+    400: BadRequestSchema,
+    **COMMON_ERROR_RESPONSES,
+})
+def set_usage_memo_batch(request, data: List[MemoBatchItemSchema]):
+    if len(data) > settings.USAGE_MEMO_BATCH_MAX_ITEMS:
+        return Response(
+            {"message": f"한 번에 최대 {settings.USAGE_MEMO_BATCH_MAX_ITEMS}개까지 수정할 수 있습니다.", "data": None},
+            status=400
+        )
+
+    try:
+        records, updated = set_memos(request.user, {item.record_id: item.memo for item in data})
+    except MemoRecordsNotFoundError as e:
+        return Response({"message": str(e), "data": None}, status=404)
+
+    return Response({
+        "message": "메모 일괄 등록/수정 완료",
+        "data": {
+            "updated": updated,
+            "results": [{"id": record.id, "memo": record.memo} for record in records],
+        }
+    }, status=200)
 
 
 @router.post("/{record_id}/memo",
@@ -163,12 +520,11 @@ def list_usage(request, date: Optional[date] = Query(None)):
 })
 def set_usage_memo(request, record_id: int, payload: MemoSchema):
     try:
-        record = UsageRecord.objects.get(id=record_id, user=request.user)
+        record = UsageRecord.objects.only(*MEMO_FIELDS).get(id=record_id, user=request.user)
     except UsageRecord.DoesNotExist:
         return Response({"message": "사용 기록을 찾을 수 없습니다", "data": None}, status=404)
 
-    record.memo = payload.memo
-    record.save()
+    set_memo(record, payload.memo)
 
     return Response({
         "message": "메모 등록/수정 완료",
@@ -215,14 +571,39 @@ def get_usage_memo(request, record_id: int):
 })
 def delete_usage_memo(request, record_id: int):
     try:
-        record = UsageRecord.objects.get(id=record_id, user=request.user)
+        record = UsageRecord.objects.only(*MEMO_FIELDS).get(id=record_id, user=request.user)
     except UsageRecord.DoesNotExist:
         return Response({"message": "사용 기록을 찾을 수 없습니다", "data": None}, status=404)
 
-    record.memo = None
-    record.save()
+    set_memo(record, None)
 
     return Response({
         "message": "메모 삭제 완료",
         "data": {"id": record.id, "memo": None}
-    }, status=200)
\ No newline at end of file
+    }, status=200)
+
+
+@router.get("/metrics",
+    summary="사용시간 기록 내부 지표 조회 API",
+    description="""
+    사용시간 기록 경로의 내부 지표를 조회하는 API입니다.
+
+    - 관리자(staff) 계정만 조회할 수 있습니다.
+    - app_cache: package_name 캐시의 크기와 hit/miss 횟수
+    - write_buffer: write-behind 버퍼의 대기 건수(depth)와 flush 소요 시간
+    """,
+    response={
+    200: ResponseSchema[dict],
+    **COMMON_ERROR_RESPONSES,
+})
+def get_usage_metrics(request):
+    if not request.user.is_staff:
+        return Response({"message": "관리자만 조회할 수 있습니다.", "data": None}, status=403)
+
+    return Response({
+        "message": "지표 조회 성공",
+        "data": {
+            "app_cache": app_resolver.stats(),
+            "write_buffer": usage_write_buffer.stats(),
+        }
+    }, status=200)
@@ -1,6 +1,6 @@
 from ninja import Schema
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List, Literal, Optional
 import datetime
 
 class UsageRecordCreateSchema(BaseModel):
@@ -10,6 +10,39 @@ class UsageRecordCreateSchema(BaseModel):
     start_time: int = Field(..., example=1753874134830)
     end_time: int = Field(..., example=1753888371658)
 
+class UsageRecordBatchResultSchema(BaseModel):
+    index: int = Field(..., description="요청 목록에서의 순서 (0부터 시작)")
+    record_id: Optional[int] = None
+    created: bool = Field(False, description="새로 저장되었으면 true, 기존 기록을 가리키면 false")
+    error: Optional[str] = None
+
+class UsageRecordBatchResponseSchema(BaseModel):
+    created: int
+    existing: int
+    failed: int
+    results: List[UsageRecordBatchResultSchema]
+
+class UsageImportErrorSchema(BaseModel):
+    line: int = Field(..., description="본문에서의 줄 번호 (1부터 시작)")
+    error: str
+
+class UsageImportReportSchema(BaseModel):
+    lines: int
+    created: int
+    existing: int
+    failed: int
+    chunks: int = Field(..., description="커밋된 트랜잭션 수")
+    errors: List[UsageImportErrorSchema]
+    errors_truncated: bool = Field(..., description="에러가 많아 일부만 포함되었는지 여부")
+    aborted: Optional[str] = Field(None, description="본문을 끝까지 읽지 못한 경우 그 사유")
+
+class UsageRecordCreateResponseSchema(BaseModel):
+    record_id: int
+    created: bool
+
+# 재전송된(자연키가 같은) 기록 처리 방식: error(중복 오류) / ignore(기존 기록 유지) / update(사용시간 갱신)
+OnConflict = Literal["error", "ignore", "update"]
+
 class UsageRecordSchema(BaseModel):
     id: Optional[int] = None
     package_name: str
@@ -20,9 +53,58 @@ class UsageRecordSchema(BaseModel):
     start_time_str: Optional[str] = None
     end_time_str: Optional[str] = None
     usage_time_str: Optional[str] = None
+    session_id: Optional[str] = Field(None, description="자정을 넘어 나뉜 기록이면 같은 원본 기록의 세그먼트가 공유하는 id")
 
 class UsageListResponseSchema(BaseModel):
     records: List[UsageRecordSchema]
+    next_cursor: Optional[str] = Field(None, description="다음 페이지 조회용 cursor (마지막 페이지이거나 날짜 조회 시 null)")
+
+class UsageHeatmapSchema(BaseModel):
+    start_date: datetime.date
+    end_date: datetime.date
+    days: int = Field(..., description="조회 기간(일)")
+    cells: List[List[int]] = Field(..., description="[요일(0=월 ~ 6=일)][시(0~23)] 사용시간 합계(ms)")
+    weekday_days: List[int] = Field(..., description="기간 내 요일별 일수(평균 계산용, 0=월 ~ 6=일)")
+
+class UsageStatsAppSchema(BaseModel):
+    package_name: Optional[str] = None
+    app_name: Optional[str] = None
+    total_ms: int
+    session_count: int
+    avg_session_ms: Optional[float] = Field(None, description="평균 세션 길이(ms)")
+    days_used: int = Field(..., description="기간 중 사용한 일수")
+
+class UsageStatsDaySchema(BaseModel):
+    date: datetime.date
+    total_ms: int
+    session_count: int
+    avg_session_ms: Optional[float] = None
+
+class UsageStatsSchema(BaseModel):
+    start_date: datetime.date
+    end_date: datetime.date
+    total_ms: int
+    session_count: int
+    avg_session_ms: Optional[float] = None
+    apps: List[UsageStatsAppSchema] = Field(..., description="앱별 합계 (사용시간 내림차순)")
+    top_apps: List[UsageStatsAppSchema] = Field(..., description="사용시간 상위 top개 앱")
+    days: List[UsageStatsDaySchema] = Field(..., description="일별 합계 (사용 기록이 있는 날짜만, 날짜 오름차순)")
+
+class UsageSessionSegmentSchema(BaseModel):
+    id: int
+    local_date: Optional[datetime.date] = None
+    start_time: int
+    end_time: int
+    usage_time_ms: Optional[int] = None
+
+class UsageSessionSchema(BaseModel):
+    session_id: Optional[str] = None
+    package_name: Optional[str] = None
+    app_name: Optional[str] = None
+    start_time: int
+    end_time: int
+    usage_time_ms: int
+    segments: List[UsageSessionSegmentSchema]
 
 class SimpleResponseSchema(BaseModel):
     message: str
@@ -37,4 +119,27 @@ class MemoSchema(BaseModel):
 
 class MemoResponseSchema(BaseModel):
     id: int
-    memo: Optional[str] = None
\ No newline at end of file
+    memo: Optional[str] = None
+
+class MemoBatchItemSchema(BaseModel):
+    record_id: int
+    memo: Optional[str] = Field(None, description="메모 내용 (null이면 삭제)")
+
+class MemoBatchResponseSchema(BaseModel):
+    updated: int = Field(..., description="메모가 실제로 바뀐 기록 수")
+    results: List[MemoResponseSchema]
+
+class MemoSearchResultSchema(BaseModel):
+    id: int
+    package_name: Optional[str] = None
+    app_name: Optional[str] = None
+    memo: str
+    local_date: Optional[datetime.date] = None
+    start_time: Optional[int] = None
+    end_time: Optional[int] = None
+    score: Optional[float] = Field(None, description="관련도 점수 (클수록 관련도가 높음, LIKE 검색이면 null)")
+
+class MemoSearchResponseSchema(BaseModel):
+    page: int
+    has_next: bool
+    results: List[MemoSearchResultSchema]
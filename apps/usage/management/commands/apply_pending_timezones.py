@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.usage.services.local_day import apply_pending_timezones
+
+
+class Command(BaseCommand):
+    help = "요청 안에서 바로 적용하지 못한 시간대 변경을 적용하고, 기록의 날짜와 집계를 다시 계산합니다."
+
+    def handle(self, *args, **options):
+        applied = apply_pending_timezones(stdout=self.stdout if options["verbosity"] > 1 else None)
+        self.stdout.write(self.style.SUCCESS(f"사용자 {applied}명의 시간대를 적용했습니다."))
@@ -0,0 +1,51 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from apps.usage.models import UsageRecord
+from apps.usage.services.archive import ArchiveStats, archive_user
+from apps.usage.services.intervals import local_today, user_timezone
+
+
+class Command(BaseCommand):
+    help = "보관 기간이 지난 사용 기록을 사용자/월별 압축 파일(gzip NDJSON)로 옮기고 hot 테이블에서 삭제합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--horizon-days", type=int, default=settings.USAGE_ARCHIVE_HORIZON_DAYS,
+            help="오늘(사용자 시간대 기준)로부터 이 일수보다 오래된 기록을 옮김",
+        )
+        parser.add_argument("--user", type=int, action="append", dest="user_ids", help="대상 사용자 id (여러 번 지정 가능)")
+        parser.add_argument("--dry-run", action="store_true", help="옮기지 않고 대상 건수만 출력")
+        parser.add_argument("--vacuum", action="store_true", help="완료 후 SQLite 파일을 VACUUM으로 줄임")
+
+    def handle(self, *args, **options):
+        user_ids = options["user_ids"] or list(
+            UsageRecord.objects.exclude(user_id=None)
+            .order_by("user_id")
+            .values_list("user_id", flat=True)
+            .distinct()
+        )
+
+        total = ArchiveStats()
+        for user_id in user_ids:
+            cutoff = local_today(user_timezone(user_id)) - datetime.timedelta(days=options["horizon_days"])
+            stats = archive_user(user_id, cutoff, dry_run=options["dry_run"])
+            total.users += 1
+            total.months += stats.months
+            total.archived += stats.archived
+            total.bytes_written += stats.bytes_written
+            if options["verbosity"] > 1 and stats.archived:
+                self.stdout.write(f"user {user_id}: {cutoff} 이전 {stats.archived}건, {stats.months}개월")
+
+        if options["vacuum"] and not options["dry_run"] and connection.vendor == "sqlite":
+            with connection.cursor() as cursor:
+                cursor.execute("VACUUM")
+
+        prefix = "[dry-run] " if options["dry_run"] else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}사용자 {total.users}명, {total.months}개월분 {total.archived}건을 아카이브했습니다. "
+            f"({total.bytes_written / 1024:.1f} KiB)"
+        ))
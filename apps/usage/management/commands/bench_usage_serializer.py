@@ -0,0 +1,97 @@
+import random
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand
+from ninja.responses import Response
+
+from apps.usage.api.schemas import UsageRecordSchema
+from apps.usage.services.list_serializer import stream_usage_list
+
+MESSAGE = "사용시간 리스트 조회 성공"
+
+
+def legacy_body(rows) -> bytes:
+    """기존 list_usage 방식: 행마다 datetime/timedelta와 UsageRecordSchema를 만들고 한 번에 JSON으로 바꿉니다."""
+    result = []
+    for record_id, package_name, app_name, usage_ms, start, end, session_id in rows:
+        result.append(UsageRecordSchema(
+            id=record_id,
+            package_name=package_name,
+            app_name=app_name,
+            usage_time_ms=usage_ms,
+            start_time=start,
+            end_time=end,
+            start_time_str=datetime.fromtimestamp(start / 1000).strftime("%Y-%m-%d %H:%M:%S"),
+            end_time_str=datetime.fromtimestamp(end / 1000).strftime("%Y-%m-%d %H:%M:%S"),
+            usage_time_str=str(timedelta(milliseconds=usage_ms)),
+            session_id=str(session_id) if session_id else None,
+        ))
+    return Response({"message": MESSAGE, "data": {"records": result, "next_cursor": None}}).content
+
+
+def streaming_body(rows, chunk_size: int) -> bytes:
+    return b"".join(stream_usage_list(iter(rows), message=MESSAGE, chunk_size=chunk_size))
+
+
+class Command(BaseCommand):
+    help = "사용 기록 목록 응답 직렬화의 행당 비용(기존 방식 vs 스트리밍 방식)을 측정합니다. DB는 사용하지 않습니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=20000, help="직렬화할 행 수")
+        parser.add_argument("--repeat", type=int, default=3, help="반복 횟수 (가장 빠른 값을 사용)")
+        parser.add_argument("--chunk-size", type=int, default=2000, help="스트리밍 청크 크기")
+
+    def handle(self, *args, **options):
+        rows = self._make_rows(options["rows"])
+        chunk_size = options["chunk_size"]
+
+        if legacy_body(rows[:1000]) != streaming_body(rows[:1000], chunk_size):
+            self.stderr.write(self.style.ERROR("두 방식의 응답 본문이 다릅니다."))
+            return
+
+        for name, run in [
+            ("legacy", lambda: legacy_body(rows)),
+            ("streaming", lambda: streaming_body(rows, chunk_size)),
+        ]:
+            best = min(self._timed(run) for _ in range(options["repeat"]))
+            peak = self._peak_memory(run if name == "legacy" else lambda: self._drain(rows, chunk_size))
+            self.stdout.write(
+                f"{name:>9}: {best * 1e6 / len(rows):7.2f} us/row, "
+                f"total {best * 1000:8.1f} ms, peak {peak / 1024:9.1f} KiB"
+            )
+
+    @staticmethod
+    def _make_rows(n: int) -> list[tuple]:
+        rng = random.Random(0)
+        now = int(time.time() * 1000)
+        rows = []
+        for i in range(n):
+            start = now - i * 90_000 - rng.randint(0, 60_000)
+            usage = rng.randint(0, 3_600_000)
+            session_id = uuid.UUID(int=i) if i % 10 == 0 else None
+            rows.append((i + 1, f"com.example.app{i % 50}", f"앱 {i % 50}", usage, start, start + usage, session_id))
+        return rows
+
+    @staticmethod
+    def _timed(fn) -> float:
+        started = time.perf_counter()
+        fn()
+        return time.perf_counter() - started
+
+    @staticmethod
+    def _drain(rows, chunk_size: int) -> None:
+        # 실제 응답처럼 청크를 내보내기만 하고 모아두지 않습니다.
+        for _ in stream_usage_list(iter(rows), message=MESSAGE, chunk_size=chunk_size):
+            pass
+
+    @staticmethod
+    def _peak_memory(fn) -> int:
+        tracemalloc.start()
+        try:
+            fn()
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
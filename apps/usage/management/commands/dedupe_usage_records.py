@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from apps.usage.services.dedupe import dedupe_usage_records
+
+
+class Command(BaseCommand):
+    help = "(user, app, start_time, end_time)이 같은 중복 사용 기록을 사용자 단위로 정리합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500, help="한 트랜잭션에서 삭제할 최대 기록 수")
+        parser.add_argument("--pause", type=float, default=0.0, help="청크 사이에 쉬는 시간(초)")
+        parser.add_argument("--dry-run", action="store_true", help="삭제하지 않고 대상 건수만 출력")
+
+    def handle(self, *args, **options):
+        stats = dedupe_usage_records(
+            chunk_size=options["chunk_size"],
+            pause=options["pause"],
+            dry_run=options["dry_run"],
+            stdout=self.stdout if options["verbosity"] > 1 else None,
+        )
+        prefix = "[dry-run] " if options["dry_run"] else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}사용자 {stats.users}명 확인, {stats.affected_users}명에게서 중복 {stats.deleted}건 정리"
+        ))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from apps.usage.services.memo_search import fts_enabled, rebuild_memo_index
+
+
+class Command(BaseCommand):
+    help = "사용 기록의 메모로부터 메모 검색 인덱스(usage_memo_fts)를 다시 만듭니다. (SQLite 전용)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=int, action="append", dest="user_ids", help="대상 사용자 id (여러 번 지정 가능)")
+
+    def handle(self, *args, **options):
+        if not fts_enabled():
+            self.stdout.write(self.style.WARNING("SQLite가 아니므로 검색 인덱스가 없습니다. (LIKE 검색만 사용)"))
+            return
+
+        if options["user_ids"]:
+            total = sum(rebuild_memo_index(user_id) for user_id in options["user_ids"])
+            users = f"사용자 {len(options['user_ids'])}명"
+        else:
+            total = rebuild_memo_index()
+            users = "전체 사용자"
+
+        self.stdout.write(self.style.SUCCESS(f"{users}의 메모 {total}개를 다시 인덱싱했습니다."))
@@ -0,0 +1,38 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.usage.models import UsageRecord
+from apps.usage.services.heatmap import rebuild_user_heatmap
+
+
+class Command(BaseCommand):
+    help = "원본 사용 기록으로부터 시간대별 집계(HourlyUsage)를 다시 계산합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=int, action="append", dest="user_ids", help="대상 사용자 id (여러 번 지정 가능)")
+        parser.add_argument("--since", type=str, help="이 날짜(YYYY-MM-DD) 이후의 집계만 다시 계산")
+
+    def handle(self, *args, **options):
+        since = None
+        if options["since"]:
+            try:
+                since = datetime.date.fromisoformat(options["since"])
+            except ValueError:
+                raise CommandError("--since는 YYYY-MM-DD 형식이어야 합니다.")
+
+        user_ids = options["user_ids"] or list(
+            UsageRecord.objects.exclude(user_id=None)
+            .order_by("user_id")
+            .values_list("user_id", flat=True)
+            .distinct()
+        )
+
+        total_rows = 0
+        for user_id in user_ids:
+            rows = rebuild_user_heatmap(user_id, since=since)
+            total_rows += rows
+            if options["verbosity"] > 1:
+                self.stdout.write(f"user {user_id}: 버킷 {rows}개")
+
+        self.stdout.write(self.style.SUCCESS(f"사용자 {len(user_ids)}명, 시간대 버킷 {total_rows}개를 다시 계산했습니다."))
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.4 on 2026-10-17 14:21
+
+from django.conf import settings
+from django.db import migrations, models, transaction
+from django.db.models import Count
+
+
+# 한 트랜잭션에서 삭제할 최대 중복 기록 수
+CHUNK_SIZE = 500
+
+
+def remove_duplicate_records(apps, schema_editor):
+    # 유니크 제약을 걸기 전에 남아 있는 중복 기록을 정리합니다. (이 시점의 컬럼만 사용합니다)
+    # 테이블 전체를 한 트랜잭션으로 잠그지 않도록 사용자별로 찾고, CHUNK_SIZE개씩 나누어 삭제합니다.
+    UsageRecord = apps.get_model('usage', 'UsageRecord')
+    db = schema_editor.connection.alias
+    records = UsageRecord.objects.using(db).exclude(user=None).exclude(app=None)
+
+    user_ids = list(records.order_by('user_id').values_list('user_id', flat=True).distinct())
+    for user_id in user_ids:
+        groups = list(
+            records.filter(user_id=user_id)
+            .values('app_id', 'start_time', 'end_time')
+            .annotate(n=Count('id'))
+            .filter(n__gt=1)
+            .order_by()
+        )
+        duplicate_ids = []
+        for group in groups:
+            rows = list(
+                records.filter(
+                    user_id=user_id,
+                    app_id=group['app_id'],
+                    start_time=group['start_time'],
+                    end_time=group['end_time'],
+                ).order_by('id').values_list('id', 'memo')
+            )
+            keep_id, keep_memo = rows[0]
+            memo = next((m for _, m in rows[1:] if m), None)
+            if memo and not keep_memo:
+                # 가장 먼저 저장된 기록을 남기고, 메모가 없으면 중복 기록의 메모를 옮겨 둡니다.
+                UsageRecord.objects.using(db).filter(id=keep_id).update(memo=memo)
+            duplicate_ids.extend(record_id for record_id, _ in rows[1:])
+
+        for i in range(0, len(duplicate_ids), CHUNK_SIZE):
+            with transaction.atomic(using=db):
+                UsageRecord.objects.using(db).filter(id__in=duplicate_ids[i:i + CHUNK_SIZE]).delete()
+
+
+class Migration(migrations.Migration):
+    # 중복 정리를 청크마다 따로 커밋하도록 마이그레이션 전체를 하나의 트랜잭션으로 묶지 않습니다.
+    atomic = False
+
+    dependencies = [
+        ('usage', '0003_usagerecord_app_usagerecord_created_at_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_records, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='usagerecord',
+            constraint=models.UniqueConstraint(fields=('user', 'app', 'start_time', 'end_time'), name='usage_record_natural_key'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-17 14:26
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usage', '0004_usagerecord_natural_key'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='usagerecord',
+            index=models.Index(fields=['user', 'start_time', 'end_time'], name='usage_user_start_end_idx'),
+        ),
+    ]
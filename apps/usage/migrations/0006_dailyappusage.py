@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-17 14:28
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usage', '0005_usagerecord_interval_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyAppUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('total_ms', models.BigIntegerField(default=0)),
+                ('session_count', models.IntegerField(default=0)),
+                ('memo_count', models.IntegerField(default=0)),
+                ('first_start', models.BigIntegerField(null=True)),
+                ('last_end', models.BigIntegerField(null=True)),
+                ('app', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_usages', to='usage.appinfo')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_app_usages', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'date', 'app'), name='daily_app_usage_key')],
+            },
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.4 on 2026-10-17 14:36
+
+import datetime
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_local_date(apps, schema_editor):
+    # 기존 기록의 local_date를 각 사용자의 프로필 시간대(없으면 TIME_ZONE) 기준으로 채웁니다.
+    UsageRecord = apps.get_model('usage', 'UsageRecord')
+    Profile = apps.get_model('users', 'Profile')
+
+    def zone(name):
+        try:
+            return ZoneInfo(name or settings.TIME_ZONE)
+        except (ZoneInfoNotFoundError, ValueError):
+            return ZoneInfo(settings.TIME_ZONE)
+
+    zones = dict(Profile.objects.values_list('user_id', 'timezone'))
+    user_ids = list(
+        UsageRecord.objects.exclude(start_time=None).order_by().values_list('user_id', flat=True).distinct()
+    )
+    for user_id in user_ids:
+        tz = zone(zones.get(user_id))
+        rows = UsageRecord.objects.filter(user_id=user_id).exclude(start_time=None).values_list('id', 'start_time')
+        batch = []
+        for record_id, start in rows.iterator(chunk_size=2000):
+            day = datetime.datetime.fromtimestamp(start / 1000, tz).date()
+            batch.append(UsageRecord(id=record_id, local_date=day))
+            if len(batch) >= 2000:
+                UsageRecord.objects.bulk_update(batch, ['local_date'])
+                batch = []
+        if batch:
+            UsageRecord.objects.bulk_update(batch, ['local_date'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usage', '0008_usagerecord_cursor_index'),
+        ('users', '0002_profile_timezone'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='usagerecord',
+            name='usage_user_start_end_idx',
+        ),
+        migrations.AddField(
+            model_name='usagerecord',
+            name='local_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_local_date, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='usagerecord',
+            index=models.Index(fields=['user', 'local_date', 'start_time'], name='usage_user_local_date_idx'),
+        ),
+    ]
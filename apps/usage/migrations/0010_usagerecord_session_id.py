@@ -0,0 +1,24 @@
+# Generated by Django 5.2.4 on 2026-10-17 14:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usage', '0009_usagerecord_local_date'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usagerecord',
+            name='session_id',
+            field=models.UUIDField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='usagerecord',
+            index=models.Index(condition=models.Q(('session_id__isnull', False)), fields=['session_id'], name='usage_session_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.4 on 2026-10-17 14:41
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usage', '0010_usagerecord_session_id'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UsageArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('path', models.CharField(max_length=255)),
+                ('record_count', models.IntegerField(default=0)),
+                ('total_ms', models.BigIntegerField(default=0)),
+                ('first_date', models.DateField(null=True)),
+                ('last_date', models.DateField(null=True)),
+                ('size_bytes', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='usage_archives', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'month'), name='usage_archive_key')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.4 on 2026-10-17 18:02
+
+from django.db import migrations
+
+
+def create_memo_fts(apps, schema_editor):
+    # 메모 검색용 FTS5 가상 테이블입니다. (SQLite 전용, 한국어 부분 일치를 위해 trigram 토크나이저 사용)
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS usage_memo_fts "
+        "USING fts5(memo, user_id UNINDEXED, tokenize='trigram')"
+    )
+    schema_editor.execute(
+        "INSERT INTO usage_memo_fts (rowid, memo, user_id) "
+        "SELECT id, memo, user_id FROM usage_usagerecord WHERE memo <> ''"
+    )
+
+
+def drop_memo_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS usage_memo_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usage', '0012_usagedayversion'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_memo_fts, drop_memo_fts),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:12
+
+from django.db import migrations
+
+
+def create_delete_trigger(apps, schema_editor):
+    # 기록이 삭제되면(아카이브, 중복 정리, 사용자 삭제 등) SQLite가 검색 인덱스에서도 지웁니다.
+    # post_delete 시그널을 쓰면 Django의 fast delete가 꺼져 기록마다 객체를 읽고 DELETE를 따로 보내게 됩니다.
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        "CREATE TRIGGER IF NOT EXISTS usage_memo_fts_delete AFTER DELETE ON usage_usagerecord "
+        "WHEN old.memo <> '' BEGIN DELETE FROM usage_memo_fts WHERE rowid = old.id; END"
+    )
+
+
+def drop_delete_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute("DROP TRIGGER IF EXISTS usage_memo_fts_delete")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usage', '0013_usage_memo_fts'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_delete_trigger, drop_delete_trigger),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.4 on 2026-10-18 14:20
+
+from django.db import migrations
+
+
+def add_owner_column(apps, schema_editor):
+    # MATCH가 다른 사용자의 메모까지 찾지 않도록 사용자별 토큰 "#<user_id>#"를 검색 가능한 owner 열에 넣습니다.
+    # FTS5 가상 테이블에는 열을 추가할 수 없어 다시 만듭니다. (삭제 트리거는 테이블 이름으로 참조하므로 그대로 둡니다)
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS usage_memo_fts")
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE usage_memo_fts "
+        "USING fts5(memo, owner, user_id UNINDEXED, tokenize='trigram')"
+    )
+    schema_editor.execute(
+        "INSERT INTO usage_memo_fts (rowid, memo, owner, user_id) "
+        "SELECT id, memo, '#' || user_id || '#', user_id FROM usage_usagerecord WHERE memo <> ''"
+    )
+
+
+def remove_owner_column(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS usage_memo_fts")
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE usage_memo_fts "
+        "USING fts5(memo, user_id UNINDEXED, tokenize='trigram')"
+    )
+    schema_editor.execute(
+        "INSERT INTO usage_memo_fts (rowid, memo, user_id) "
+        "SELECT id, memo, user_id FROM usage_usagerecord WHERE memo <> ''"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usage', '0014_usage_memo_fts_delete_trigger'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_owner_column, remove_owner_column),
+    ]
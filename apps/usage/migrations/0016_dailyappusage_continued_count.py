@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 15:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usage', '0015_usage_memo_fts_owner'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailyappusage',
+            name='continued_count',
+            field=models.IntegerField(default=0),
+        ),
+    ]
@@ -8,6 +8,24 @@ class AppInfo(models.Model):
     def __str__(self):
         return f"{self.app_name} ({self.package_name})"
 
+class UsageRecordQuerySet(models.QuerySet):
+    def overlapping(self, user, start_date, end_date=None):
+        """
+        사용자 시간대 기준으로 [start_date, end_date] 날짜에 사용한 기록을 반환합니다. (end_date를 생략하면 start_date 하루)
+
+        local_date 등호/범위 조건이라 (user, local_date, start_time) 인덱스로 처리합니다.
+        자정을 넘는 기록은 USAGE_SPLIT_AT_MIDNIGHT이면 날짜별 세그먼트로 나뉘어 각 날짜에, 아니면 시작한 날짜에 포함됩니다.
+        user가 None이면 전체 사용자를 대상으로 합니다.
+        """
+        if end_date is None or end_date == start_date:
+            qs = self.filter(local_date=start_date)
+        else:
+            qs = self.filter(local_date__gte=start_date, local_date__lte=end_date)
+        if user is not None:
+            qs = qs.filter(user=user)
+        return qs
+
+
 class UsageRecord(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="usage_records", null=True)
     app = models.ForeignKey(AppInfo, on_delete=models.CASCADE, related_name="usage_records", null=True)
@@ -16,6 +34,123 @@ class UsageRecord(models.Model):
     end_time = models.BigIntegerField(null=True)
     memo = models.TextField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True, null= True)
+    # start_time이 속한 날짜 (사용자 프로필 시간대 기준). 날짜별 조회는 모두 이 값의 일치 조건으로 합니다.
+    local_date = models.DateField(null=True, blank=True)
+    # 자정을 넘는 기록을 날짜별 세그먼트로 나누어 저장한 경우, 같은 원본 기록의 세그먼트가 공유하는 id
+    session_id = models.UUIDField(null=True, blank=True)
+
+    objects = UsageRecordQuerySet.as_manager()
+
+    class Meta:
+        ordering = []
+        indexes = [
+            # 날짜 조회(user = ? AND local_date = ? ORDER BY start_time)를 정렬 없이 처리합니다.
+            models.Index(fields=["user", "local_date", "start_time"], name="usage_user_local_date_idx"),
+            # 전체 목록 커서 페이지네이션(ORDER BY start_time DESC, id DESC)을 정렬 없이 처리합니다.
+            models.Index(fields=["user", "start_time", "id"], name="usage_user_start_id_idx"),
+            # 세그먼트로 나뉜 기록만 담는 부분 인덱스 (세션 재구성, 재전송 확인용)
+            models.Index(
+                fields=["session_id"],
+                name="usage_session_idx",
+                condition=models.Q(session_id__isnull=False),
+            ),
+        ]
+        constraints = [
+            # 같은 세션이 재전송되어도 한 번만 저장되도록 자연키에 유니크 제약을 둡니다.
+            models.UniqueConstraint(
+                fields=["user", "app", "start_time", "end_time"],
+                name="usage_record_natural_key",
+            ),
+        ]
+
+
+class DailyAppUsage(models.Model):
+    """
+    사용자/앱/날짜별 사용시간 집계 테이블입니다.
+
+    사용 기록 저장과 메모 수정 시 같은 트랜잭션에서 갱신되며,
+    자정을 넘는 기록은 날짜별로 나누어 비례 배분합니다.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="daily_app_usages")
+    app = models.ForeignKey(AppInfo, on_delete=models.CASCADE, related_name="daily_usages")
+    date = models.DateField()
+    total_ms = models.BigIntegerField(default=0)
+    session_count = models.IntegerField(default=0)
+    # session_count 중 전날 시작해 자정을 넘어 이어진 세션 수 (기간 합계에서 세션을 한 번만 세기 위해 사용)
+    continued_count = models.IntegerField(default=0)
+    memo_count = models.IntegerField(default=0)
+    first_start = models.BigIntegerField(null=True)
+    last_end = models.BigIntegerField(null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "date", "app"], name="daily_app_usage_key"),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.date} - {self.app_id}"
+
+
+class HourlyUsage(models.Model):
+    """
+    사용자/날짜/시간대별 사용시간 버킷입니다. (히트맵 조회용)
+
+    정각을 넘는 기록은 시간대별로 나누어 비례 배분합니다.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="hourly_usages")
+    date = models.DateField()
+    hour = models.PositiveSmallIntegerField()
+    total_ms = models.BigIntegerField(default=0)
 
     class Meta:
-        ordering = []
\ No newline at end of file
+        constraints = [
+            models.UniqueConstraint(fields=["user", "date", "hour"], name="hourly_usage_key"),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.date} {self.hour:02d}시"
+
+
+class UsageArchive(models.Model):
+    """
+    콜드 아카이브로 옮긴 사용 기록의 매니페스트입니다. (사용자/월별 파일 하나)
+
+    파일은 USAGE_ARCHIVE_DIR/<user_id>/<YYYY-MM>.ndjson.gz에 있으며,
+    한 줄에 기록 하나가 JSON 객체로 저장됩니다.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="usage_archives")
+    month = models.DateField()  # 해당 월의 1일
+    path = models.CharField(max_length=255)  # USAGE_ARCHIVE_DIR 기준 상대 경로
+    record_count = models.IntegerField(default=0)
+    total_ms = models.BigIntegerField(default=0)
+    first_date = models.DateField(null=True)
+    last_date = models.DateField(null=True)
+    size_bytes = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "month"], name="usage_archive_key"),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.month:%Y-%m} ({self.record_count}건)"
+
+
+class UsageDayVersion(models.Model):
+    """
+    사용자/날짜(local_date)별 기록 변경 버전입니다. (조건부 요청의 ETag 계산용)
+
+    해당 날짜의 기록이 저장, 수정, 아카이브되거나 메모가 바뀔 때마다 1씩 증가합니다.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="usage_day_versions")
+    date = models.DateField()
+    version = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "date"], name="usage_day_version_key"),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.date} v{self.version}"
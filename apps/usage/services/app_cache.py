@@ -0,0 +1,116 @@
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import transaction
+
+from apps.usage.models import AppInfo
+
+
+class AppInfoResolver:
+    """
+    package_name -> AppInfo.id 를 찾아주는 프로세스 내 LRU 캐시입니다.
+
+    - 처음 사용할 때 최대 max_size개의 AppInfo를 미리 읽어 옵니다.
+    - 캐시에 없는 패키지는 한 번에 조회하고, DB에도 없으면 일괄 생성합니다.
+    - 새로 생성한 AppInfo는 트랜잭션이 커밋된 뒤에만 캐시에 올라갑니다.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._cache: OrderedDict[str, int] = OrderedDict()
+        self._lock = threading.Lock()
+        self._warmed = False
+
+    def resolve(self, package_name: str, app_name: str) -> int:
+        return self.resolve_many({package_name: app_name})[package_name]
+
+    def resolve_many(self, app_names: dict[str, str]) -> dict[str, int]:
+        """{package_name: app_name} 을 받아 {package_name: app_id} 를 반환합니다."""
+        self._warm()
+
+        app_ids = {}
+        with self._lock:
+            for package_name in app_names:
+                app_id = self._cache.get(package_name)
+                if app_id is None:
+                    self.misses += 1
+                    continue
+                self.hits += 1
+                self._cache.move_to_end(package_name)
+                app_ids[package_name] = app_id
+
+        missing = [name for name in app_names if name not in app_ids]
+        if not missing:
+            return app_ids
+
+        found = dict(
+            AppInfo.objects.filter(package_name__in=missing).values_list("package_name", "id")
+        )
+        self._store(found)
+        app_ids.update(found)
+
+        to_create = [name for name in missing if name not in found]
+        if to_create:
+            AppInfo.objects.bulk_create(
+                [AppInfo(package_name=name, app_name=app_names[name]) for name in to_create],
+                ignore_conflicts=True,
+            )
+            # ignore_conflicts 사용 시 pk가 채워지지 않으므로 다시 조회합니다.
+            created = dict(
+                AppInfo.objects.filter(package_name__in=to_create).values_list("package_name", "id")
+            )
+            transaction.on_commit(lambda: self._store(created))
+            app_ids.update(created)
+
+        return app_ids
+
+    def invalidate(self, package_name: str, app_id: int | None = None) -> None:
+        with self._lock:
+            self._cache.pop(package_name, None)
+            if app_id is not None:
+                # package_name이 바뀐 경우 이전 이름으로 남아 있는 항목도 제거합니다.
+                for name in [k for k, v in self._cache.items() if v == app_id]:
+                    del self._cache[name]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self._warmed = False
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._cache),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+    def _warm(self) -> None:
+        if self._warmed:
+            return
+        rows = list(
+            AppInfo.objects.order_by("-id").values_list("package_name", "id")[: self.max_size]
+        )
+        with self._lock:
+            if not self._warmed:
+                self._cache.update(reversed(rows))
+                self._warmed = True
+
+    def _store(self, app_ids: dict[str, int]) -> None:
+        with self._lock:
+            for package_name, app_id in app_ids.items():
+                self._cache[package_name] = app_id
+                self._cache.move_to_end(package_name)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+
+
+app_resolver = AppInfoResolver(max_size=settings.USAGE_APP_CACHE_SIZE)
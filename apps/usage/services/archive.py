@@ -0,0 +1,179 @@
+import datetime
+import gzip
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+
+from apps.usage.models import UsageArchive, UsageRecord
+from apps.usage.services.versions import bump_day_versions
+
+
+@dataclass
+class ArchiveStats:
+    users: int = 0
+    months: int = 0
+    archived: int = 0
+    bytes_written: int = 0
+
+
+def archive_path(user_id: int, month: datetime.date) -> str:
+    """USAGE_ARCHIVE_DIR 기준 상대 경로 (<user_id>/<YYYY-MM>.ndjson.gz)"""
+    return f"{user_id}/{month:%Y-%m}.ndjson.gz"
+
+
+def _absolute(relative: str) -> Path:
+    return Path(settings.USAGE_ARCHIVE_DIR) / relative
+
+
+def _to_row(record: UsageRecord) -> dict:
+    return {
+        "id": record.id,
+        "package_name": record.app.package_name if record.app else None,
+        "app_name": record.app.app_name if record.app else None,
+        "usage_time_ms": record.usage_time_ms,
+        "start_time": record.start_time,
+        "end_time": record.end_time,
+        "memo": record.memo,
+        "local_date": record.local_date.isoformat() if record.local_date else None,
+        "session_id": str(record.session_id) if record.session_id else None,
+        "created_at": record.created_at.isoformat() if record.created_at else None,
+    }
+
+
+def read_archive(archive: UsageArchive) -> Iterator[dict]:
+    """아카이브 파일의 기록을 한 줄씩 읽어 반환합니다."""
+    with gzip.open(_absolute(archive.path), "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _write_atomic(path: Path, rows: list[dict]) -> int:
+    """임시 파일에 쓴 뒤 rename해서, 읽는 쪽은 항상 완성된 파일만 보도록 합니다."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as f:
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False).encode("utf-8"))
+                f.write(b"\n")
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(tmp, path)
+    return path.stat().st_size
+
+
+def archived_rows_for_date(user, target_date: datetime.date) -> list[tuple]:
+    """
+    아카이브에 있는 target_date(local_date) 기록을 list_serializer.LIST_COLUMNS 순서의 튜플로 반환합니다.
+
+    해당 월의 아카이브가 없으면 매니페스트 조회 한 번으로 끝납니다.
+    """
+    archive = UsageArchive.objects.filter(user=user, month=target_date.replace(day=1)).first()
+    if archive is None:
+        return []
+    day = target_date.isoformat()
+    return [
+        (r["id"], r["package_name"], r["app_name"], r["usage_time_ms"], r["start_time"], r["end_time"], r["session_id"])
+        for r in read_archive(archive)
+        if r["local_date"] == day
+    ]
+
+
+def archived_natural_keys(user_id: int, months: Iterable[datetime.date]) -> tuple[dict, dict]:
+    """
+    months(각 월 1일)의 아카이브에 있는 기록을 자연키로 찾을 수 있게 반환합니다.
+
+    ({(package_name, start_time, end_time): (id, usage_time_ms)}, {session_id: (첫 세그먼트 id, 전체 사용시간)})
+    해당 월의 아카이브가 없으면 매니페스트 조회 한 번으로 끝납니다.
+    """
+    records, sessions = {}, {}
+    for archive in UsageArchive.objects.filter(user_id=user_id, month__in=set(months)):
+        for r in read_archive(archive):
+            records.setdefault((r["package_name"], r["start_time"], r["end_time"]), (r["id"], r["usage_time_ms"]))
+            if r["session_id"]:
+                first_id, total = sessions.get(r["session_id"], (r["id"], 0))
+                sessions[r["session_id"]] = (min(first_id, r["id"]), total + (r["usage_time_ms"] or 0))
+    return records, sessions
+
+
+def hot_since(user_id: int) -> Optional[datetime.date]:
+    """아카이브된 마지막 날짜의 다음 날을 반환합니다. 이 날짜부터의 기록만 hot 테이블에 온전히 남아 있습니다."""
+    last_date = UsageArchive.objects.filter(user_id=user_id).aggregate(last=Max("last_date"))["last"]
+    return last_date + datetime.timedelta(days=1) if last_date else None
+
+
+def archive_month(user_id: int, month: datetime.date, cutoff: datetime.date, dry_run: bool = False) -> tuple[int, int]:
+    """
+    한 사용자의 month 중 cutoff 이전(local_date 기준) 기록을 아카이브 파일로 옮깁니다.
+
+    - 이미 파일이 있으면 기존 기록과 합쳐 다시 씁니다. (늦게 업로드된 기록)
+    - 파일을 먼저 쓰고 같은 트랜잭션에서 매니페스트 갱신과 원본 삭제를 합니다.
+      삭제 전에 중단되면 다음 실행에서 id로 중복을 걸러 다시 처리합니다.
+    (옮긴 기록 수, 쓴 바이트 수)를 반환합니다.
+    """
+    next_month = (month + datetime.timedelta(days=32)).replace(day=1)
+    end = min(next_month, cutoff)
+
+    with transaction.atomic():
+        hot = [
+            _to_row(r)
+            for r in UsageRecord.objects.filter(user_id=user_id, local_date__gte=month, local_date__lt=end)
+            .select_related("app")
+            .order_by("start_time", "id")
+        ]
+        if not hot or dry_run:
+            return len(hot), 0
+
+        manifest = UsageArchive.objects.filter(user_id=user_id, month=month).first()
+        rows = {row["id"]: row for row in read_archive(manifest)} if manifest else {}
+        # 아카이브 이후 재전송된 기록(자연키가 같은 기록)은 파일에 다시 넣지 않고 hot 테이블에서만 지웁니다.
+        natural_keys = {(r["package_name"], r["start_time"], r["end_time"]) for r in rows.values()}
+        for row in hot:
+            key = (row["package_name"], row["start_time"], row["end_time"])
+            if row["id"] in rows or key in natural_keys:
+                continue
+            rows[row["id"]] = row
+            natural_keys.add(key)
+
+        ordered = sorted(rows.values(), key=lambda r: (r["start_time"] or 0, r["id"]))
+        relative = archive_path(user_id, month)
+        size = _write_atomic(_absolute(relative), ordered)
+
+        dates = [r["local_date"] for r in ordered if r["local_date"]]
+        UsageArchive.objects.update_or_create(
+            user_id=user_id,
+            month=month,
+            defaults={
+                "path": relative,
+                "record_count": len(ordered),
+                "total_ms": sum(r["usage_time_ms"] or 0 for r in ordered),
+                "first_date": datetime.date.fromisoformat(min(dates)) if dates else None,
+                "last_date": datetime.date.fromisoformat(max(dates)) if dates else None,
+                "size_bytes": size,
+            },
+        )
+        ids = [row["id"] for row in hot]
+        for i in range(0, len(ids), 500):
+            UsageRecord.objects.filter(id__in=ids[i:i + 500]).delete()
+        # 전체 목록(hot 테이블)에서 빠지는 기록이 있으므로 옮긴 날짜의 버전을 올립니다.
+        bump_day_versions(user_id, {datetime.date.fromisoformat(row["local_date"]) for row in hot if row["local_date"]})
+    return len(hot), size
+
+
+def archive_user(user_id: int, cutoff: datetime.date, dry_run: bool = False) -> ArchiveStats:
+    stats = ArchiveStats(users=1)
+    months = UsageRecord.objects.filter(user_id=user_id, local_date__lt=cutoff).dates("local_date", "month")
+    for month in months:
+        archived, size = archive_month(user_id, month, cutoff, dry_run=dry_run)
+        if archived:
+            stats.months += 1
+            stats.archived += archived
+            stats.bytes_written += size
+    return stats
@@ -0,0 +1,139 @@
+import time
+from dataclasses import dataclass
+
+from django.db import transaction
+from django.db.models import Count, Min
+
+from apps.usage.models import UsageRecord
+from apps.usage.services.heatmap import apply_hourly_deltas
+from apps.usage.services.intervals import user_timezone
+from apps.usage.services.memo_search import index_memos
+from apps.usage.services.rollup import UsageDelta, adjust_memo_counts, apply_usage_deltas
+from apps.usage.services.versions import bump_day_versions
+
+
+@dataclass
+class DedupeStats:
+    users: int = 0
+    affected_users: int = 0
+    deleted: int = 0
+
+
+def find_duplicate_ids(user_id: int) -> list[int]:
+    """
+    한 사용자의 기록 중 (app, start_time, end_time)이 같은 중복 기록의 id를 찾습니다.
+
+    가장 먼저 저장된(id가 가장 작은) 기록은 남기고, 나머지 id만 반환합니다.
+    남길 기록에 메모가 없고 중복 기록에 메모가 있으면 메모를 옮겨 둡니다.
+    """
+    groups = (
+        UsageRecord.objects.filter(user_id=user_id)
+        .values("app_id", "start_time", "end_time")
+        .annotate(n=Count("id"), keep_id=Min("id"))
+        .filter(n__gt=1)
+    )
+
+    duplicate_ids = []
+    for group in groups:
+        rows = list(
+            UsageRecord.objects.filter(
+                user_id=user_id,
+                app_id=group["app_id"],
+                start_time=group["start_time"],
+                end_time=group["end_time"],
+            ).order_by("id").values_list("id", "memo", "local_date")
+        )
+        keep_id, keep_memo, keep_date = rows[0]
+        if not keep_memo:
+            memo = next((m for _, m, _ in rows[1:] if m), None)
+            if memo:
+                keep = UsageRecord(
+                    id=keep_id,
+                    user_id=user_id,
+                    app_id=group["app_id"],
+                    start_time=group["start_time"],
+                    memo=memo,
+                    local_date=keep_date,
+                )
+                UsageRecord.objects.filter(id=keep_id).update(memo=memo)
+                index_memos([keep])
+                # 옮겨 받은 메모는 남길 기록의 memo_count로 셉니다. 중복 기록의 메모는 삭제할 때 뺍니다.
+                adjust_memo_counts(user_id, [(keep, 1)])
+        duplicate_ids.extend(record_id for record_id, _, _ in rows[1:])
+
+    return duplicate_ids
+
+
+def delete_duplicates(user_id: int, ids: list[int], tz) -> int:
+    """
+    중복 기록을 지우고, 같은 트랜잭션에서 일별·시간대별 집계와 목록 버전을 되돌립니다.
+
+    지운 기록과 같은 (앱, 시작, 종료)인 기록이 남아 있으므로 first_start/last_end는 그대로 둡니다.
+    메모 검색 인덱스는 삭제 트리거(usage_memo_fts_delete)가 정리합니다.
+    """
+    with transaction.atomic():
+        rows = list(
+            UsageRecord.objects.filter(user_id=user_id, id__in=ids).only(
+                "id", "user_id", "app_id", "usage_time_ms", "start_time", "end_time", "memo", "local_date"
+            )
+        )
+        deltas = [
+            UsageDelta(r.app_id, r.start_time, r.end_time, -(r.usage_time_ms or 0), sessions=-1)
+            for r in rows
+            if r.app_id is not None and r.start_time is not None and r.end_time is not None
+        ]
+        UsageRecord.objects.filter(id__in=[r.id for r in rows]).delete()
+        apply_usage_deltas(user_id, deltas, tz)
+        apply_hourly_deltas(user_id, deltas, tz)
+        adjust_memo_counts(user_id, [(r, -1) for r in rows if r.memo])
+        bump_day_versions(user_id, [r.local_date for r in rows])
+    return len(rows)
+
+
+def dedupe_usage_records(
+    chunk_size: int = 500,
+    pause: float = 0.0,
+    dry_run: bool = False,
+    stdout=None,
+) -> DedupeStats:
+    """
+    사용자 단위로 중복 기록을 정리합니다.
+
+    삭제는 chunk_size개씩 짧은 트랜잭션으로 나누어 실행하므로
+    테이블 쓰기 잠금을 오래 잡지 않습니다. pause초만큼 청크 사이에 쉬어 갈 수 있습니다.
+    청크마다 지운 기록만큼 DailyAppUsage/HourlyUsage 집계도 함께 줄입니다.
+    """
+    stats = DedupeStats()
+    user_ids = list(
+        UsageRecord.objects.exclude(user_id=None)
+        .order_by("user_id")
+        .values_list("user_id", flat=True)
+        .distinct()
+    )
+
+    for user_id in user_ids:
+        stats.users += 1
+        with transaction.atomic():
+            duplicate_ids = find_duplicate_ids(user_id)
+            if dry_run:
+                # dry-run에서는 메모 이동도 되돌리고 삭제 대상만 계산합니다.
+                transaction.set_rollback(True)
+
+        if not duplicate_ids:
+            continue
+        stats.affected_users += 1
+        tz = user_timezone(user_id)
+
+        for i in range(0, len(duplicate_ids), chunk_size):
+            chunk = duplicate_ids[i:i + chunk_size]
+            if not dry_run:
+                delete_duplicates(user_id, chunk, tz)
+            stats.deleted += len(chunk)
+            if pause:
+                time.sleep(pause)
+
+        if stdout:
+            stdout.write(f"user {user_id}: 중복 {len(duplicate_ids)}건")
+
+    return stats
+
@@ -0,0 +1,100 @@
+import datetime
+from collections import defaultdict
+from typing import Iterable, Optional
+from zoneinfo import ZoneInfo
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.db.models.functions import ExtractIsoWeekDay
+
+from apps.usage.models import HourlyUsage, UsageRecord
+from apps.usage.services.archive import hot_since
+from apps.usage.services.intervals import split_by_hour, user_timezone
+from apps.usage.services.rollup import UsageDelta
+
+
+def collect_hourly_totals(deltas: Iterable[UsageDelta], tz) -> dict[tuple[datetime.date, int], int]:
+    totals = defaultdict(int)
+    for delta in deltas:
+        for day, hour, usage_ms in split_by_hour(delta.start_ms, delta.end_ms, delta.usage_ms, tz):
+            totals[(day, hour)] += usage_ms
+    return totals
+
+
+def apply_hourly_deltas(user_id: int, deltas: Iterable[UsageDelta], tz: Optional[ZoneInfo] = None) -> None:
+    """사용 기록 변화량을 HourlyUsage 버킷에 누적합니다. 호출하는 쪽의 트랜잭션 안에서 실행되어야 합니다."""
+    for (day, hour), usage_ms in collect_hourly_totals(deltas, tz or user_timezone(user_id)).items():
+        if usage_ms:
+            _upsert(user_id, day, hour, usage_ms)
+
+
+def _upsert(user_id: int, day: datetime.date, hour: int, usage_ms: int) -> None:
+    def update() -> int:
+        return HourlyUsage.objects.filter(user_id=user_id, date=day, hour=hour).update(
+            total_ms=F("total_ms") + usage_ms
+        )
+
+    if update():
+        return
+    try:
+        with transaction.atomic():
+            HourlyUsage.objects.create(user_id=user_id, date=day, hour=hour, total_ms=usage_ms)
+    except IntegrityError:
+        update()
+
+
+def weekly_heatmap(user, start_date: datetime.date, end_date: datetime.date) -> list[list[int]]:
+    """
+    [start_date, end_date] 기간의 요일(월=0) x 시간대(0~23) 사용시간 합계를 반환합니다.
+
+    기간 내 버킷(최대 일수 x 24행)만 읽고, 요일/시간대별 합계는 DB에서 계산합니다.
+    """
+    cells = [[0] * 24 for _ in range(7)]
+    rows = (
+        HourlyUsage.objects.filter(user=user, date__range=(start_date, end_date))
+        .annotate(weekday=ExtractIsoWeekDay("date"))
+        .values("weekday", "hour")
+        .annotate(total=Sum("total_ms"))
+        .order_by()
+    )
+    for row in rows:
+        cells[row["weekday"] - 1][row["hour"]] = row["total"]
+    return cells
+
+
+def rebuild_user_heatmap(user_id: int, since: Optional[datetime.date] = None) -> int:
+    """
+    한 사용자의 HourlyUsage를 원본 기록으로부터 다시 계산하고, 생성한 버킷 수를 반환합니다.
+
+    아카이브로 옮겨진 날짜의 버킷은 그대로 둡니다.
+    """
+    hot_start = hot_since(user_id)
+    if hot_start is not None and (since is None or since < hot_start):
+        since = hot_start
+    tz = user_timezone(user_id)
+    records = UsageRecord.objects.filter(user_id=user_id).exclude(start_time=None)
+    if since is not None:
+        since_ms = int(datetime.datetime.combine(since, datetime.time.min, tz).timestamp() * 1000)
+        records = records.filter(end_time__gte=since_ms)
+
+    with transaction.atomic():
+        totals = defaultdict(int)
+        rows = records.values_list("start_time", "end_time", "usage_time_ms")
+        for start, end, usage in rows.iterator(chunk_size=2000):
+            for day, hour, usage_ms in split_by_hour(start, end, usage or 0, tz):
+                if since is None or day >= since:
+                    totals[(day, hour)] += usage_ms
+
+        existing = HourlyUsage.objects.filter(user_id=user_id)
+        if since is not None:
+            existing = existing.filter(date__gte=since)
+        existing.delete()
+        HourlyUsage.objects.bulk_create(
+            [
+                HourlyUsage(user_id=user_id, date=day, hour=hour, total_ms=usage_ms)
+                for (day, hour), usage_ms in totals.items()
+                if usage_ms
+            ],
+            batch_size=1000,
+        )
+    return len(totals)
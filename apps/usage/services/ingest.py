@@ -0,0 +1,204 @@
+from dataclasses import dataclass
+from typing import List, Optional
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+
+from apps.usage.models import UsageRecord
+from apps.usage.services.app_cache import app_resolver
+from apps.usage.services.archive import archived_natural_keys
+from apps.usage.services.heatmap import apply_hourly_deltas
+from apps.usage.services.intervals import local_date, user_timezone
+from apps.usage.services.rollup import UsageDelta, apply_usage_deltas
+from apps.usage.services.versions import bump_day_versions
+from apps.usage.services.sessions import (
+    find_existing_sessions,
+    redistribute_session,
+    session_uuid,
+    split_at_midnight,
+)
+
+
+# 같은 (user, app, start_time, end_time) 기록이 이미 있을 때의 처리 방식
+ON_CONFLICT_ERROR = "error"    # 중복으로 보고 저장하지 않음
+ON_CONFLICT_IGNORE = "ignore"  # 기존 기록을 그대로 두고 기존 id를 반환
+ON_CONFLICT_UPDATE = "update"  # 기존 기록의 usage_time_ms를 새 값으로 갱신
+ON_CONFLICT_CHOICES = (ON_CONFLICT_ERROR, ON_CONFLICT_IGNORE, ON_CONFLICT_UPDATE)
+
+DUPLICATE_ERROR = "이미 등록된 사용 기록입니다."
+
+
+@dataclass
+class IngestResult:
+    index: int
+    record_id: Optional[int] = None
+    created: bool = False
+    error: Optional[str] = None
+
+
+def validate_item(item) -> Optional[str]:
+    """단일 기록의 값이 저장 가능한지 확인하고, 문제가 있으면 에러 메시지를 반환합니다."""
+    if item.usage_time_ms < 0:
+        return "usage_time_ms는 0 이상이어야 합니다."
+    if item.end_time < item.start_time:
+        return "end_time은 start_time보다 빠를 수 없습니다."
+    return None
+
+
+def find_existing(user: User, keys) -> dict[tuple, tuple[int, int]]:
+    """(app_id, start_time, end_time) 키로 이미 저장된 기록을 유니크 인덱스로 한 번에 조회합니다."""
+    if not keys:
+        return {}
+    rows = UsageRecord.objects.filter(
+        user=user,
+        app_id__in={k[0] for k in keys},
+        start_time__in={k[1] for k in keys},
+        end_time__in={k[2] for k in keys},
+    ).values_list("id", "app_id", "start_time", "end_time", "usage_time_ms")
+    return {(app_id, start, end): (record_id, usage) for record_id, app_id, start, end, usage in rows}
+
+
+def find_archived(user: User, keys, package_names: dict[int, str], tz) -> dict[tuple, tuple[int, int]]:
+    """
+    (app_id, start_time, end_time) 키 중 아카이브 파일로 옮겨진 기록을 찾아 {키: (id, 사용시간)}으로 반환합니다.
+
+    키가 속한 달(local_date 기준)에 아카이브가 없으면 매니페스트 조회 한 번으로 끝납니다.
+    """
+    if not keys:
+        return {}
+    records, sessions = archived_natural_keys(user.pk, {local_date(k[1], tz).replace(day=1) for k in keys})
+    found = {}
+    for key in keys:
+        app_id, start, end = key
+        match = records.get((package_names[app_id], start, end))
+        if match is None:
+            # 아카이브할 때의 시간대로 나뉘었을 수 있으므로 지금 시간대로 자정을 넘는지와 상관없이 세션 id로도 찾습니다.
+            match = sessions.get(str(session_uuid(user.pk, *key)))
+        if match is not None:
+            found[key] = match
+    return found
+
+
+def ingest_usage_records(user: User, items: List, on_conflict: str = ON_CONFLICT_ERROR) -> List[IngestResult]:
+    """
+    여러 개의 사용 기록을 하나의 트랜잭션으로 저장합니다.
+
+    결과는 요청 순서대로 반환되며, 저장되지 않은 항목은 error에 사유가 담깁니다.
+    재전송된 기록(자연키 중복)은 on_conflict에 따라 처리합니다.
+    """
+    results = [IngestResult(index=i) for i in range(len(items))]
+
+    valid = []
+    for result, item in zip(results, items):
+        result.error = validate_item(item)
+        if result.error is None:
+            valid.append((result, item))
+
+    if not valid:
+        return results
+
+    try:
+        outcomes = _write_records(user, valid, on_conflict)
+    except IntegrityError:
+        # 동시에 같은 기록을 저장한 요청이 있었던 경우입니다.
+        # ignore/update 모드는 다시 조회하면 기존 기록으로 처리되므로 한 번만 재시도합니다.
+        if on_conflict == ON_CONFLICT_ERROR:
+            raise
+        outcomes = _write_records(user, valid, on_conflict)
+
+    for result, (record_id, created, error) in zip((r for r, _ in valid), outcomes):
+        result.record_id = record_id
+        result.created = created
+        result.error = error
+
+    return results
+
+
+def _write_records(user: User, valid: list, on_conflict: str) -> list[tuple[Optional[int], bool, Optional[str]]]:
+    tz = user_timezone(user.pk)
+    with transaction.atomic():
+        app_ids = app_resolver.resolve_many(
+            {item.package_name: item.app_name for _, item in reversed(valid)}
+        )
+        keys = [(app_ids[item.package_name], item.start_time, item.end_time) for _, item in valid]
+        existing = find_existing(user, set(keys))
+        # 자정을 넘는 기록은 세그먼트로 나뉘어 저장되어 있을 수 있으므로 세션 id로도 확인합니다.
+        # (시간대가 바뀌었으면 지금은 자정을 넘지 않는 기록도 예전 시간대로 나뉘어 있을 수 있습니다)
+        sessions = find_existing_sessions(user, set(keys) - existing.keys())
+        existing.update({key: (first_id, total) for key, (_, first_id, total) in sessions.items()})
+        # 아카이브된 달로 재전송된 기록은 아카이브 파일의 자연키로 확인합니다. (아카이브된 기록은 수정하지 않습니다)
+        archived = find_archived(
+            user, set(keys) - existing.keys(), {app_id: name for name, app_id in app_ids.items()}, tz
+        )
+        existing.update(archived)
+
+        pending: dict[tuple, UsageRecord] = {}
+        updates: dict[int, tuple[tuple, int, int]] = {}  # record_id -> (key, 이전 사용시간, 새 사용시간)
+        outcomes = []
+        for (_, item), key in zip(valid, keys):
+            if key in existing or key in pending:
+                if on_conflict == ON_CONFLICT_ERROR:
+                    outcomes.append((None, False, DUPLICATE_ERROR))
+                    continue
+                if key in pending:
+                    # 같은 요청 안에서 반복된 기록은 먼저 나온 기록을 가리킵니다.
+                    if on_conflict == ON_CONFLICT_UPDATE:
+                        pending[key].usage_time_ms = item.usage_time_ms
+                    outcomes.append((pending[key], False, None))
+                    continue
+                record_id, usage_time_ms = existing[key]
+                if on_conflict == ON_CONFLICT_UPDATE and usage_time_ms != item.usage_time_ms and key not in archived:
+                    if key in sessions:
+                        for seg_id, seg_key, old, new in redistribute_session(sessions[key][0], item.usage_time_ms):
+                            updates[seg_id] = (seg_key, old, new)
+                    else:
+                        updates[record_id] = (key, usage_time_ms, item.usage_time_ms)
+                outcomes.append((record_id, False, None))
+                continue
+
+            pending[key] = UsageRecord(
+                user=user,
+                app_id=key[0],
+                usage_time_ms=item.usage_time_ms,
+                start_time=item.start_time,
+                end_time=item.end_time,
+                local_date=local_date(item.start_time, tz),
+            )
+            outcomes.append((pending[key], True, None))
+
+        created = list(pending.values())
+        # 나뉜 세션의 첫 세그먼트는 원래 기록 객체이고, 그 뒤 세그먼트는 이어진 날의 기록입니다.
+        heads = {id(record) for record in created}
+        if settings.USAGE_SPLIT_AT_MIDNIGHT:
+            # 자정을 넘는 기록은 날짜별 세그먼트로 나누어 저장합니다. (첫 세그먼트가 결과의 record_id)
+            created = [seg for record in created for seg in split_at_midnight(record, tz)]
+        UsageRecord.objects.bulk_create(created)
+
+        if updates:
+            UsageRecord.objects.bulk_update(
+                [UsageRecord(id=record_id, usage_time_ms=new) for record_id, (_, _, new) in updates.items()],
+                fields=["usage_time_ms"],
+            )
+
+        # 일별 집계(DailyAppUsage)도 같은 트랜잭션에서 갱신합니다.
+        deltas = [
+            *(UsageDelta(r.app_id, r.start_time, r.end_time, r.usage_time_ms, continued=id(r) not in heads)
+              for r in created),
+            # 사용시간 수정은 이전 값을 빼고 새 값을 더해, 다시 계산한 집계와 반올림까지 같도록 합니다.
+            *(UsageDelta(app_id, start, end, usage, sessions=0)
+              for (app_id, start, end), old, new in updates.values()
+              for usage in (-old, new)),
+        ]
+        apply_usage_deltas(user.pk, deltas, tz)
+        apply_hourly_deltas(user.pk, deltas, tz)
+        # 기록이 바뀐 날짜의 목록 ETag가 달라지도록 버전을 올립니다.
+        bump_day_versions(user.pk, [
+            *(r.local_date for r in created),
+            *(local_date(start, tz) for (_, start, _), _, _ in updates.values()),
+        ])
+
+    return [
+        (target.pk if isinstance(target, UsageRecord) else target, created, error)
+        for target, created, error in outcomes
+    ]
@@ -0,0 +1,117 @@
+import datetime
+from typing import Callable, Iterator, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.conf import settings
+
+from apps.users.models import Profile
+
+
+def default_timezone() -> ZoneInfo:
+    return ZoneInfo(settings.TIME_ZONE)
+
+
+def parse_timezone(name: Optional[str]) -> Optional[ZoneInfo]:
+    """IANA 시간대 이름(ex. Asia/Seoul)을 ZoneInfo로 바꿉니다. 알 수 없는 이름이면 None을 반환합니다."""
+    if not name:
+        return None
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+
+
+def user_timezone(user_id: Optional[int]) -> ZoneInfo:
+    """
+    사용자 프로필에 설정된 시간대를 반환합니다.
+
+    사용 기록의 local_date, 일별/시간대별 집계의 날짜는 모두 이 시간대를 기준으로 합니다.
+    프로필이 없거나 시간대가 잘못된 경우 서버 기본 시간대(TIME_ZONE)를 사용합니다.
+    """
+    name = Profile.objects.filter(user_id=user_id).values_list("timezone", flat=True).first()
+    return parse_timezone(name) or default_timezone()
+
+
+async def auser_timezone(user_id: Optional[int]) -> ZoneInfo:
+    """user_timezone의 비동기 버전입니다."""
+    name = await Profile.objects.filter(user_id=user_id).values_list("timezone", flat=True).afirst()
+    return parse_timezone(name) or default_timezone()
+
+
+def local_today(tz: ZoneInfo) -> datetime.date:
+    return datetime.datetime.now(tz).date()
+
+
+def local_date(ms: int, tz: ZoneInfo) -> datetime.date:
+    return datetime.datetime.fromtimestamp(ms / 1000, tz).date()
+
+
+def next_midnight_ms(ms: int, tz: ZoneInfo) -> int:
+    """ms가 속한 날의 다음 날 0시(tz 기준)를 밀리초로 반환합니다."""
+    next_day = local_date(ms, tz) + datetime.timedelta(days=1)
+    return int(datetime.datetime.combine(next_day, datetime.time.min, tz).timestamp() * 1000)
+
+
+def next_hour_ms(ms: int, tz: ZoneInfo) -> int:
+    """ms가 속한 시(tz 기준)의 다음 정각을 밀리초로 반환합니다."""
+    local = datetime.datetime.fromtimestamp(ms / 1000, tz).replace(minute=0, second=0, microsecond=0)
+    return int(local.timestamp() * 1000) + 3600 * 1000
+
+
+def split_interval(
+    start_ms: int,
+    end_ms: int,
+    usage_ms: int,
+    next_boundary: Callable[[int], int],
+) -> Iterator[tuple[int, int, int]]:
+    """
+    [start_ms, end_ms) 구간을 경계(next_boundary)마다 잘라 (구간 시작, 구간 끝, 사용시간)을 반환합니다.
+
+    사용시간은 구간 길이에 비례해 나누고, 반올림 오차는 마지막 구간에 몰아서
+    나눈 사용시간의 합이 항상 usage_ms와 같도록 합니다.
+    음수(집계에서 빼는 변화량)는 양수와 정확히 반대로 나뉩니다.
+    """
+    if end_ms <= start_ms:
+        yield start_ms, end_ms, usage_ms
+        return
+
+    duration = end_ms - start_ms
+    sign = -1 if usage_ms < 0 else 1
+    assigned = 0
+    cursor = start_ms
+    while cursor < end_ms:
+        boundary = min(next_boundary(cursor), end_ms)
+        if boundary >= end_ms:
+            yield cursor, end_ms, usage_ms - assigned
+            return
+        part = sign * (abs(usage_ms) * (boundary - cursor) // duration)
+        assigned += part
+        yield cursor, boundary, part
+        cursor = boundary
+
+
+def split_by_day(
+    start_ms: int,
+    end_ms: int,
+    usage_ms: int,
+    tz: ZoneInfo,
+) -> Iterator[tuple[datetime.date, int, int, int]]:
+    """자정(tz 기준)마다 구간을 잘라 (날짜, 구간 시작, 구간 끝, 사용시간)을 반환합니다."""
+    for seg_start, seg_end, seg_usage in split_interval(
+        start_ms, end_ms, usage_ms, lambda ms: next_midnight_ms(ms, tz)
+    ):
+        yield local_date(seg_start, tz), seg_start, seg_end, seg_usage
+
+
+def split_by_hour(
+    start_ms: int,
+    end_ms: int,
+    usage_ms: int,
+    tz: ZoneInfo,
+) -> Iterator[tuple[datetime.date, int, int]]:
+    """정각(tz 기준)마다 구간을 잘라 (날짜, 시, 사용시간)을 반환합니다."""
+    for seg_start, _, seg_usage in split_interval(
+        start_ms, end_ms, usage_ms, lambda ms: next_hour_ms(ms, tz)
+    ):
+        local = datetime.datetime.fromtimestamp(seg_start / 1000, tz)
+        yield local.date(), local.hour, seg_usage
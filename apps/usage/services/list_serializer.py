@@ -0,0 +1,159 @@
+import datetime
+import json
+from itertools import islice
+from json.encoder import encode_basestring_ascii
+from typing import AsyncIterator, Iterable, Iterator, Optional
+
+from asgiref.sync import sync_to_async
+
+# list_usage 응답 한 건을 만드는 데 필요한 컬럼 (values_list 순서와 같습니다)
+LIST_COLUMNS = ("id", "app__package_name", "app__app_name", "usage_time_ms", "start_time", "end_time", "session_id")
+
+
+class TimestampFormatter:
+    """
+    밀리초 타임스탬프를 datetime.fromtimestamp(ms / 1000).strftime("%Y-%m-%d %H:%M:%S")와
+    같은 문자열로 바꿉니다.
+
+    "YYYY-MM-DD HH:" 부분을 (UTC 기준) 시간 단위로 캐시하고 분:초만 덧붙이므로, 시간이 가까운
+    기록이 몰려 있는 목록 응답에서는 행마다 datetime을 만들지 않습니다. 30분 단위 시차처럼
+    그 한 시간이 현지 시각 한 시간과 맞아떨어지지 않는 경우에는 매번 직접 변환합니다.
+    tz가 None이면 fromtimestamp와 같이 서버 로컬 시간대를 사용합니다.
+    """
+
+    def __init__(self, tz: Optional[datetime.tzinfo] = None, max_size: int = 4096):
+        self.tz = tz
+        self.max_size = max_size
+        self._hours: dict[int, Optional[str]] = {}
+
+    def format(self, ms: int) -> str:
+        seconds = ms // 1000
+        hour, rem = divmod(seconds, 3600)
+        try:
+            prefix = self._hours[hour]
+        except KeyError:
+            prefix = self._hour_prefix(hour)
+        if prefix is None:
+            return datetime.datetime.fromtimestamp(seconds, self.tz).strftime("%Y-%m-%d %H:%M:%S")
+        minute, second = divmod(rem, 60)
+        return f"{prefix}{minute:02d}:{second:02d}"
+
+    def _hour_prefix(self, hour: int) -> Optional[str]:
+        if len(self._hours) >= self.max_size:
+            self._hours.clear()
+        start = datetime.datetime.fromtimestamp(hour * 3600, self.tz)
+        end = datetime.datetime.fromtimestamp(hour * 3600 + 3599, self.tz)
+        if start.minute == 0 and end.minute == 59 and start.hour == end.hour:
+            prefix = start.strftime("%Y-%m-%d %H:")
+        else:
+            prefix = None
+        self._hours[hour] = prefix
+        return prefix
+
+
+def format_duration_ms(ms: int) -> str:
+    """str(timedelta(milliseconds=ms))와 같은 문자열을 timedelta 객체 없이 만듭니다."""
+    days, rem = divmod(ms, 86_400_000)
+    seconds, millis = divmod(rem, 1000)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    s = f"{hours}:{minutes:02d}:{seconds:02d}"
+    if millis:
+        s += f".{millis * 1000:06d}"
+    if days:
+        s = f"{days} day{'s' if abs(days) != 1 else ''}, {s}"
+    return s
+
+
+def _json_str(value: Optional[str]) -> str:
+    return "null" if value is None else encode_basestring_ascii(value)
+
+
+def _json_int(value: Optional[int]) -> str:
+    return "null" if value is None else str(value)
+
+
+def _json_uuid(value) -> str:
+    return "null" if value is None else f'"{value}"'
+
+
+def join_record_json(chunk: Iterable[tuple], formatter: TimestampFormatter) -> str:
+    """LIST_COLUMNS 순서의 행 튜플을 UsageRecordSchema와 같은 키 순서의 JSON 객체로 바꿔 ", "로 이어 붙입니다."""
+    fmt = formatter.format
+    return ", ".join(
+        f'{{"id": {record_id}, '
+        f'"package_name": {_json_str(package_name)}, '
+        f'"app_name": {_json_str(app_name)}, '
+        f'"usage_time_ms": {_json_int(usage_ms)}, '
+        f'"start_time": {start}, '
+        f'"end_time": {end}, '
+        f'"start_time_str": "{fmt(start)}", '
+        f'"end_time_str": "{fmt(end)}", '
+        f'"usage_time_str": {_json_str(None if usage_ms is None else format_duration_ms(usage_ms))}, '
+        f'"session_id": {_json_uuid(session_id)}}}'
+        for record_id, package_name, app_name, usage_ms, start, end, session_id in chunk
+    )
+
+
+def iter_record_json(
+    rows: Iterable[tuple],
+    formatter: TimestampFormatter,
+    chunk_size: int,
+) -> Iterator[str]:
+    """rows를 chunk_size행씩 join_record_json으로 바꾼 문자열을 반환합니다."""
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield join_record_json(chunk, formatter)
+
+
+def stream_usage_list(
+    rows: Iterable[tuple],
+    message: str,
+    next_cursor: Optional[str] = None,
+    chunk_size: int = 2000,
+    tz: Optional[datetime.tzinfo] = None,
+) -> Iterator[bytes]:
+    """
+    {"message": ..., "data": {"records": [...], "next_cursor": ...}} 응답 본문을
+    Response(JsonResponse)와 바이트 단위로 같은 형식으로, chunk_size행씩 나누어 만듭니다.
+
+    rows가 QuerySet.iterator()라면 메모리에는 한 청크의 행과 문자열만 유지됩니다.
+    """
+    yield f'{{"message": {json.dumps(message)}, "data": {{"records": ['.encode()
+    first = True
+    for part in iter_record_json(rows, TimestampFormatter(tz), chunk_size):
+        yield (part if first else ", " + part).encode()
+        first = False
+    yield f'], "next_cursor": {json.dumps(next_cursor)}}}}}'.encode()
+
+
+async def astream_usage_list(
+    rows: Iterable[tuple],
+    message: str,
+    next_cursor: Optional[str] = None,
+    chunk_size: int = 2000,
+    tz: Optional[datetime.tzinfo] = None,
+) -> AsyncIterator[bytes]:
+    """
+    stream_usage_list와 같은 본문을 만드는 비동기 제너레이터입니다.
+
+    ASGI 서버에서는 StreamingHttpResponse가 동기 이터레이터를 끝까지 읽어 버퍼링하므로,
+    rows(QuerySet.iterator() 등)는 sync_to_async로 chunk_size행씩 읽어 청크 단위 스트리밍을 유지합니다.
+    (Django 5.2의 values_list().aiterator()는 첫 쿼리를 이벤트 루프에서 실행하므로 쓰지 않습니다.)
+    """
+    formatter = TimestampFormatter(tz)
+    rows = await sync_to_async(iter)(rows)
+    next_chunk = sync_to_async(lambda: list(islice(rows, chunk_size)))
+    yield f'{{"message": {json.dumps(message)}, "data": {{"records": ['.encode()
+    first = True
+    while True:
+        chunk = await next_chunk()
+        if chunk:
+            yield (("" if first else ", ") + join_record_json(chunk, formatter)).encode()
+            first = False
+        if len(chunk) < chunk_size:
+            break
+    yield f'], "next_cursor": {json.dumps(next_cursor)}}}}}'.encode()
@@ -0,0 +1,86 @@
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from apps.usage.models import UsageRecord
+from apps.usage.services.heatmap import rebuild_user_heatmap
+from apps.usage.services.intervals import local_date, parse_timezone
+from apps.usage.services.rollup import rebuild_user_rollup
+from apps.users.models import Profile
+
+
+def recompute_local_dates(user_id: int, tz: ZoneInfo, chunk_size: int = 2000) -> int:
+    """한 사용자의 모든 기록의 local_date를 tz 기준으로 다시 계산하고, 바뀐 기록 수를 반환합니다."""
+    changed = []
+    updated = 0
+    rows = (
+        UsageRecord.objects.filter(user_id=user_id)
+        .exclude(start_time=None)
+        .values_list("id", "start_time", "local_date")
+    )
+    for record_id, start, current in rows.iterator(chunk_size=chunk_size):
+        day = local_date(start, tz)
+        if day != current:
+            changed.append(UsageRecord(id=record_id, local_date=day))
+        if len(changed) >= chunk_size:
+            UsageRecord.objects.bulk_update(changed, fields=["local_date"])
+            updated += len(changed)
+            changed = []
+    if changed:
+        UsageRecord.objects.bulk_update(changed, fields=["local_date"])
+        updated += len(changed)
+    return updated
+
+
+def change_user_timezone(user: User, tz: ZoneInfo) -> int:
+    """
+    사용자 시간대를 바꾸고, 같은 트랜잭션에서 기록의 local_date와 일별/시간대별 집계를 새 시간대로 다시 만듭니다.
+
+    아카이브된 달의 기록(파일)과 집계는 아카이브할 때의 시간대 기준 날짜를 그대로 유지합니다.
+    자정에서 나뉜 세션은 다시 나누거나 합치지 않습니다. 세그먼트는 예전 시간대의 자정 경계를 유지하고,
+    각 세그먼트의 날짜만 시작 시각 기준으로 다시 계산합니다. 나뉘지 않았던 기록도 새 시간대로 나누지 않습니다.
+    (세그먼트의 id와 메모가 그대로 남으며, 재전송된 기록은 세션 id로 찾으므로 중복 저장되지 않습니다)
+    날짜가 바뀐 기록 수를 반환합니다.
+    """
+    with transaction.atomic():
+        Profile.objects.update_or_create(user=user, defaults={"timezone": tz.key, "pending_timezone": ""})
+        updated = recompute_local_dates(user.pk, tz)
+        rebuild_user_rollup(user.pk)
+        rebuild_user_heatmap(user.pk)
+    return updated
+
+
+def request_timezone_change(user: User, tz: ZoneInfo) -> bool:
+    """
+    시간대 변경을 요청합니다. 바로 적용했으면 True를 반환합니다.
+
+    hot 테이블의 기록이 USAGE_TIMEZONE_SYNC_MAX_RECORDS개 이하면 바로 다시 계산하고,
+    더 많으면 pending_timezone에 적어 두고 apply_pending_timezones 명령이 적용합니다.
+    적용되기 전까지는 기존 시간대로 날짜와 집계를 계속 제공합니다.
+    """
+    if UsageRecord.objects.filter(user=user).count() <= settings.USAGE_TIMEZONE_SYNC_MAX_RECORDS:
+        change_user_timezone(user, tz)
+        return True
+    Profile.objects.update_or_create(user=user, defaults={"pending_timezone": tz.key})
+    return False
+
+
+def apply_pending_timezones(stdout=None) -> int:
+    """pending_timezone이 있는 사용자마다 한 트랜잭션으로 시간대를 적용하고, 적용한 사용자 수를 반환합니다."""
+    applied = 0
+    user_ids = list(Profile.objects.exclude(pending_timezone="").values_list("user_id", flat=True))
+    for user_id in user_ids:
+        with transaction.atomic():
+            # 그 사이 다른 시간대로 다시 요청되었거나 이미 적용되었는지 잠근 뒤 확인합니다.
+            profile = Profile.objects.select_for_update().select_related("user").get(user_id=user_id)
+            tz = parse_timezone(profile.pending_timezone)
+            if tz is None:
+                Profile.objects.filter(pk=profile.pk).update(pending_timezone="")
+                continue
+            updated = change_user_timezone(profile.user, tz)
+        applied += 1
+        if stdout:
+            stdout.write(f"user {user_id}: {tz.key}, 날짜가 바뀐 기록 {updated}건")
+    return applied
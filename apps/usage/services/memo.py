@@ -0,0 +1,71 @@
+from typing import Optional
+
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from apps.usage.models import UsageRecord
+from apps.usage.services.memo_search import index_memos
+from apps.usage.services.rollup import adjust_memo_count, adjust_memo_counts
+from apps.usage.services.versions import bump_day_versions
+
+# 메모 변경에 필요한 컬럼만 읽습니다. (집계 날짜 계산용 app/start_time/local_date 포함)
+MEMO_FIELDS = ("id", "user_id", "app_id", "start_time", "local_date", "memo")
+
+
+class MemoRecordsNotFoundError(LookupError):
+    """요청한 기록 중 사용자의 기록이 아닌(또는 없는) id가 있을 때 발생합니다."""
+
+    def __init__(self, record_ids: list[int]):
+        self.record_ids = record_ids
+        super().__init__(f"사용 기록을 찾을 수 없습니다: {', '.join(map(str, record_ids))}")
+
+
+def set_memo(record: UsageRecord, memo: Optional[str]) -> UsageRecord:
+    """기록의 메모를 바꾸고, 같은 트랜잭션에서 일별 집계의 memo_count와 날짜 버전을 맞춥니다."""
+    had_memo = bool(record.memo)
+    with transaction.atomic():
+        record.memo = memo
+        record.save(update_fields=["memo"])
+        if had_memo != bool(memo):
+            adjust_memo_count(record, 1 if memo else -1)
+        bump_day_versions(record.user_id, [record.local_date])
+    return record
+
+
+def set_memos(user: User, memos: dict[int, Optional[str]]) -> tuple[list[UsageRecord], int]:
+    """
+    여러 기록의 메모를 한 트랜잭션에서 바꿉니다.
+
+    - 소유권은 id 목록을 한 번의 쿼리로 조회해서 확인하며, 하나라도 없으면
+      MemoRecordsNotFoundError를 던지고 아무것도 바꾸지 않습니다.
+    - 메모가 실제로 바뀐 기록만 bulk_update(fields=["memo"])로 저장합니다.
+    - memo_count는 (앱, 날짜)별로, 날짜 버전은 날짜별로 한 번씩, 검색 인덱스는 바뀐 기록만 같은 트랜잭션에서 갱신합니다.
+    (요청 순서대로의 기록 목록, 메모가 바뀐 기록 수)를 반환합니다.
+    """
+    with transaction.atomic():
+        records = {
+            record.id: record
+            for record in UsageRecord.objects.filter(user=user, id__in=memos).only(*MEMO_FIELDS)
+        }
+        missing = sorted(record_id for record_id in memos if record_id not in records)
+        if missing:
+            raise MemoRecordsNotFoundError(missing)
+
+        changed = []
+        counts = []
+        for record_id, memo in memos.items():
+            record = records[record_id]
+            if record.memo == memo:
+                continue
+            if bool(record.memo) != bool(memo):
+                counts.append((record, 1 if memo else -1))
+            record.memo = memo
+            changed.append(record)
+
+        if changed:
+            UsageRecord.objects.bulk_update(changed, fields=["memo"], batch_size=500)
+            # bulk_update는 post_save 신호를 보내지 않으므로 검색 인덱스를 직접 맞춥니다.
+            index_memos(changed)
+            adjust_memo_counts(user.pk, counts)
+            bump_day_versions(user.pk, [record.local_date for record in changed])
+    return [records[record_id] for record_id in memos], len(changed)
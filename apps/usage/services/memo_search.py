@@ -0,0 +1,177 @@
+import datetime
+from typing import Iterable, Optional
+
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.db.models.expressions import RawSQL
+
+from apps.usage.models import UsageRecord
+
+# SQLite FTS5 가상 테이블 (rowid = UsageRecord.id, 마이그레이션 0013에서 생성, 0015에서 owner 열 추가)
+# 기록이 삭제되면 트리거(마이그레이션 0014)가 인덱스 행도 지웁니다.
+FTS_TABLE = "usage_memo_fts"
+
+# trigram 토크나이저는 3글자 미만의 검색어를 MATCH로 찾지 못하므로, 그보다 짧은 단어는
+# 같은 사용자의 인덱스 행 안에서 LIKE로 거릅니다.
+MIN_FTS_TERM_LENGTH = 3
+
+SEARCH_COLUMNS = ("id", "app__package_name", "app__app_name", "memo", "local_date", "start_time", "end_time")
+
+
+def owner_token(user_id: int) -> str:
+    """
+    인덱스의 owner 열 값입니다. MATCH 조건에 넣어 한 사용자의 메모만 찾도록 합니다.
+
+    trigram 구문 검색은 부분 문자열 일치이므로 앞뒤를 #으로 감싸 user 4가 user 42와 일치하지 않게 합니다.
+    """
+    return f"#{user_id}#"
+
+
+def fts_enabled() -> bool:
+    """FTS 인덱스는 SQLite에서만 만들어집니다. 다른 DB에서는 LIKE 검색만 사용합니다."""
+    return connection.vendor == "sqlite"
+
+
+def index_memos(records: Iterable[UsageRecord]) -> None:
+    """기록들의 메모를 인덱스에 다시 넣습니다. 메모가 비어 있으면 인덱스에서만 지웁니다."""
+    if not fts_enabled():
+        return
+    records = list(records)
+    if not records:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(r.id,) for r in records])
+        cursor.executemany(
+            f"INSERT INTO {FTS_TABLE} (rowid, memo, owner, user_id) VALUES (%s, %s, %s, %s)",
+            [(r.id, r.memo, owner_token(r.user_id), r.user_id) for r in records if r.memo],
+        )
+
+
+def rebuild_memo_index(user_id: Optional[int] = None) -> int:
+    """원본 기록으로부터 인덱스를 다시 만들고, 인덱싱한 메모 수를 반환합니다."""
+    if not fts_enabled():
+        return 0
+    with transaction.atomic(), connection.cursor() as cursor:
+        if user_id is None:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, memo, owner, user_id) "
+                f"SELECT id, memo, '#' || user_id || '#', user_id FROM {UsageRecord._meta.db_table} WHERE memo <> ''"
+            )
+        else:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE user_id = %s", [user_id])
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, memo, owner, user_id) "
+                f"SELECT id, memo, %s, user_id FROM {UsageRecord._meta.db_table} WHERE user_id = %s AND memo <> ''",
+                [owner_token(user_id), user_id],
+            )
+        return cursor.rowcount
+
+
+def _phrase(text: str) -> str:
+    # 따옴표로 감싼 구문으로 만들어 FTS5 문법 문자(*, :, - 등)가 연산자로 해석되지 않게 합니다.
+    return '"' + text.replace('"', '""') + '"'
+
+
+def _fts_query(user_id: int, terms: list[str]) -> str:
+    """owner 열로 사용자를 고르고, memo 열에서 모든 단어(3글자 이상)를 찾는 MATCH 식입니다."""
+    query = f"owner : {_phrase(owner_token(user_id))}"
+    if terms:
+        query += " AND memo : (" + " AND ".join(_phrase(term) for term in terms) + ")"
+    return query
+
+
+def _like_pattern(term: str) -> str:
+    return "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def search_memos(
+    user: User,
+    query: str,
+    start_date: Optional[datetime.date] = None,
+    end_date: Optional[datetime.date] = None,
+    offset: int = 0,
+    limit: int = 20,
+) -> tuple[list[dict], bool]:
+    """
+    사용자의 메모를 검색합니다. 공백으로 나눈 모든 단어를 포함하는 메모만 찾습니다.
+
+    - FTS5(trigram) 인덱스의 owner 열로 이 사용자의 메모만 MATCH합니다. (다른 사용자의 메모는 읽지 않음)
+    - 3글자 이상인 단어는 MATCH로 찾고, 더 짧은 단어는 그 결과(이 사용자의 메모) 안에서 LIKE로 거릅니다.
+    - 3글자 이상인 단어가 있으면 bm25 점수 순으로, 모두 짧으면 최신순으로 정렬합니다.
+    - FTS 인덱스가 없는 DB에서는 사용자 기록에 대한 LIKE 검색으로 대신합니다.
+    - start_date/end_date는 local_date 기준 범위입니다.
+    (결과 목록, 다음 페이지 존재 여부)를 반환합니다.
+    """
+    terms = query.split()
+    if not terms:
+        return [], False
+    if fts_enabled():
+        rows = _search_fts(user, terms, start_date, end_date, offset, limit + 1)
+    else:
+        rows = _search_like(user, terms, start_date, end_date, offset, limit + 1)
+    return rows[:limit], len(rows) > limit
+
+
+def _search_fts(user, terms, start_date, end_date, offset, limit) -> list[dict]:
+    match_terms = [term for term in terms if len(term) >= MIN_FTS_TERM_LENGTH]
+    where_sql = f"{FTS_TABLE} MATCH %s"
+    params = [_fts_query(user.pk, match_terms)]
+    for term in terms:
+        if len(term) < MIN_FTS_TERM_LENGTH:
+            where_sql += " AND memo LIKE %s ESCAPE '\\'"
+            params.append(_like_pattern(term))
+    records = UsageRecord.objects.filter(user=user)
+    if start_date:
+        records = records.filter(local_date__gte=start_date)
+    if end_date:
+        records = records.filter(local_date__lte=end_date)
+
+    if not match_terms:
+        # 짧은 단어뿐이면 관련도 점수가 의미 없으므로, 인덱스에서 고른 id를 기록 테이블에서 최신순으로 정렬합니다.
+        records = records.filter(id__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {where_sql}", params))
+        rows = records.order_by("-start_time", "-id").values(*SEARCH_COLUMNS)[offset:offset + limit]
+        return [_to_result(row, None) for row in rows]
+
+    ids_sql = f"SELECT rowid, bm25({FTS_TABLE}, 1.0, 0.0) FROM {FTS_TABLE} WHERE {where_sql}"
+    if start_date or end_date:
+        # 날짜 조건은 기록 테이블의 (user, local_date) 인덱스로 걸러 id 목록으로 넘깁니다.
+        date_sql, date_params = records.order_by().values("id").query.sql_with_params()
+        ids_sql += f" AND rowid IN ({date_sql})"
+        params.extend(date_params)
+    ids_sql += f" ORDER BY bm25({FTS_TABLE}, 1.0, 0.0), rowid DESC LIMIT %s OFFSET %s"
+    params.extend([limit, offset])
+
+    with connection.cursor() as cursor:
+        cursor.execute(ids_sql, params)
+        ranked = cursor.fetchall()
+    if not ranked:
+        return []
+    by_id = {row["id"]: row for row in records.filter(id__in=[i for i, _ in ranked]).values(*SEARCH_COLUMNS)}
+    # bm25는 작을수록 관련도가 높으므로 부호를 바꿔 점수로 제공합니다.
+    return [_to_result(by_id[i], -score) for i, score in ranked if i in by_id]
+
+
+def _search_like(user, terms, start_date, end_date, offset, limit) -> list[dict]:
+    records = UsageRecord.objects.filter(user=user).exclude(memo=None).exclude(memo="")
+    for term in terms:
+        records = records.filter(memo__icontains=term)
+    if start_date:
+        records = records.filter(local_date__gte=start_date)
+    if end_date:
+        records = records.filter(local_date__lte=end_date)
+    rows = records.order_by("-start_time", "-id").values(*SEARCH_COLUMNS)[offset:offset + limit]
+    return [_to_result(row, None) for row in rows]
+
+
+def _to_result(row: dict, score: Optional[float]) -> dict:
+    return {
+        "id": row["id"],
+        "package_name": row["app__package_name"],
+        "app_name": row["app__app_name"],
+        "memo": row["memo"],
+        "local_date": row["local_date"],
+        "start_time": row["start_time"],
+        "end_time": row["end_time"],
+        "score": score,
+    }
@@ -0,0 +1,50 @@
+import base64
+import binascii
+from typing import Callable, Optional
+
+from django.db.models import QuerySet
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def encode_cursor(start_time: int, record_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{start_time}:{record_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[int, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        start_time, record_id = raw.split(":")
+        return int(start_time), int(record_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursorError("잘못된 cursor입니다.")
+
+
+def paginate_by_start_time(
+    records: QuerySet,
+    cursor: Optional[str],
+    page_size: int,
+    key: Callable[[object], tuple[int, int]] = lambda r: (r.start_time, r.id),
+) -> tuple[list, Optional[str]]:
+    """
+    (start_time, id) 내림차순 keyset 페이지네이션입니다.
+
+    OFFSET 대신 직전 페이지 마지막 행의 (start_time, id) 다음부터 읽으므로
+    몇 번째 페이지든 (user, start_time, id) 인덱스에서 page_size + 1행만 읽고,
+    페이지 사이에 새 기록이 추가되어도 행이 중복되거나 빠지지 않습니다.
+    (page 행 목록, 다음 cursor)를 반환하며, 마지막 페이지의 다음 cursor는 None입니다.
+    values_list 쿼리셋을 넘길 때는 key로 행에서 (start_time, id)를 꺼내는 방법을 지정합니다.
+    """
+    records = records.exclude(start_time=None).order_by("-start_time", "-id")
+    if cursor:
+        start_time, record_id = decode_cursor(cursor)
+        # (start_time < s) OR (start_time = s AND id < i)를 OR 없이 표현해 start_time <= s 범위 탐색이 되도록 합니다.
+        records = records.filter(start_time__lte=start_time).exclude(start_time=start_time, id__gte=record_id)
+
+    page = list(records[:page_size + 1])
+    if len(page) <= page_size:
+        return page, None
+    page = page[:page_size]
+    return page, encode_cursor(*key(page[-1]))
@@ -0,0 +1,181 @@
+import datetime
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Iterable, Optional
+from zoneinfo import ZoneInfo
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Min, Value
+from django.db.models.functions import Greatest, Least
+
+from apps.usage.models import DailyAppUsage, UsageRecord
+from apps.usage.services.archive import hot_since
+from apps.usage.services.intervals import local_date, split_by_day, user_timezone
+
+
+@dataclass
+class UsageDelta:
+    """
+    집계에 더할 변화량입니다. 기록 추가는 (usage_ms, sessions=1), 사용시간 수정은 (-이전 값, 0)과 (새 값, 0)입니다.
+
+    continued는 자정에서 나뉘어 저장된 세션의 두 번째 이후 세그먼트입니다. (세션이 시작된 날이 아니라 이어진 날)
+    """
+    app_id: int
+    start_ms: int
+    end_ms: int
+    usage_ms: int
+    sessions: int = 1
+    continued: bool = False
+
+
+@dataclass
+class _DayTotals:
+    total_ms: int = 0
+    session_count: int = 0
+    continued_count: int = 0
+    memo_count: int = 0
+    first_start: Optional[int] = None
+    last_end: Optional[int] = None
+
+    def add(self, seg_start: int, seg_end: int, usage_ms: int, sessions: int, continued: bool = False) -> None:
+        self.total_ms += usage_ms
+        self.session_count += sessions
+        if continued:
+            self.continued_count += sessions
+        self.first_start = seg_start if self.first_start is None else min(self.first_start, seg_start)
+        self.last_end = seg_end if self.last_end is None else max(self.last_end, seg_end)
+
+
+def collect_daily_totals(deltas: Iterable[UsageDelta], tz) -> dict[tuple[int, datetime.date], _DayTotals]:
+    totals = defaultdict(_DayTotals)
+    for delta in deltas:
+        segments = split_by_day(delta.start_ms, delta.end_ms, delta.usage_ms, tz)
+        for i, (day, seg_start, seg_end, seg_usage) in enumerate(segments):
+            totals[(delta.app_id, day)].add(seg_start, seg_end, seg_usage, delta.sessions, delta.continued or i > 0)
+    return totals
+
+
+def apply_usage_deltas(user_id: int, deltas: Iterable[UsageDelta], tz: Optional[ZoneInfo] = None) -> None:
+    """
+    사용 기록 변화량을 DailyAppUsage에 반영합니다.
+
+    호출하는 쪽의 트랜잭션 안에서 실행되어야 하며, (앱, 날짜)마다 한 번의 UPDATE로 값을 누적합니다.
+    날짜는 사용자 시간대(tz, 생략하면 프로필에서 조회) 기준으로 나눕니다.
+    """
+    tz = tz or user_timezone(user_id)
+    for (app_id, day), t in collect_daily_totals(deltas, tz).items():
+        _upsert(user_id, app_id, day, t)
+
+
+def adjust_memo_count(record: UsageRecord, delta: int) -> None:
+    """메모가 새로 생기거나 지워졌을 때, 기록이 시작된 날짜의 memo_count를 조정합니다."""
+    adjust_memo_counts(record.user_id, [(record, delta)])
+
+
+def adjust_memo_counts(user_id: int, changes: Iterable[tuple[UsageRecord, int]]) -> None:
+    """여러 기록의 memo_count 변화를 (앱, 날짜)별로 합쳐 한 번씩만 UPDATE합니다."""
+    totals = defaultdict(int)
+    tz = None
+    for record, delta in changes:
+        if record.app_id is None or record.start_time is None:
+            continue
+        day = record.local_date
+        if day is None:
+            tz = tz or user_timezone(user_id)
+            day = local_date(record.start_time, tz)
+        totals[(record.app_id, day)] += delta
+    for (app_id, day), delta in totals.items():
+        if delta:
+            DailyAppUsage.objects.filter(user_id=user_id, app_id=app_id, date=day).update(
+                memo_count=F("memo_count") + delta
+            )
+
+
+def _upsert(user_id: int, app_id: int, day: datetime.date, t: _DayTotals) -> None:
+    def update() -> int:
+        return DailyAppUsage.objects.filter(user_id=user_id, app_id=app_id, date=day).update(
+            total_ms=F("total_ms") + t.total_ms,
+            session_count=F("session_count") + t.session_count,
+            continued_count=F("continued_count") + t.continued_count,
+            first_start=Least("first_start", Value(t.first_start)),
+            last_end=Greatest("last_end", Value(t.last_end)),
+        )
+
+    if update():
+        return
+    try:
+        with transaction.atomic():
+            DailyAppUsage.objects.create(
+                user_id=user_id,
+                app_id=app_id,
+                date=day,
+                total_ms=t.total_ms,
+                session_count=t.session_count,
+                continued_count=t.continued_count,
+                first_start=t.first_start,
+                last_end=t.last_end,
+            )
+    except IntegrityError:
+        # 동시에 같은 (앱, 날짜) 행이 만들어진 경우 누적 UPDATE로 다시 반영합니다.
+        update()
+
+
+def rebuild_user_rollup(user_id: int, since: Optional[datetime.date] = None) -> int:
+    """
+    한 사용자의 DailyAppUsage를 원본 기록으로부터 다시 계산합니다.
+
+    since가 주어지면 그 날짜 이후의 집계만 다시 만듭니다. 생성한 집계 행 수를 반환합니다.
+    아카이브로 옮겨진 날짜의 집계는 원본이 hot 테이블에 없으므로 그대로 둡니다.
+    """
+    hot_start = hot_since(user_id)
+    if hot_start is not None and (since is None or since < hot_start):
+        since = hot_start
+    tz = user_timezone(user_id)
+    records = UsageRecord.objects.filter(user_id=user_id).exclude(app_id=None).exclude(start_time=None)
+    if since is not None:
+        since_ms = int(datetime.datetime.combine(since, datetime.time.min, tz).timestamp() * 1000)
+        records = records.filter(end_time__gte=since_ms)
+
+    # 읽기와 다시 쓰기를 한 트랜잭션으로 묶어, 그 사이에 저장된 기록이 집계에서 빠지지 않게 합니다.
+    with transaction.atomic():
+        # 나뉘어 저장된 세션은 가장 먼저 시작한 세그먼트가 세션의 시작이고, 나머지는 이어진 세그먼트입니다.
+        session_starts = dict(
+            UsageRecord.objects.filter(user_id=user_id).exclude(session_id=None)
+            .values("session_id").annotate(first=Min("start_time")).values_list("session_id", "first")
+        )
+        totals = defaultdict(_DayTotals)
+        rows = records.values_list(
+            "app_id", "start_time", "end_time", "usage_time_ms", "memo", "local_date", "session_id"
+        )
+        for app_id, start, end, usage, memo, start_day, session_id in rows.iterator(chunk_size=2000):
+            continued = session_id is not None and start > session_starts.get(session_id, start)
+            for i, (day, seg_start, seg_end, seg_usage) in enumerate(split_by_day(start, end, usage or 0, tz)):
+                if since is not None and day < since:
+                    continue
+                totals[(app_id, day)].add(seg_start, seg_end, seg_usage, 1, continued or i > 0)
+            start_day = start_day or local_date(start, tz)
+            if memo and (since is None or start_day >= since):
+                totals[(app_id, start_day)].memo_count += 1
+
+        existing = DailyAppUsage.objects.filter(user_id=user_id)
+        if since is not None:
+            existing = existing.filter(date__gte=since)
+        existing.delete()
+        DailyAppUsage.objects.bulk_create(
+            [
+                DailyAppUsage(
+                    user_id=user_id,
+                    app_id=app_id,
+                    date=day,
+                    total_ms=t.total_ms,
+                    session_count=t.session_count,
+                    continued_count=t.continued_count,
+                    memo_count=t.memo_count,
+                    first_start=t.first_start,
+                    last_end=t.last_end,
+                )
+                for (app_id, day), t in totals.items()
+            ],
+            batch_size=1000,
+        )
+    return len(totals)
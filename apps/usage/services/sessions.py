@@ -0,0 +1,121 @@
+import uuid
+from zoneinfo import ZoneInfo
+
+from django.contrib.auth.models import User
+from django.db.models import Min, Sum
+
+from apps.usage.models import UsageRecord
+from apps.usage.services.intervals import split_by_day
+
+# 자연키 (user, app, start_time, end_time)로부터 세션 id를 만들 때 쓰는 네임스페이스
+SESSION_NAMESPACE = uuid.UUID("5d2f6a3e-8f1b-4c57-9a0e-2b7d4c1e9f60")
+
+
+def session_uuid(user_id: int, app_id: int, start_ms: int, end_ms: int) -> uuid.UUID:
+    """원본 기록의 자연키로 세션 id를 만듭니다. 같은 기록이 재전송되어도 같은 id가 나옵니다."""
+    return uuid.uuid5(SESSION_NAMESPACE, f"{user_id}:{app_id}:{start_ms}:{end_ms}")
+
+
+def split_at_midnight(record: UsageRecord, tz: ZoneInfo) -> list[UsageRecord]:
+    """
+    저장 전의 기록을 자정(tz 기준)마다 나눈 세그먼트 목록으로 바꿉니다.
+
+    - 첫 세그먼트는 record 자신이며, 나머지는 새 UsageRecord입니다.
+    - 각 세그먼트는 같은 session_id와 길이에 비례한 usage_time_ms를 가지며, 사용시간의 합은 원본과 같습니다.
+    - 마지막이 아닌 세그먼트의 end_time은 다음 날 0시 - 1ms로, 세그먼트가 항상 하루 안에 들어갑니다.
+    자정을 넘지 않는 기록은 [record]를 그대로 반환합니다.
+    """
+    segments = list(split_by_day(record.start_time, record.end_time, record.usage_time_ms, tz))
+    if len(segments) == 1:
+        return [record]
+
+    session_id = session_uuid(record.user_id, record.app_id, record.start_time, record.end_time)
+    last = len(segments) - 1
+    result = []
+    for i, (day, seg_start, seg_end, seg_usage) in enumerate(segments):
+        seg = record if i == 0 else UsageRecord(user_id=record.user_id, app_id=record.app_id)
+        seg.start_time = seg_start
+        seg.end_time = seg_end if i == last else seg_end - 1
+        seg.usage_time_ms = seg_usage
+        seg.local_date = day
+        seg.session_id = session_id
+        result.append(seg)
+    return result
+
+
+def find_existing_sessions(user: User, keys) -> dict[tuple, tuple[uuid.UUID, int, int]]:
+    """
+    (app_id, start_time, end_time) 키 중 이미 세그먼트로 나뉘어 저장된 세션을 조회합니다.
+
+    지금 시간대로는 자정을 넘지 않는 키도 조회합니다. 시간대를 바꾸기 전에 나뉘어 저장된 세션일 수 있기 때문입니다.
+    {키: (session_id, 첫 세그먼트 id, 전체 사용시간)}을 반환합니다.
+    """
+    by_session = {session_uuid(user.pk, *key): key for key in keys}
+    if not by_session:
+        return {}
+    rows = (
+        UsageRecord.objects.filter(user=user, session_id__in=by_session)
+        .values("session_id")
+        .annotate(first_id=Min("id"), total=Sum("usage_time_ms"))
+        .order_by()
+    )
+    return {by_session[row["session_id"]]: (row["session_id"], row["first_id"], row["total"]) for row in rows}
+
+
+def redistribute_session(session_id: uuid.UUID, usage_ms: int) -> list[tuple[int, tuple, int, int]]:
+    """
+    세션 전체 사용시간을 usage_ms로 바꿀 때 세그먼트별 변경 내용을 계산합니다.
+
+    세그먼트 길이에 비례해 나누고, 반올림 오차는 마지막 세그먼트에 더합니다.
+    [(record_id, (app_id, start_time, end_time), 이전 사용시간, 새 사용시간)]을 반환합니다.
+    """
+    segments = list(
+        UsageRecord.objects.filter(session_id=session_id)
+        .order_by("start_time")
+        .values_list("id", "app_id", "start_time", "end_time", "usage_time_ms")
+    )
+    # 세그먼트 사이의 1ms 간격까지 포함해 원본 구간 [첫 시작, 마지막 끝)을 기준으로 나눕니다.
+    bounds = [seg[2] for seg in segments[1:]] + [segments[-1][3]]
+    duration = bounds[-1] - segments[0][2]
+
+    changes = []
+    assigned = 0
+    for i, (record_id, app_id, start, end, old) in enumerate(segments):
+        if i == len(segments) - 1 or duration <= 0:
+            new = usage_ms - assigned
+        else:
+            new = usage_ms * (bounds[i] - start) // duration
+        assigned += new
+        changes.append((record_id, (app_id, start, end), old or 0, new))
+    return changes
+
+
+def get_session(record: UsageRecord) -> dict:
+    """세그먼트로 나뉜 기록이면 원본 세션을 다시 합쳐서, 아니면 기록 자체를 세션 형태로 반환합니다."""
+    if record.session_id is None:
+        segments = [record]
+    else:
+        segments = list(
+            UsageRecord.objects.filter(user_id=record.user_id, session_id=record.session_id)
+            .select_related("app")
+            .order_by("start_time")
+        )
+    first, last = segments[0], segments[-1]
+    return {
+        "session_id": str(record.session_id) if record.session_id else None,
+        "package_name": first.app.package_name if first.app else None,
+        "app_name": first.app.app_name if first.app else None,
+        "start_time": first.start_time,
+        "end_time": last.end_time,
+        "usage_time_ms": sum(seg.usage_time_ms or 0 for seg in segments),
+        "segments": [
+            {
+                "id": seg.id,
+                "local_date": seg.local_date,
+                "start_time": seg.start_time,
+                "end_time": seg.end_time,
+                "usage_time_ms": seg.usage_time_ms,
+            }
+            for seg in segments
+        ],
+    }
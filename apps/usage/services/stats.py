@@ -0,0 +1,64 @@
+import datetime
+
+from django.db.models import Count, F, FloatField, Q, Sum
+from django.db.models.functions import Cast, Coalesce, NullIf
+
+from apps.usage.models import DailyAppUsage
+
+
+def _totals(sessions) -> dict:
+    # 모델 필드와 이름이 겹치지 않도록 별칭으로 집계한 뒤 응답 키로 바꿉니다.
+    return {
+        "sum_ms": Coalesce(Sum("total_ms"), 0),
+        "sum_sessions": sessions,
+        # 세션이 없으면 평균은 null입니다.
+        "avg_ms": Cast(Sum("total_ms"), FloatField()) / NullIf(sessions, 0),
+    }
+
+
+def _range_sessions(start_date: datetime.date):
+    """
+    기간 안의 세션 수입니다. 자정을 넘은 세션은 날마다 session_count에 들어가므로,
+    기간 첫날이 아닌 날의 이어진 세션(continued_count)을 빼서 한 세션을 한 번만 셉니다.
+    """
+    return Coalesce(Sum("session_count"), 0) - Coalesce(Sum("continued_count", filter=Q(date__gt=start_date)), 0)
+
+
+def _rename(row: dict) -> dict:
+    row["total_ms"] = row.pop("sum_ms")
+    row["session_count"] = row.pop("sum_sessions")
+    row["avg_session_ms"] = row.pop("avg_ms")
+    return row
+
+
+def usage_stats(user, start_date: datetime.date, end_date: datetime.date, top: int) -> dict:
+    """
+    [start_date, end_date] 기간의 사용 통계를 일별 집계(DailyAppUsage)에서 계산합니다.
+
+    전체/앱별/일별 합계를 각각 하나의 GROUP BY 쿼리로 구하므로, 쿼리 수는 3개로 고정되고
+    결과 크기는 기록 수가 아니라 앱 수와 일수에 비례합니다.
+    전체/앱별 세션 수는 자정을 넘은 세션을 한 번만 세고, 일별 세션 수는 그날 사용된 세션을 모두 셉니다.
+    """
+    rows = DailyAppUsage.objects.filter(user=user, date__range=(start_date, end_date))
+    range_totals = _totals(_range_sessions(start_date))
+
+    overall = _rename(rows.aggregate(**range_totals))
+    apps = [
+        _rename(row)
+        for row in rows.values(package_name=F("app__package_name"), app_name=F("app__app_name"))
+        .annotate(**range_totals, days_used=Count("date"))
+        .order_by("-sum_ms", "package_name")
+    ]
+    days = [
+        _rename(row)
+        for row in rows.values("date").annotate(**_totals(Coalesce(Sum("session_count"), 0))).order_by("date")
+    ]
+
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        **overall,
+        "apps": apps,
+        "top_apps": apps[:top],
+        "days": days,
+    }
@@ -0,0 +1,125 @@
+import gzip
+from dataclasses import dataclass, field
+from typing import BinaryIO, Iterator, Optional
+
+from django.contrib.auth.models import User
+from pydantic import ValidationError
+
+from apps.usage.api.schemas import UsageRecordCreateSchema
+from apps.usage.services.ingest import ingest_usage_records
+
+
+@dataclass
+class ImportReport:
+    lines: int = 0
+    created: int = 0
+    existing: int = 0
+    failed: int = 0
+    chunks: int = 0
+    errors: list = field(default_factory=list)
+    errors_truncated: bool = False
+    aborted: Optional[str] = None
+
+    def add_error(self, line: int, error: str, max_errors: int) -> None:
+        self.failed += 1
+        if len(self.errors) < max_errors:
+            self.errors.append({"line": line, "error": error})
+        else:
+            self.errors_truncated = True
+
+
+def open_body_stream(request) -> BinaryIO:
+    """요청 본문을 메모리에 올리지 않고 읽을 수 있는 스트림을 반환합니다. (gzip 지원)"""
+    if request.headers.get("Content-Encoding", "").lower() == "gzip":
+        return gzip.GzipFile(fileobj=request, mode="rb")
+    return request
+
+
+def iter_lines(stream: BinaryIO, max_line_bytes: int) -> Iterator[tuple[int, Optional[bytes]]]:
+    """
+    (줄 번호, 내용)을 순서대로 반환합니다.
+
+    max_line_bytes보다 긴 줄은 끝까지 읽어 버리고 내용 대신 None을 반환하므로
+    한 줄이 아무리 길어도 메모리 사용량이 늘어나지 않습니다.
+    """
+    line_no = 0
+    while True:
+        line = stream.readline(max_line_bytes + 1)
+        if not line:
+            return
+        line_no += 1
+        if len(line) > max_line_bytes and not line.endswith(b"\n"):
+            while line and not line.endswith(b"\n"):
+                line = stream.readline(max_line_bytes)
+            yield line_no, None
+            continue
+        yield line_no, line
+
+
+def format_validation_error(e: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(loc) for loc in err['loc']) or 'line'}: {err['msg']}"
+        for err in e.errors()
+    )
+
+
+def import_ndjson(
+    user: User,
+    stream: BinaryIO,
+    on_conflict: str,
+    chunk_size: int,
+    max_errors: int,
+    max_line_bytes: int,
+) -> ImportReport:
+    """
+    NDJSON 스트림을 한 줄씩 검증하고 chunk_size개마다 하나의 트랜잭션으로 저장합니다.
+
+    메모리에는 현재 청크와 최대 max_errors개의 에러만 유지합니다.
+    """
+    report = ImportReport()
+    chunk: list[tuple[int, UsageRecordCreateSchema]] = []
+
+    def flush():
+        if not chunk:
+            return
+        report.chunks += 1
+        try:
+            results = ingest_usage_records(user, [item for _, item in chunk], on_conflict=on_conflict)
+        except Exception as e:
+            for line_no, _ in chunk:
+                report.add_error(line_no, f"기록 저장 실패: {e}", max_errors)
+        else:
+            for (line_no, _), result in zip(chunk, results):
+                if result.error:
+                    report.add_error(line_no, result.error, max_errors)
+                elif result.created:
+                    report.created += 1
+                else:
+                    report.existing += 1
+        chunk.clear()
+
+    try:
+        for line_no, line in iter_lines(stream, max_line_bytes):
+            if line is None:
+                report.lines += 1
+                report.add_error(line_no, f"한 줄은 최대 {max_line_bytes}바이트까지 허용됩니다.", max_errors)
+                continue
+            if not line.strip():
+                continue
+
+            report.lines += 1
+            try:
+                item = UsageRecordCreateSchema.model_validate_json(line)
+            except ValidationError as e:
+                report.add_error(line_no, format_validation_error(e), max_errors)
+                continue
+
+            chunk.append((line_no, item))
+            if len(chunk) >= chunk_size:
+                flush()
+    except (OSError, EOFError) as e:
+        # gzip 본문이 깨졌거나 중간에 끊긴 경우, 그 전까지 읽은 기록은 저장합니다.
+        report.aborted = f"본문을 끝까지 읽지 못했습니다: {e}"
+
+    flush()
+    return report
@@ -0,0 +1,62 @@
+import datetime
+import hashlib
+from typing import Iterable, Optional
+from zoneinfo import ZoneInfo
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils.http import quote_etag
+
+from apps.usage.models import UsageDayVersion
+
+
+def bump_day_versions(user_id: int, dates: Iterable[Optional[datetime.date]]) -> None:
+    """
+    dates(local_date)의 버전을 1씩 올립니다.
+
+    기록을 바꾸는 쪽의 트랜잭션 안에서 호출해서, 변경이 커밋되면 버전도 함께 보이도록 합니다.
+    """
+    for day in sorted({d for d in dates if d is not None}):
+        _bump(user_id, day)
+
+
+def _bump(user_id: int, day: datetime.date) -> None:
+    def update() -> int:
+        return UsageDayVersion.objects.filter(user_id=user_id, date=day).update(version=F("version") + 1)
+
+    if update():
+        return
+    try:
+        with transaction.atomic():
+            UsageDayVersion.objects.create(user_id=user_id, date=day, version=1)
+    except IntegrityError:
+        update()
+
+
+def _etag(*parts) -> str:
+    digest = hashlib.blake2b(":".join(str(p) for p in parts).encode(), digest_size=12).hexdigest()
+    return quote_etag(digest)
+
+
+def day_list_etag(user_id: int, day: datetime.date, tz: ZoneInfo) -> str:
+    """
+    날짜별 목록 응답의 ETag입니다. 버전 행 하나만 읽습니다.
+
+    시간 문자열이 시간대에 따라 달라지므로 사용자 시간대도 포함합니다.
+    """
+    version = (
+        UsageDayVersion.objects.filter(user_id=user_id, date=day)
+        .values_list("version", flat=True)
+        .first()
+    )
+    return _etag("day", user_id, day, version or 0, tz.key)
+
+
+def page_list_etag(user_id: int, tz: ZoneInfo, cursor: Optional[str], page_size: int) -> str:
+    """
+    전체 목록(커서 페이지) 응답의 ETag입니다.
+
+    어느 날짜든 버전이 오르면 합계도 커지므로, 사용자 버전 합계 하나로 모든 페이지를 검증합니다.
+    """
+    total = UsageDayVersion.objects.filter(user_id=user_id).aggregate(total=Sum("version"))["total"]
+    return _etag("page", user_id, total or 0, tz.key, cursor or "", page_size)
@@ -0,0 +1,177 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import close_old_connections, connection, transaction
+
+from apps.usage.services.ingest import ingest_usage_records
+
+logger = logging.getLogger(__name__)
+
+
+class BufferFullError(Exception):
+    pass
+
+
+@dataclass
+class PendingWrite:
+    user: User
+    item: object
+    on_conflict: str
+    future: Future
+
+
+class UsageWriteBuffer:
+    """
+    사용 기록 저장을 모아서 처리하는 write-behind 버퍼입니다.
+
+    - 요청 스레드는 기록을 큐에 넣고 Future를 받습니다.
+    - 하나의 백그라운드 writer 스레드가 batch_size개가 모이거나
+      flush_interval초가 지나면 큐를 비우고 사용자별로 ingest_usage_records를 호출합니다.
+    - 프로세스 종료 시 남은 기록을 모두 저장합니다.
+    """
+
+    def __init__(self, batch_size: int, flush_interval: float, max_depth: int):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue[PendingWrite] = queue.Queue(maxsize=max_depth)
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+
+        self.enqueued = 0
+        self.flushed = 0
+        self.failed = 0
+        self.flushes = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    def submit(self, user: User, item, on_conflict: str) -> Future:
+        """기록을 큐에 넣습니다. 큐가 가득 차 있으면 BufferFullError를 발생시킵니다."""
+        self._ensure_started()
+        pending = PendingWrite(user=user, item=item, on_conflict=on_conflict, future=Future())
+        try:
+            self._queue.put_nowait(pending)
+        except queue.Full:
+            raise BufferFullError("사용 기록 버퍼가 가득 찼습니다.")
+
+        with self._stats_lock:
+            self.enqueued += 1
+        if self._queue.qsize() >= self.batch_size:
+            self._wakeup.set()
+        return pending.future
+
+    def shutdown(self, timeout: float = 10.0) -> None:
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._wakeup.set()
+        self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "depth": self._queue.qsize(),
+                "enqueued": self.enqueued,
+                "flushed": self.flushed,
+                "failed": self.failed,
+                "flushes": self.flushes,
+                "last_flush_ms": round(self.last_flush_ms, 2),
+                "avg_flush_ms": round(self._total_flush_ms / self.flushes, 2) if self.flushes else 0.0,
+                "max_flush_ms": round(self.max_flush_ms, 2),
+            }
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="usage-write-buffer", daemon=True)
+                self._thread.start()
+                atexit.register(self.shutdown)
+
+    def _run(self) -> None:
+        try:
+            while not self._stopping.is_set():
+                self._wakeup.wait(self.flush_interval)
+                self._wakeup.clear()
+                self._drain()
+            # 종료 요청을 받은 뒤에도 남은 기록은 모두 저장합니다.
+            self._drain()
+        finally:
+            connection.close()
+
+    def _drain(self) -> None:
+        while True:
+            batch = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return
+            self._flush(batch)
+            if len(batch) < self.batch_size:
+                return
+
+    def _flush(self, batch: list[PendingWrite]) -> None:
+        close_old_connections()
+        started = time.monotonic()
+
+        groups = defaultdict(list)
+        for pending in batch:
+            groups[(pending.user.pk, pending.on_conflict)].append(pending)
+
+        outcomes = []
+        try:
+            # 한 번의 flush는 하나의 트랜잭션으로 저장하고, 사용자 그룹마다 savepoint를 둡니다.
+            with transaction.atomic():
+                for (_, on_conflict), writes in groups.items():
+                    try:
+                        results = ingest_usage_records(writes[0].user, [w.item for w in writes], on_conflict=on_conflict)
+                    except Exception as e:
+                        logger.exception("사용 기록 일괄 저장 실패 (%d건)", len(writes))
+                        outcomes.extend((w, None, e) for w in writes)
+                        continue
+                    outcomes.extend((w, result, None) for w, result in zip(writes, results))
+        except Exception as e:
+            logger.exception("사용 기록 flush 커밋 실패 (%d건)", len(batch))
+            outcomes = [(w, None, e) for w in batch]
+
+        # 커밋이 끝난 뒤에 응답을 기다리는 요청에 결과를 알려줍니다.
+        flushed = failed = 0
+        for w, result, error in outcomes:
+            if error is not None:
+                w.future.set_exception(error)
+                failed += 1
+            else:
+                result.index = 0
+                w.future.set_result(result)
+                flushed += 1
+
+        elapsed_ms = (time.monotonic() - started) * 1000
+        with self._stats_lock:
+            self.flushed += flushed
+            self.failed += failed
+            self.flushes += 1
+            self.last_flush_ms = elapsed_ms
+            self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+            self._total_flush_ms += elapsed_ms
+
+
+usage_write_buffer = UsageWriteBuffer(
+    batch_size=settings.USAGE_WRITE_BEHIND_BATCH_SIZE,
+    flush_interval=settings.USAGE_WRITE_BEHIND_FLUSH_INTERVAL,
+    max_depth=settings.USAGE_WRITE_BEHIND_MAX_DEPTH,
+)
@@ -0,0 +1,26 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import AppInfo, UsageRecord
+from .services.app_cache import app_resolver
+from .services.memo_search import index_memos
+
+
+# 관리자 페이지 등에서 AppInfo가 수정/삭제되면 캐시된 매핑을 비웁니다.
+@receiver(post_save, sender=AppInfo)
+@receiver(post_delete, sender=AppInfo)
+def invalidate_app_cache(sender, instance, **kwargs):
+    app_resolver.invalidate(instance.package_name, app_id=instance.id)
+
+
+# save()로 메모가 바뀌면 검색 인덱스를 맞춥니다. (bulk_update 경로는 memo 서비스에서 직접 맞춥니다.)
+@receiver(post_save, sender=UsageRecord)
+def sync_memo_index(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and "memo" not in update_fields:
+        return
+    if created and not instance.memo:
+        return
+    index_memos([instance])
+
+
+# 기록 삭제는 시그널 없이 SQLite 트리거(usage_memo_fts_delete, 마이그레이션 0014)가 인덱스에서 지웁니다.
@@ -1,3 +1,951 @@
-from django.test import TestCase
+import datetime
+import gzip
+import json
+import shutil
+import tempfile
+import warnings
+from io import StringIO
+from unittest import mock
+from zoneinfo import ZoneInfo
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from ninja.testing import TestClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.api.api import api
+from apps.usage.api.schemas import UsageRecordCreateSchema
+from apps.usage.models import AppInfo, DailyAppUsage, HourlyUsage, UsageRecord
+from apps.usage.services.app_cache import AppInfoResolver, app_resolver
+from apps.usage.services.archive import archive_user, archived_rows_for_date
+from apps.usage.services.dedupe import delete_duplicates
+from apps.usage.services.heatmap import rebuild_user_heatmap
+from apps.usage.services.ingest import DUPLICATE_ERROR
+from apps.usage.services.intervals import user_timezone
+from apps.usage.services.list_serializer import (
+    TimestampFormatter,
+    astream_usage_list,
+    format_duration_ms,
+    stream_usage_list,
+)
+from apps.usage.services.local_day import change_user_timezone
+from apps.usage.services.rollup import rebuild_user_rollup
+from apps.usage.services.memo_search import FTS_TABLE, rebuild_memo_index, search_memos
+from apps.usage.services.write_buffer import BufferFullError, UsageWriteBuffer
+from apps.users.models import Profile
+
+SEOUL = ZoneInfo("Asia/Seoul")
+
+
+def to_ms(dt: datetime.datetime) -> int:
+    return int(dt.timestamp() * 1000)
+
+
+class UsageTestCase(TestCase):
+    """사용자 한 명과 인증 헤더, API 테스트 클라이언트를 준비합니다. 아카이브 파일은 임시 디렉터리에 씁니다."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="tester", password="pw")
+
+    def setUp(self):
+        # 테스트마다 롤백되는 AppInfo id가 프로세스 캐시에 남지 않도록 비웁니다.
+        app_resolver.clear()
+        self.client = TestClient(api)
+        self.headers = {"Authorization": f"Bearer {RefreshToken.for_user(self.user).access_token}"}
+        archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, archive_dir, ignore_errors=True)
+        archive_settings = override_settings(USAGE_ARCHIVE_DIR=archive_dir)
+        archive_settings.enable()
+        self.addCleanup(archive_settings.disable)
+
+    @staticmethod
+    def item(start: datetime.datetime, minutes: int = 1, package_name: str = "com.example.app") -> dict:
+        return {
+            "package_name": package_name,
+            "app_name": package_name.rsplit(".", 1)[-1],
+            "usage_time_ms": minutes * 60 * 1000,
+            "start_time": to_ms(start),
+            "end_time": to_ms(start + datetime.timedelta(minutes=minutes)),
+        }
+
+    def rollup_rows(self) -> tuple[list, list]:
+        daily = DailyAppUsage.objects.filter(user=self.user).order_by("app_id", "date")
+        hourly = HourlyUsage.objects.filter(user=self.user).exclude(total_ms=0).order_by("date", "hour")
+        return (
+            list(daily.values_list("app_id", "date", "total_ms", "session_count", "memo_count")),
+            list(hourly.values_list("date", "hour", "total_ms")),
+        )
+
+    def list_day(self, day: str) -> list[dict]:
+        response = self.client.get(f"/usage/list?date={day}", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content)["data"]["records"]
+
+    def upload(self, items: list[dict], on_conflict: str = "error"):
+        response = self.client.post(
+            f"/usage/record/batch?on_conflict={on_conflict}", json=items, headers=self.headers
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()["data"]
+
+
+class AppCacheTests(TestCase):
+    def setUp(self):
+        self.resolver = AppInfoResolver(max_size=2)
+        self.resolver.resolve_many({})  # 미리 읽기(빈 테이블)를 먼저 끝냅니다.
+
+    def test_new_apps_are_cached_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            app_id = self.resolver.resolve("com.example.a", "a")
+            self.assertEqual(self.resolver.stats()["size"], 0)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.resolver.resolve("com.example.a", "다른 이름"), app_id)
+        self.assertEqual(AppInfo.objects.get(id=app_id).app_name, "a")
+
+    def test_rolled_back_apps_are_not_cached(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                self.resolver.resolve("com.example.a", "a")
+                raise RuntimeError
+
+        self.assertEqual(self.resolver.stats()["size"], 0)
+        self.assertFalse(AppInfo.objects.exists())
+
+    def test_least_recently_used_app_is_evicted(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            ids = self.resolver.resolve_many({"com.example.a": "a", "com.example.b": "b"})
+        self.resolver.resolve("com.example.a", "a")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.resolver.resolve("com.example.c", "c")
+
+        self.assertEqual(self.resolver.stats()["size"], 2)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.resolver.resolve("com.example.a", "a"), ids["com.example.a"])
+        # b는 밀려났으므로 DB에서 다시 찾습니다. (새로 만들지 않음)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.resolver.resolve("com.example.b", "b"), ids["com.example.b"])
+
+    def test_renamed_package_is_invalidated(self):
+        # 수정/삭제 시그널은 프로세스 캐시(app_resolver)를 비웁니다.
+        app_resolver.clear()
+        self.addCleanup(app_resolver.clear)
+        with self.captureOnCommitCallbacks(execute=True):
+            app_id = app_resolver.resolve("com.example.old", "old")
+        app = AppInfo.objects.get(id=app_id)
+        app.package_name = "com.example.new"
+        app.save()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertNotEqual(app_resolver.resolve("com.example.old", "old"), app_id)
+        self.assertEqual(app_resolver.resolve("com.example.new", "new"), app_id)
+
+
+class MemoBatchTests(UsageTestCase):
+    def setUp(self):
+        super().setUp()
+        start = datetime.datetime(2025, 3, 1, 9, tzinfo=SEOUL)
+        self.upload([self.item(start + datetime.timedelta(minutes=2 * i)) for i in range(3)])
+        self.ids = list(UsageRecord.objects.filter(user=self.user).order_by("id").values_list("id", flat=True))
+        UsageRecord.objects.filter(id=self.ids[2]).update(memo="지울 메모")
+        rebuild_user_rollup(self.user.id)
+        rebuild_memo_index(self.user.id)
+
+    def post_batch(self, items: list[dict]):
+        return self.client.post("/usage/memo/batch", json=items, headers=self.headers)
+
+    def memo_count(self) -> int:
+        return DailyAppUsage.objects.get(user=self.user).memo_count
+
+    def test_memos_are_set_and_cleared_together(self):
+        response = self.post_batch([
+            {"record_id": self.ids[0], "memo": "첫 메모"},
+            {"record_id": self.ids[0], "memo": "고친 메모"},  # 마지막 값이 적용됨
+            {"record_id": self.ids[1], "memo": None},  # 원래 없음
+            {"record_id": self.ids[2], "memo": None},
+        ])
+
+        self.assertEqual(response.status_code, 200, response.content)
+        data = response.json()["data"]
+        self.assertEqual(data["updated"], 2)
+        self.assertEqual(data["results"], [
+            {"id": self.ids[0], "memo": "고친 메모"},
+            {"id": self.ids[1], "memo": None},
+            {"id": self.ids[2], "memo": None},
+        ])
+        self.assertEqual(self.memo_count(), 1)
+        results, _ = search_memos(self.user, "메모")
+        self.assertEqual([row["id"] for row in results], [self.ids[0]])
+
+    def test_foreign_record_changes_nothing(self):
+        other = User.objects.create_user(username="other", password="pw")
+        foreign = UsageRecord.objects.create(user=other, usage_time_ms=0, start_time=0, end_time=0)
+
+        response = self.post_batch([
+            {"record_id": self.ids[0], "memo": "메모"},
+            {"record_id": foreign.id, "memo": "메모"},
+        ])
+
+        self.assertEqual(response.status_code, 404)
+        self.assertIn(str(foreign.id), response.json()["message"])
+        self.assertIsNone(UsageRecord.objects.get(id=self.ids[0]).memo)
+        self.assertEqual(self.memo_count(), 1)
+
+    @override_settings(USAGE_MEMO_BATCH_MAX_ITEMS=2)
+    def test_item_count_is_limited(self):
+        response = self.post_batch([{"record_id": record_id, "memo": "메모"} for record_id in self.ids])
+
+        self.assertEqual(response.status_code, 400)
+
+
+class MemoIndexDeleteTests(UsageTestCase):
+    def test_archive_removes_index_rows_without_per_row_queries(self):
+        start = datetime.datetime(2025, 1, 10, 9, tzinfo=SEOUL)
+        items = [self.item(start + datetime.timedelta(minutes=2 * i)) for i in range(1000)]
+        self.upload(items)
+        UsageRecord.objects.filter(user=self.user).update(memo="아카이브 메모")
+        rebuild_memo_index(self.user.id)
+
+        with CaptureQueriesContext(connection) as queries:
+            stats = archive_user(self.user.id, cutoff=datetime.date(2025, 2, 1))
+
+        self.assertEqual(stats.archived, 1000)
+        self.assertLess(len(queries), 30)
+        self.assertFalse([q for q in queries.captured_queries if FTS_TABLE in q["sql"]])
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT count(*) FROM {FTS_TABLE} WHERE user_id = %s", [self.user.id])
+            self.assertEqual(cursor.fetchone()[0], 0)
+
+    def test_user_delete_removes_index_rows(self):
+        self.upload([self.item(datetime.datetime(2025, 3, 1, 9, tzinfo=SEOUL))])
+        record = UsageRecord.objects.get(user=self.user)
+        record.memo = "삭제될 메모"
+        record.save(update_fields=["memo"])
+
+        self.user.delete()
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT count(*) FROM {FTS_TABLE} WHERE rowid = %s", [record.id])
+            self.assertEqual(cursor.fetchone()[0], 0)
+
+
+class MemoSearchTests(UsageTestCase):
+    def setUp(self):
+        super().setUp()
+        # id가 다른 사용자의 부분 문자열인 경우(7과 77)도 섞이지 않아야 합니다.
+        self.me = User.objects.create_user(id=7, username="me")
+        self.other = User.objects.create_user(id=77, username="other")
+        app = AppInfo.objects.create(package_name="com.example.memo", app_name="memo")
+        start = to_ms(datetime.datetime(2025, 3, 1, 9, tzinfo=SEOUL))
+        for i, (user, memo) in enumerate([
+            (self.me, "시험 공부 열심히 함"),
+            (self.me, "유튜브 보면서 쉼"),
+            (self.other, "시험 공부 안 함"),
+            (self.other, "공부 열심히"),
+        ]):
+            UsageRecord.objects.create(
+                user=user, app=app, usage_time_ms=60000, start_time=start + i * 60000, end_time=start + i * 60000 + 60000,
+                local_date=datetime.date(2025, 3, 1), memo=memo,
+            )
+
+    def search(self, query: str) -> list[str]:
+        results, _ = search_memos(self.me, query)
+        return [row["memo"] for row in results]
+
+    def test_results_are_limited_to_the_user(self):
+        self.assertEqual(self.search("열심히"), ["시험 공부 열심히 함"])
+        self.assertEqual(self.search("공부"), ["시험 공부 열심히 함"])
+        self.assertEqual(self.search("시험 공부"), ["시험 공부 열심히 함"])
+        self.assertEqual(self.search("쉼"), ["유튜브 보면서 쉼"])
+        self.assertEqual(self.search("안 함"), [])
+
+    def test_short_terms_are_matched_through_the_index(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.search("공부")
+
+        sql = "\n".join(q["sql"] for q in queries.captured_queries)
+        # 짧은 검색어도 FTS 테이블에서 사용자 행만 추린 뒤 비교하고, 기록 테이블 전체를 훑지 않습니다.
+        self.assertIn(f"{FTS_TABLE} MATCH", sql)
+        self.assertNotIn('"usage_usagerecord"."memo" LIKE', sql)
+
+    def test_like_wildcards_in_terms_are_literal(self):
+        self.assertEqual(self.search("%"), [])
+        self.assertEqual(self.search("_"), [])
+
+
+class RollupTests(UsageTestCase):
+    def setUp(self):
+        super().setUp()
+        start = datetime.datetime(2025, 3, 1, 23, 0, tzinfo=SEOUL)
+        self.upload([
+            self.item(start, minutes=90),  # 3월 1일 60분 + 3월 2일 30분
+            self.item(start + datetime.timedelta(minutes=10), minutes=5, package_name="com.example.other"),
+            self.item(start + datetime.timedelta(hours=10), minutes=20),
+        ])
+        self.ids = list(UsageRecord.objects.filter(user=self.user).order_by("start_time").values_list("id", flat=True))
+
+    def test_incremental_rollup_matches_rebuild(self):
+        start = datetime.datetime(2025, 3, 1, 23, 0, tzinfo=SEOUL)
+        self.upload([{**self.item(start, minutes=90), "usage_time_ms": 45 * 60 * 1000}], on_conflict="update")
+        for record_id, memo in [(self.ids[0], "메모"), (self.ids[2], "메모"), (self.ids[2], "")]:
+            response = self.client.post(f"/usage/{record_id}/memo", json={"memo": memo}, headers=self.headers)
+            self.assertEqual(response.status_code, 200, response.content)
+
+        bounds = DailyAppUsage.objects.order_by("app_id", "date").values_list("first_start", "last_end")
+        incremental, incremental_bounds = self.rollup_rows(), list(bounds)
+        rebuild_user_rollup(self.user.id)
+        rebuild_user_heatmap(self.user.id)
+
+        self.assertEqual(incremental, self.rollup_rows())
+        self.assertEqual(incremental_bounds, list(bounds.all()))
+        app_id, other_id = (UsageRecord.objects.get(id=record_id).app_id for record_id in self.ids[:2])
+        self.assertEqual(incremental[0], [
+            (app_id, datetime.date(2025, 3, 1), 30 * 60 * 1000, 1, 1),
+            (app_id, datetime.date(2025, 3, 2), (15 + 20) * 60 * 1000, 2, 0),
+            (other_id, datetime.date(2025, 3, 1), 5 * 60 * 1000, 1, 0),
+        ])
+
+    def test_rebuild_command_since_keeps_earlier_days(self):
+        expected = self.rollup_rows()
+        DailyAppUsage.objects.filter(user=self.user).update(total_ms=0, session_count=0)
+
+        call_command("rebuild_usage_rollup", user_ids=[self.user.id], since="2025-03-02", stdout=StringIO())
+
+        rows = DailyAppUsage.objects.filter(user=self.user).order_by("app_id", "date")
+        self.assertEqual(
+            list(rows.values_list("date", "total_ms")),
+            [(day, 0 if day < datetime.date(2025, 3, 2) else total) for _, day, total, _, _ in expected[0]],
+        )
+
+
+class HeatmapTests(UsageTestCase):
+    def heatmap(self, days) -> dict:
+        # 오늘 = 2025년 3월 3일(월)
+        with mock.patch("apps.usage.api.endpoints.local_today", return_value=datetime.date(2025, 3, 3)):
+            return self.client.get(f"/usage/heatmap?days={days}", headers=self.headers)
+
+    def test_usage_is_split_into_weekday_hour_cells(self):
+        self.upload([
+            self.item(datetime.datetime(2025, 3, 3, 9, 40, tzinfo=SEOUL), minutes=40),
+            self.item(datetime.datetime(2025, 3, 2, 23, 50, tzinfo=SEOUL), minutes=20),
+            self.item(datetime.datetime(2025, 2, 1, 9, tzinfo=SEOUL)),  # 기간 밖
+        ])
+
+        response = self.heatmap(14)
+        self.assertEqual(response.status_code, 200, response.content)
+        data = response.json()["data"]
+
+        minute = 60 * 1000
+        filled = {
+            (weekday, hour): total
+            for weekday, row in enumerate(data["cells"]) for hour, total in enumerate(row) if total
+        }
+        self.assertEqual(filled, {(0, 9): 20 * minute, (0, 10): 20 * minute, (6, 23): 10 * minute, (0, 0): 10 * minute})
+        self.assertEqual((data["start_date"], data["end_date"]), ("2025-02-18", "2025-03-03"))
+        self.assertEqual(data["weekday_days"], [2] * 7)
+
+    def test_days_is_limited(self):
+        self.assertEqual(self.heatmap(0).status_code, 400)
+        with override_settings(USAGE_HEATMAP_MAX_DAYS=7):
+            self.assertEqual(self.heatmap(8).status_code, 400)
+
+
+class DedupeRollupTests(UsageTestCase):
+    def test_deleting_duplicates_matches_rebuilt_rollups(self):
+        start = datetime.datetime(2025, 3, 1, 23, 50, tzinfo=SEOUL)
+        self.upload([self.item(start, minutes=20), self.item(start + datetime.timedelta(hours=1), minutes=30)])
+        UsageRecord.objects.filter(user=self.user).update(memo="메모")
+        rebuild_user_rollup(self.user.id)
+        removed = UsageRecord.objects.filter(user=self.user).order_by("start_time").last()
+
+        delete_duplicates(self.user.id, [removed.id], user_timezone(self.user.id))
+
+        incremental = self.rollup_rows()
+        rebuild_user_rollup(self.user.id)
+        rebuild_user_heatmap(self.user.id)
+        self.assertEqual(incremental, self.rollup_rows())
+        self.assertEqual(incremental[0], [
+            (removed.app_id, datetime.date(2025, 3, 1), 10 * 60 * 1000, 1, 1),
+            (removed.app_id, datetime.date(2025, 3, 2), 10 * 60 * 1000, 1, 0),
+        ])
+
+
+class ListQueryPlanTests(UsageTestCase):
+    """overlapping()은 user-006의 구간 인덱스 대신 user-011의 local_date 인덱스로 조회합니다. 계획이 인덱스만으로 정렬되는지 확인합니다."""
+
+    def query_plan(self, queryset) -> str:
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            return "\n".join(row[-1] for row in cursor.fetchall())
+
+    def test_day_list_uses_local_date_index(self):
+        start = datetime.datetime(2025, 3, 1, 9, tzinfo=SEOUL)
+        self.upload([self.item(start + datetime.timedelta(minutes=2 * i)) for i in range(50)])
+
+        plan = self.query_plan(
+            UsageRecord.objects.overlapping(self.user, datetime.date(2025, 3, 1)).order_by("-start_time")
+        )
+
+        self.assertIn("usage_user_local_date_idx", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    @override_settings(USAGE_SPLIT_AT_MIDNIGHT=True)
+    def test_overlapping_returns_each_day_of_a_split_session(self):
+        # 3월 1일 23:30 ~ 3월 2일 00:30 세션과 3월 3일 기록
+        self.upload([
+            self.item(datetime.datetime(2025, 3, 1, 23, 30, tzinfo=SEOUL), minutes=60),
+            self.item(datetime.datetime(2025, 3, 3, 9, tzinfo=SEOUL)),
+        ])
+
+        def days(*args):
+            return sorted(UsageRecord.objects.overlapping(self.user, *args).values_list("local_date", flat=True))
+
+        self.assertEqual(days(datetime.date(2025, 3, 2)), [datetime.date(2025, 3, 2)])
+        self.assertEqual(
+            days(datetime.date(2025, 3, 1), datetime.date(2025, 3, 2)),
+            [datetime.date(2025, 3, 1), datetime.date(2025, 3, 2)],
+        )
+        self.assertEqual(len(days(datetime.date(2025, 3, 1), datetime.date(2025, 3, 3))), 3)
+        self.assertIn(
+            "usage_user_local_date_idx",
+            self.query_plan(UsageRecord.objects.overlapping(self.user, datetime.date(2025, 3, 1), datetime.date(2025, 3, 3))),
+        )
+
+
+class KeysetPaginationTests(UsageTestCase):
+    def list_page(self, cursor=None, page_size=2):
+        url = f"/usage/list?page_size={page_size}" + (f"&cursor={cursor}" if cursor else "")
+        response = self.client.get(url, headers=self.headers)
+        self.assertEqual(response.status_code, 200, response.content)
+        data = json.loads(response.content)["data"]
+        return [record["id"] for record in data["records"]], data["next_cursor"]
+
+    def test_pages_cover_every_record_once_while_new_records_arrive(self):
+        start = datetime.datetime(2025, 3, 1, 9, tzinfo=SEOUL)
+        # 같은 시각에 시작한 기록 두 개는 id로 순서가 정해집니다.
+        self.upload([
+            self.item(start),
+            self.item(start, package_name="com.example.other"),
+            *[self.item(start + datetime.timedelta(minutes=2 * i)) for i in range(1, 4)],
+        ])
+        expected = list(UsageRecord.objects.filter(user=self.user).order_by("-start_time", "-id").values_list("id", flat=True))
+
+        seen, cursor = self.list_page()
+        # 첫 페이지를 읽은 뒤 더 최근 기록이 추가되어도 다음 페이지가 밀리지 않습니다.
+        self.upload([self.item(start + datetime.timedelta(hours=1))])
+        while cursor:
+            ids, cursor = self.list_page(cursor)
+            seen += ids
+
+        self.assertEqual(seen, expected)
+
+    def test_invalid_cursor_and_page_size_are_rejected(self):
+        response = self.client.get("/usage/list?cursor=invalid", headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+        with override_settings(USAGE_LIST_MAX_PAGE_SIZE=3):
+            response = self.client.get("/usage/list?page_size=4", headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("1 ~ 3", response.json()["message"])
+
+
+class ConditionalListTests(UsageTestCase):
+    def setUp(self):
+        super().setUp()
+        self.start = datetime.datetime(2025, 3, 1, 9, tzinfo=SEOUL)
+        self.upload([self.item(self.start)])
+
+    def get(self, url: str, etag: str = None):
+        headers = {**self.headers, "If-None-Match": etag} if etag else self.headers
+        return self.client.get(url, headers=headers)
+
+    def assert_revalidates(self, url: str, change) -> None:
+        response = self.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        self.assertEqual(response["Cache-Control"], "private, no-cache")
+
+        response = self.get(url, f"W/{etag}")
+        self.assertEqual((response.status_code, response.content, response["ETag"]), (304, b"", etag))
+
+        change()
+        response = self.get(url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_day_list(self):
+        url = "/usage/list?date=2025-03-01"
+        self.assert_revalidates(url, lambda: self.upload([self.item(self.start + datetime.timedelta(hours=1))]))
+        record_id = UsageRecord.objects.filter(user=self.user).first().id
+        self.assert_revalidates(
+            url, lambda: self.client.post(f"/usage/{record_id}/memo", json={"memo": "메모"}, headers=self.headers)
+        )
+
+        # 다른 날짜의 기록은 이 날짜의 ETag를 바꾸지 않습니다.
+        etag = self.get(url)["ETag"]
+        self.upload([self.item(self.start + datetime.timedelta(days=1))])
+        self.assertEqual(self.get(url, etag).status_code, 304)
+
+    def test_page_list(self):
+        self.assert_revalidates(
+            "/usage/list?page_size=10", lambda: self.upload([self.item(self.start + datetime.timedelta(days=3))])
+        )
+
+    def test_timezone_change(self):
+        etag = self.get("/usage/list?date=2025-03-01")["ETag"]
+        Profile.objects.update_or_create(user=self.user, defaults={"timezone": "UTC"})
+
+        self.assertEqual(self.get("/usage/list?date=2025-03-01", etag).status_code, 200)
+
+
+class ListStreamingTests(UsageTestCase):
+    async def test_asgi_list_streams_without_buffering(self):
+        start = datetime.datetime(2025, 3, 1, 9, tzinfo=SEOUL)
+        await sync_to_async(self.upload)([self.item(start + datetime.timedelta(minutes=2 * i)) for i in range(30)])
+        expected = await sync_to_async(
+            lambda: self.client.get("/usage/list?date=2025-03-01", headers=self.headers).content
+        )()
+
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            response = await self.async_client.get("/api/usage/list?date=2025-03-01", headers=self.headers)
+            self.assertTrue(response.is_async)
+            body = b"".join([chunk async for chunk in response.streaming_content])
+
+        self.assertEqual(body, expected)
+        self.assertEqual(len(json.loads(body)["data"]["records"]), 30)
+        self.assertFalse([w for w in caught if "synchronous iterators" in str(w.message)])
+
+
+class ListSerializerTests(TestCase):
+    def test_timestamps_match_strftime(self):
+        # 30분 시차, 일광 절약 시간 전환, 서버 로컬 시간대(None)
+        base = to_ms(datetime.datetime(2025, 3, 9, 0, tzinfo=datetime.timezone.utc))
+        for tz in (SEOUL, ZoneInfo("Asia/Kolkata"), ZoneInfo("America/New_York"), None):
+            formatter = TimestampFormatter(tz, max_size=8)
+            for ms in range(base, base + 12 * 3600 * 1000, 7 * 60 * 1000 + 1234):
+                expected = datetime.datetime.fromtimestamp(ms / 1000, tz).strftime("%Y-%m-%d %H:%M:%S")
+                self.assertEqual(formatter.format(ms), expected, (tz, ms))
+
+    def test_durations_match_timedelta(self):
+        for ms in (0, 999, 1000, 61_001, 3_600_000, 86_399_999, 86_400_000, 2 * 86_400_000 + 5):
+            self.assertEqual(format_duration_ms(ms), str(datetime.timedelta(milliseconds=ms)))
+
+    def test_stream_matches_json_of_each_row(self):
+        start = to_ms(datetime.datetime(2025, 3, 1, 9, tzinfo=SEOUL))
+        rows = [
+            (i + 1, f"com.example.app{i}", f"앱 \"{i}\"", 60_500, start + i, start + i + 60_500,
+             "3f2a6c1e-0d1f-4c8a-9e64-2a4b5f6c7d8e" if i == 2 else None)
+            for i in range(5)
+        ]
+
+        body = b"".join(stream_usage_list(rows, message="조회 성공", next_cursor="abc", chunk_size=2, tz=SEOUL))
+
+        async def collect():
+            return b"".join([part async for part in astream_usage_list(iter(rows), "조회 성공", "abc", 2, SEOUL)])
+
+        self.assertEqual(async_to_sync(collect)(), body)
+        data = json.loads(body)
+        self.assertEqual((data["message"], data["data"]["next_cursor"]), ("조회 성공", "abc"))
+        self.assertEqual(data["data"]["records"][2], {
+            "id": 3,
+            "package_name": "com.example.app2",
+            "app_name": '앱 "2"',
+            "usage_time_ms": 60_500,
+            "start_time": start + 2,
+            "end_time": start + 2 + 60_500,
+            "start_time_str": "2025-03-01 09:00:00",
+            "end_time_str": "2025-03-01 09:01:00",
+            "usage_time_str": "0:01:00.500000",
+            "session_id": "3f2a6c1e-0d1f-4c8a-9e64-2a4b5f6c7d8e",
+        })
+        self.assertEqual(len(data["data"]["records"]), 5)
+
+
+class IngestTests(UsageTestCase):
+    def test_long_record_is_accepted_and_rolled_up_per_day(self):
+        start = datetime.datetime(2025, 3, 1, 12, tzinfo=SEOUL)
+        result = self.upload([self.item(start, minutes=30 * 60)])
+
+        self.assertIsNone(result["results"][0]["error"])
+        daily = DailyAppUsage.objects.filter(user=self.user).order_by("date").values_list("date", "total_ms")
+        self.assertEqual(list(daily), [
+            (datetime.date(2025, 3, 1), 12 * 3600 * 1000),
+            (datetime.date(2025, 3, 2), 18 * 3600 * 1000),
+        ])
+
+
+class BatchIngestTests(UsageTestCase):
+    def setUp(self):
+        super().setUp()
+        start = datetime.datetime(2025, 3, 1, 9, tzinfo=SEOUL)
+        self.first = self.item(start)
+        self.second = self.item(start + datetime.timedelta(minutes=5), minutes=2)
+
+    def test_results_follow_request_order(self):
+        invalid = {**self.first, "end_time": self.first["start_time"] - 1}
+        data = self.upload([self.first, invalid, self.first, self.second])
+
+        self.assertEqual((data["created"], data["existing"], data["failed"]), (2, 0, 2))
+        self.assertEqual(
+            [(r["index"], r["created"], r["error"]) for r in data["results"]],
+            [
+                (0, True, None),
+                (1, False, "end_time은 start_time보다 빠를 수 없습니다."),
+                (2, False, DUPLICATE_ERROR),
+                (3, True, None),
+            ],
+        )
+        self.assertEqual(UsageRecord.objects.filter(user=self.user).count(), 2)
+
+    def test_resent_batch_follows_on_conflict(self):
+        ids = [r["record_id"] for r in self.upload([self.first, self.second])["results"]]
+        resent = [{**self.first, "usage_time_ms": 30 * 1000}, self.second]
+
+        data = self.upload(resent, on_conflict="ignore")
+        self.assertEqual((data["created"], data["existing"]), (0, 2))
+        self.assertEqual([r["record_id"] for r in data["results"]], ids)
+        self.assertEqual(UsageRecord.objects.get(id=ids[0]).usage_time_ms, 60 * 1000)
+
+        data = self.upload(resent, on_conflict="update")
+        self.assertEqual([r["record_id"] for r in data["results"]], ids)
+        self.assertEqual(UsageRecord.objects.get(id=ids[0]).usage_time_ms, 30 * 1000)
+        # 수정된 사용시간은 일별 집계에도 반영됩니다.
+        incremental = self.rollup_rows()
+        rebuild_user_rollup(self.user.id)
+        rebuild_user_heatmap(self.user.id)
+        self.assertEqual(incremental, self.rollup_rows())
+        self.assertEqual(incremental[0][0][2], (30 + 120) * 1000)
+
+    @override_settings(USAGE_BATCH_MAX_RECORDS=1)
+    def test_batch_size_is_limited(self):
+        response = self.client.post("/usage/record/batch", json=[self.first, self.second], headers=self.headers)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(UsageRecord.objects.filter(user=self.user).exists())
+
+
+class WriteBehindTests(TransactionTestCase):
+    """writer 스레드가 자기 DB 연결로 커밋하므로 TransactionTestCase에서 확인합니다."""
+
+    def setUp(self):
+        app_resolver.clear()
+        self.user = User.objects.create_user(username="tester", password="pw")
+        self.client = TestClient(api)
+        self.headers = {"Authorization": f"Bearer {RefreshToken.for_user(self.user).access_token}"}
+        start = datetime.datetime(2025, 3, 1, 9, tzinfo=SEOUL)
+        self.items = [UsageTestCase.item(start + datetime.timedelta(minutes=2 * i)) for i in range(3)]
+
+    def start_buffer(self, **kwargs) -> UsageWriteBuffer:
+        buffer = UsageWriteBuffer(**{"batch_size": 3, "flush_interval": 60, "max_depth": 10, **kwargs})
+        self.addCleanup(buffer.shutdown)
+        return buffer
+
+    def submit(self, buffer, item, on_conflict="error"):
+        return buffer.submit(self.user, UsageRecordCreateSchema(**item), on_conflict)
+
+    def test_full_batch_is_flushed_in_one_transaction(self):
+        buffer = self.start_buffer()
+        futures = [
+            self.submit(buffer, self.items[0]),
+            self.submit(buffer, self.items[1]),
+            self.submit(buffer, self.items[0], on_conflict="ignore"),
+        ]
+
+        results = [future.result(timeout=5) for future in futures]
+
+        # 같은 사용자, 같은 on_conflict끼리 한 번에 저장되고, 다른 on_conflict 그룹은 앞 그룹의 기록을 기존 기록으로 봅니다.
+        self.assertEqual([r.created for r in results], [True, True, False])
+        self.assertEqual(results[2].record_id, results[0].record_id)
+        self.assertEqual(UsageRecord.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(DailyAppUsage.objects.get(user=self.user).session_count, 2)
+        self.assertEqual((buffer.stats()["flushed"], buffer.stats()["flushes"]), (3, 1))
+
+    def test_full_queue_is_rejected_and_drained_on_shutdown(self):
+        buffer = self.start_buffer(batch_size=10, max_depth=1)
+        future = self.submit(buffer, self.items[0])
+        with self.assertRaises(BufferFullError):
+            self.submit(buffer, self.items[1])
+
+        buffer.shutdown()
+
+        self.assertTrue(future.result(timeout=0).created)
+        self.assertEqual(UsageRecord.objects.filter(user=self.user).count(), 1)
+
+    @override_settings(USAGE_WRITE_BEHIND=True)
+    def test_endpoint_acknowledgement(self):
+        buffer = self.start_buffer(batch_size=1)
+        with mock.patch("apps.usage.api.endpoints.usage_write_buffer", buffer):
+            with override_settings(USAGE_WRITE_BEHIND_ACK="flush"):
+                response = self.client.post("/usage/record", json=self.items[0], headers=self.headers)
+                self.assertEqual(response.status_code, 200, response.content)
+                self.assertTrue(response.json()["data"]["record_id"])
+                # 재전송은 저장이 끝난 뒤 409로 알려줍니다.
+                response = self.client.post("/usage/record", json=self.items[0], headers=self.headers)
+                self.assertEqual(response.status_code, 409)
+            response = self.client.post("/usage/record", json=self.items[1], headers=self.headers)
+            self.assertEqual(response.status_code, 202)
+            buffer.shutdown()
+
+        self.assertEqual(UsageRecord.objects.filter(user=self.user).count(), 2)
+
+
+@override_settings(USAGE_STREAM_CHUNK_SIZE=2, USAGE_STREAM_MAX_LINE_BYTES=300, USAGE_STREAM_MAX_ERRORS=2)
+class StreamImportTests(UsageTestCase):
+    def setUp(self):
+        super().setUp()
+        start = datetime.datetime(2025, 3, 1, 9, tzinfo=SEOUL)
+        self.lines = [json.dumps(self.item(start + datetime.timedelta(minutes=2 * i))).encode() for i in range(3)]
+
+    def post_stream(self, body: bytes, **headers) -> dict:
+        response = Client().post(
+            "/api/usage/record/stream", data=body, content_type="application/x-ndjson",
+            headers={**self.headers, **headers},
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_lines_are_validated_and_saved_in_chunks(self):
+        body = b"\n".join([
+            self.lines[0],
+            b"",
+            b'{"package_name": "com.example.app"}',
+            self.lines[1],
+            b'{"memo": "' + b"x" * 400 + b'"}',
+            self.lines[0],
+            self.lines[2],
+        ])
+
+        data = self.post_stream(body)["data"]
+
+        self.assertEqual(
+            (data["lines"], data["created"], data["existing"], data["failed"], data["chunks"]), (6, 3, 1, 2, 2)
+        )
+        self.assertEqual([error["line"] for error in data["errors"]], [3, 5])
+        self.assertIn("300바이트", data["errors"][1]["error"])
+        self.assertFalse(data["errors_truncated"])
+        self.assertEqual(UsageRecord.objects.filter(user=self.user).count(), 3)
+
+    def test_errors_are_truncated(self):
+        data = self.post_stream(b"\n".join([b"{}"] * 4))["data"]
+
+        self.assertEqual((data["failed"], len(data["errors"]), data["errors_truncated"]), (4, 2, True))
+
+    def test_gzip_body_and_truncated_upload(self):
+        body = gzip.compress(b"\n".join(self.lines))
+        self.assertEqual(self.post_stream(body, content_encoding="gzip")["data"]["created"], 3)
+
+        UsageRecord.objects.filter(user=self.user).delete()
+        # 끊긴 업로드는 읽은 데까지 저장하고 aborted로 알려줍니다.
+        result = self.post_stream(body[:-12], content_encoding="gzip")
+        self.assertIsNotNone(result["data"]["aborted"])
+        self.assertEqual(result["message"], result["data"]["aborted"])
+        self.assertEqual(UsageRecord.objects.filter(user=self.user).count(), result["data"]["created"])
+
+
+@override_settings(USAGE_SPLIT_AT_MIDNIGHT=True)
+class SplitSessionTimezoneTests(UsageTestCase):
+    def setUp(self):
+        super().setUp()
+        # 서울 기준 자정을 넘는 기록(UTC로는 14:30 ~ 15:30)을 서울 시간대로 나눠 저장한 뒤 UTC로 바꿉니다.
+        self.item_ = self.item(datetime.datetime(2025, 3, 1, 23, 30, tzinfo=SEOUL), minutes=60)
+        self.first_id = self.upload([self.item_])["results"][0]["record_id"]
+        self.assertEqual(UsageRecord.objects.filter(user=self.user).count(), 2)
+        change_user_timezone(self.user, ZoneInfo("UTC"))
+
+    def test_resend_after_timezone_change_is_a_duplicate(self):
+        result = self.upload([self.item_])
+
+        self.assertEqual(result["results"][0]["error"], DUPLICATE_ERROR)
+        self.assertEqual(UsageRecord.objects.filter(user=self.user).count(), 2)
+
+    def test_resend_with_update_redistributes_existing_segments(self):
+        item = dict(self.item_, usage_time_ms=30 * 60 * 1000)
+        result = self.upload([item], on_conflict="update")
+
+        self.assertEqual((result["results"][0]["record_id"], result["results"][0]["created"]), (self.first_id, False))
+        segments = UsageRecord.objects.filter(user=self.user).order_by("start_time")
+        self.assertEqual(list(segments.values_list("usage_time_ms", flat=True)), [15 * 60 * 1000, 15 * 60 * 1000])
+        self.assertEqual(
+            list(DailyAppUsage.objects.filter(user=self.user).values_list("date", "total_ms")),
+            [(datetime.date(2025, 3, 1), 30 * 60 * 1000)],
+        )
+
+
+class StatsSessionCountTests(UsageTestCase):
+    def setUp(self):
+        super().setUp()
+        # 3월 1일 23:30 ~ 3월 2일 00:30 세션(60분)과 3월 2일 10분 기록
+        self.sessions = [
+            self.item(datetime.datetime(2025, 3, 1, 23, 30, tzinfo=SEOUL), minutes=60),
+            self.item(datetime.datetime(2025, 3, 2, 9, tzinfo=SEOUL), minutes=10),
+        ]
+
+    def stats(self, start: str, end: str) -> dict:
+        response = self.client.get(f"/usage/stats?start={start}&end={end}", headers=self.headers)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()["data"]
+
+    def assert_session_counted_once(self):
+        stats = self.stats("2025-03-01", "2025-03-02")
+        self.assertEqual((stats["session_count"], stats["avg_session_ms"]), (2, 35 * 60 * 1000))
+        self.assertEqual(stats["apps"][0]["session_count"], 2)
+        # 일별 합계에서는 걸친 날마다 셉니다.
+        self.assertEqual([day["session_count"] for day in stats["days"]], [1, 2])
+        # 기간이 이어진 날부터 시작하면 그날의 세션으로 셉니다.
+        self.assertEqual(self.stats("2025-03-02", "2025-03-02")["session_count"], 2)
+
+    def test_long_record(self):
+        self.upload(self.sessions)
+        self.assert_session_counted_once()
+
+    @override_settings(USAGE_SPLIT_AT_MIDNIGHT=True)
+    def test_split_session(self):
+        self.upload(self.sessions)
+        self.assert_session_counted_once()
+
+    @override_settings(USAGE_SPLIT_AT_MIDNIGHT=True)
+    def test_rebuild_keeps_continued_sessions(self):
+        self.upload(self.sessions)
+        rows = DailyAppUsage.objects.filter(user=self.user).order_by("date").values_list("session_count", "continued_count")
+        before = list(rows)
+
+        rebuild_user_rollup(self.user.id)
+
+        after = list(rows.all())
+        self.assertEqual(before, [(1, 0), (2, 1)])
+        self.assertEqual(after, before)
+        self.assert_session_counted_once()
+
+
+class ArchivedReuploadTests(UsageTestCase):
+    def setUp(self):
+        super().setUp()
+        self.start = datetime.datetime(2025, 1, 10, 9, tzinfo=SEOUL)
+        self.upload([self.item(self.start)])
+        archive_user(self.user.id, cutoff=datetime.date(2025, 2, 1))
+
+    def assert_counted_once(self):
+        records = self.list_day("2025-01-10")
+        self.assertEqual(len(records), 1)
+
+        response = self.client.get("/usage/stats?start=2025-01-10&end=2025-01-10", headers=self.headers)
+        stats = response.json()["data"]
+        self.assertEqual((stats["total_ms"], stats["session_count"]), (60000, 1))
+
+    def test_reupload_of_archived_record_is_a_duplicate(self):
+        result = self.upload([self.item(self.start)])
+
+        self.assertEqual(result["results"][0]["error"], DUPLICATE_ERROR)
+        self.assertFalse(UsageRecord.objects.filter(user=self.user).exists())
+        self.assert_counted_once()
+
+    def test_reupload_with_ignore_returns_archived_id(self):
+        archived_id = archived_rows_for_date(self.user, datetime.date(2025, 1, 10))[0][0]
+
+        for on_conflict in ("ignore", "update"):
+            item = self.item(self.start)
+            item["usage_time_ms"] = 30000
+            result = self.upload([item], on_conflict=on_conflict)
+            self.assertEqual(result["results"][0]["record_id"], archived_id)
+            self.assertFalse(result["results"][0]["created"])
+
+        self.assertFalse(UsageRecord.objects.filter(user=self.user).exists())
+        self.assert_counted_once()
+
+    def test_list_merges_leftover_duplicate_once(self):
+        # 수정 이전에 재전송되어 hot 테이블에 남은 중복 기록
+        item = self.item(self.start)
+        UsageRecord.objects.create(
+            user=self.user,
+            app=AppInfo.objects.get(package_name=item["package_name"]),
+            usage_time_ms=item["usage_time_ms"],
+            start_time=item["start_time"],
+            end_time=item["end_time"],
+            local_date=datetime.date(2025, 1, 10),
+        )
+
+        records = self.list_day("2025-01-10")
+        self.assertEqual(len(records), 1)
+
+
+class QueryCountTests(UsageTestCase):
+    """조회/메모 API의 쿼리 수가 기록 수와 관계없이 고정되어 있는지 확인합니다."""
+
+    def upload_day(self, count: int) -> list[int]:
+        start = datetime.datetime(2025, 3, 1, 9, tzinfo=SEOUL)
+        self.upload([
+            self.item(start + datetime.timedelta(minutes=2 * i), package_name=f"com.example.app{i % 3}")
+            for i in range(count)
+        ])
+        return list(UsageRecord.objects.filter(user=self.user).order_by("id").values_list("id", flat=True))
+
+    def test_list_and_stats(self):
+        for count in (3, 60):
+            with self.subTest(count=count):
+                UsageRecord.objects.filter(user=self.user).delete()
+                self.upload_day(count)
+                # 인증, 시간대, 날짜 버전(ETag), 아카이브 매니페스트, 기록
+                with self.assertNumQueries(5):
+                    self.assertEqual(len(self.list_day("2025-03-01")), count)
+                # 인증, 시간대, 전체 기록 버전(ETag), 기록 한 페이지
+                with self.assertNumQueries(4):
+                    self.client.get("/usage/list", headers=self.headers).content
+                # 인증 + 전체/앱별/일별 집계
+                with self.assertNumQueries(4):
+                    response = self.client.get("/usage/stats?start=2025-02-01&end=2025-03-31", headers=self.headers)
+                self.assertEqual(response.status_code, 200)
+
+    def test_memo_endpoints(self):
+        for count in (3, 60):
+            with self.subTest(count=count):
+                UsageRecord.objects.filter(user=self.user).delete()
+                ids = self.upload_day(count)
+                # 인증, 기록 조회, UPDATE, 검색 인덱스 DELETE/INSERT, 앱 3개의 memo_count, 날짜 버전 (+ savepoint 2)
+                with self.assertNumQueries(11):
+                    response = self.client.post(
+                        "/usage/memo/batch",
+                        json=[{"record_id": record_id, "memo": f"메모 {count}"} for record_id in ids],
+                        headers=self.headers,
+                    )
+                self.assertEqual(response.json()["data"]["updated"], count)
+                with self.assertNumQueries(8):
+                    response = self.client.post(f"/usage/{ids[0]}/memo", json={"memo": "한 건"}, headers=self.headers)
+                self.assertEqual(response.status_code, 200)
+
+
+class NaturalKeyMigrationTests(TransactionTestCase):
+    """중복 기록이 있는 0003 상태의 DB가 0004 이후로 마이그레이션되는지 확인합니다."""
+
+    before = [("usage", "0003_usagerecord_app_usagerecord_created_at_and_more")]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_duplicates_are_removed_before_the_constraint(self):
+        old_apps = self.migrate(self.before)
+        user = old_apps.get_model("auth", "User").objects.create(username="tester")
+        app = old_apps.get_model("usage", "AppInfo").objects.create(package_name="com.example.app", app_name="app")
+        OldRecord = old_apps.get_model("usage", "UsageRecord")
+        for memo in (None, "메모", ""):
+            OldRecord.objects.create(user=user, app=app, usage_time_ms=60000, start_time=0, end_time=60000, memo=memo)
+        OldRecord.objects.create(user=user, app=app, usage_time_ms=60000, start_time=60000, end_time=120000)
+
+        self.migrate([("usage", "0004_usagerecord_natural_key")])
+
+        rows = list(
+            OldRecord.objects.filter(user_id=user.id).order_by("start_time").values_list("start_time", "memo")
+        )
+        self.assertEqual(rows, [(0, "메모"), (60000, None)])
@@ -6,6 +6,7 @@ from ninja.files import UploadedFile
 from ninja.responses import Response
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
+from django.db import transaction
 from rest_framework_simplejwt.tokens import RefreshToken
 
 from apps.api.schema import (
@@ -16,6 +17,8 @@ from apps.api.schema import (
     NotFoundSchema
 )
 from apps.api.auth import JWTAuth
+from apps.usage.services.intervals import parse_timezone
+from apps.usage.services.local_day import request_timezone_change
 from .schemas import (
     SignupSchema,
     LoginSchema,
@@ -105,7 +108,9 @@ def me(request):
             "data": {
                 "id": request.user.id,
                 "username": request.user.username,
-                "profile_image_url": profile.profile_image.url if profile.profile_image else None
+                "profile_image_url": profile.profile_image.url if profile.profile_image else None,
+                "timezone": profile.timezone,
+                "pending_timezone": profile.pending_timezone or None,
             }
         },
         status=200
@@ -123,6 +128,11 @@ def me(request):
 - 인증된 사용자만 접근할 수 있습니다.
 - `username`과 `password` 중 하나 또는 둘 다 수정할 수 있습니다.
 - `username`은 고유해야 하며, 이미 존재하는 경우 400 오류를 반환합니다.
+- `timezone`은 IANA 시간대 이름(ex. `Asia/Seoul`)이며, 사용 기록의 날짜와 일별 집계를 나누는 기준입니다.
+  - 시간대를 바꾸면 기존 기록의 날짜와 집계도 새 시간대 기준으로 다시 계산됩니다.
+  - 기록이 많으면 바로 바꾸지 않고 `pending_timezone`으로 응답하며, 잠시 후 적용됩니다. 그 전까지는 기존 시간대를 사용합니다.
+  - 아카이브된 달의 기록과 집계는 아카이브할 때의 시간대 기준 날짜를 유지합니다.
+  - 알 수 없는 시간대인 경우 400 오류를 반환합니다.
 - 성공 시 수정된 사용자 정보를 반환합니다.
 - `profile_image_url`은 프로필 이미지 URL을 포함합니다.
 - 프로필 이미지 수정은 별도의 엔드포인트로 처리합니다.
@@ -130,7 +140,6 @@ def me(request):
 )
 def update_user(request, data: UpdateUserSchema):
     user = request.user
-    profile, _ = Profile.objects.get_or_create(user=user)
 
     if data.username:
         if User.objects.exclude(id=user.id).filter(username=data.username).exists():
@@ -140,10 +149,31 @@ def update_user(request, data: UpdateUserSchema):
             )
         user.username = data.username
 
-    if data.password:
-        user.set_password(data.password)
+    tz = None
+    if data.timezone:
+        tz = parse_timezone(data.timezone)
+        if tz is None:
+            return Response(
+                {"message": "알 수 없는 시간대입니다.", "data": None},
+                status=400
+            )
+
+    # 회원 정보, 프로필 시간대, 기록 날짜/집계 재계산을 한 트랜잭션으로 반영합니다.
+    with transaction.atomic():
+        profile, _ = Profile.objects.get_or_create(user=user)
+
+        if data.password:
+            user.set_password(data.password)
+
+        user.save()
 
-    user.save()
+        if tz is not None:
+            if tz.key != profile.timezone:
+                request_timezone_change(user, tz)
+            elif profile.pending_timezone:
+                # 기존 시간대로 되돌린 경우 대기 중인 변경을 취소합니다.
+                Profile.objects.filter(pk=profile.pk).update(pending_timezone="")
+            profile.refresh_from_db(fields=["timezone", "pending_timezone"])
 
     return Response(
         {
@@ -151,7 +181,9 @@ def update_user(request, data: UpdateUserSchema):
             "data": {
                 "id": user.id,
                 "username": user.username,
-                "profile_image_url": profile.profile_image.url if profile.profile_image else None
+                "profile_image_url": profile.profile_image.url if profile.profile_image else None,
+                "timezone": profile.timezone,
+                "pending_timezone": profile.pending_timezone or None,
             }
         },
         status=200
@@ -14,6 +14,8 @@ class UserResponse(BaseModel):
     id: int
     username: str
     profile_image_url: Optional[str] = None
+    timezone: Optional[str] = None
+    pending_timezone: Optional[str] = None
 
 class SignupSchema(BaseModel):
     username: str
@@ -26,6 +28,7 @@ class LoginSchema(BaseModel):
 class UpdateUserSchema(BaseModel):
     username: Optional[str] = Field(None, example="newusername")
     password: Optional[str] = Field(None, example="newpassword")
+    timezone: Optional[str] = Field(None, example="Asia/Seoul")
 
 class SignupResponse(Schema):
     username: str
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-17 14:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='timezone',
+            field=models.CharField(default='Asia/Seoul', max_length=64),
+        ),
+    ]
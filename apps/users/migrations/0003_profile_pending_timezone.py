@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-17 18:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_profile_timezone'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='pending_timezone',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
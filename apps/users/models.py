@@ -1,7 +1,12 @@
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import User
 
 
 class Profile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
-    profile_image = models.ImageField(upload_to='profile_images/', null=True, blank=True)
\ No newline at end of file
+    profile_image = models.ImageField(upload_to='profile_images/', null=True, blank=True)
+    # 사용 기록의 날짜(local_date)와 일별 집계를 나누는 기준 시간대 (IANA 이름, ex. Asia/Seoul)
+    timezone = models.CharField(max_length=64, default=settings.TIME_ZONE)
+    # 기록이 많아 요청 안에서 바로 바꾸지 않고 apply_pending_timezones 명령이 적용할 시간대 (없으면 빈 문자열)
+    pending_timezone = models.CharField(max_length=64, blank=True, default="")
@@ -1,3 +1,79 @@
-from django.test import TestCase
+import datetime
+from unittest import mock
+from zoneinfo import ZoneInfo
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from ninja.testing import TestClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.api.api import api
+from apps.usage.models import DailyAppUsage, UsageRecord
+from apps.usage.services.app_cache import app_resolver
+from apps.usage.services.local_day import apply_pending_timezones
+from apps.users.models import Profile
+
+
+def to_ms(dt: datetime.datetime) -> int:
+    return int(dt.timestamp() * 1000)
+
+
+class TimezoneChangeTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="tester", password="pw")
+        Profile.objects.create(user=cls.user, timezone="Asia/Seoul")
+
+    def setUp(self):
+        # 테스트마다 롤백되는 AppInfo id가 프로세스 캐시에 남지 않도록 비웁니다.
+        app_resolver.clear()
+        self.client = TestClient(api)
+        self.headers = {"Authorization": f"Bearer {RefreshToken.for_user(self.user).access_token}"}
+        # 서울 기준 3월 2일 00:30, UTC 기준 3월 1일 15:30에 시작한 기록
+        start = datetime.datetime(2025, 3, 2, 0, 30, tzinfo=ZoneInfo("Asia/Seoul"))
+        response = self.client.post("/usage/record/batch", json=[{
+            "package_name": "com.example.app",
+            "app_name": "app",
+            "usage_time_ms": 10 * 60 * 1000,
+            "start_time": to_ms(start),
+            "end_time": to_ms(start + datetime.timedelta(minutes=10)),
+        }], headers=self.headers)
+        self.assertEqual(response.status_code, 200, response.content)
+
+    def patch_timezone(self, name: str) -> dict:
+        response = self.client.patch("/users/me", json={"timezone": name}, headers=self.headers)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()["data"]
+
+    def rollup_dates(self) -> list:
+        return list(DailyAppUsage.objects.filter(user=self.user).values_list("date", flat=True))
+
+    def test_small_history_is_rebuilt_in_request(self):
+        data = self.patch_timezone("UTC")
+
+        self.assertEqual((data["timezone"], data["pending_timezone"]), ("UTC", None))
+        self.assertEqual(UsageRecord.objects.get(user=self.user).local_date, datetime.date(2025, 3, 1))
+        self.assertEqual(self.rollup_dates(), [datetime.date(2025, 3, 1)])
+
+    @override_settings(USAGE_TIMEZONE_SYNC_MAX_RECORDS=0)
+    def test_large_history_is_applied_later(self):
+        data = self.patch_timezone("UTC")
+
+        self.assertEqual((data["timezone"], data["pending_timezone"]), ("Asia/Seoul", "UTC"))
+        self.assertEqual(self.rollup_dates(), [datetime.date(2025, 3, 2)])
+
+        self.assertEqual(apply_pending_timezones(), 1)
+
+        profile = Profile.objects.get(user=self.user)
+        self.assertEqual((profile.timezone, profile.pending_timezone), ("UTC", ""))
+        self.assertEqual(self.rollup_dates(), [datetime.date(2025, 3, 1)])
+
+    def test_failed_rebuild_keeps_previous_timezone(self):
+        with mock.patch("apps.usage.services.local_day.rebuild_user_heatmap", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.client.patch("/users/me", json={"username": "renamed", "timezone": "UTC"}, headers=self.headers)
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.username, "tester")
+        self.assertEqual(Profile.objects.get(user=self.user).timezone, "Asia/Seoul")
+        self.assertEqual(UsageRecord.objects.get(user=self.user).local_date, datetime.date(2025, 3, 2))
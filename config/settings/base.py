@@ -161,6 +161,129 @@ REST_FRAMEWORK = {
     ),
 }
 
+# 사용시간 일괄 등록 시 한 번에 받을 수 있는 최대 기록 수
+USAGE_BATCH_MAX_RECORDS = int(os.getenv("USAGE_BATCH_MAX_RECORDS", 1000))
+
+# 메모 일괄 수정 시 한 번에 받을 수 있는 최대 항목 수
+USAGE_MEMO_BATCH_MAX_ITEMS = int(os.getenv("USAGE_MEMO_BATCH_MAX_ITEMS", 500))
+
+# 자정(사용자 시간대 기준)을 넘는 기록을 날짜별 세그먼트로 나누어 저장합니다. (session_id로 연결)
+USAGE_SPLIT_AT_MIDNIGHT = os.getenv("USAGE_SPLIT_AT_MIDNIGHT", "false").lower() == "true"
+
+# 시간대 변경 요청 안에서 날짜/집계를 바로 다시 계산할 최대 기록 수. 넘으면 apply_pending_timezones 명령이 나중에 적용합니다.
+USAGE_TIMEZONE_SYNC_MAX_RECORDS = int(os.getenv("USAGE_TIMEZONE_SYNC_MAX_RECORDS", 20000))
+
+# package_name -> AppInfo 매핑을 프로세스 메모리에 캐시할 최대 개수
+USAGE_APP_CACHE_SIZE = int(os.getenv("USAGE_APP_CACHE_SIZE", 5000))
+
+# write-behind 모드: 사용시간 등록 요청을 큐에 모았다가 백그라운드에서 한 번에 저장합니다.
+USAGE_WRITE_BEHIND = os.getenv("USAGE_WRITE_BEHIND", "false").lower() == "true"
+# enqueue: 큐에 넣은 직후 202로 응답 / flush: DB에 저장된 뒤 record_id와 함께 응답
+USAGE_WRITE_BEHIND_ACK = os.getenv("USAGE_WRITE_BEHIND_ACK", "enqueue")
+USAGE_WRITE_BEHIND_ACK_TIMEOUT = float(os.getenv("USAGE_WRITE_BEHIND_ACK_TIMEOUT", 5.0))
+USAGE_WRITE_BEHIND_BATCH_SIZE = int(os.getenv("USAGE_WRITE_BEHIND_BATCH_SIZE", 500))
+USAGE_WRITE_BEHIND_FLUSH_INTERVAL = float(os.getenv("USAGE_WRITE_BEHIND_FLUSH_INTERVAL", 0.2))
+USAGE_WRITE_BEHIND_MAX_DEPTH = int(os.getenv("USAGE_WRITE_BEHIND_MAX_DEPTH", 10000))
+
+# NDJSON 스트리밍 업로드: 커밋 단위, 응답에 담을 최대 에러 수, 한 줄의 최대 크기
+USAGE_STREAM_CHUNK_SIZE = int(os.getenv("USAGE_STREAM_CHUNK_SIZE", 500))
+USAGE_STREAM_MAX_ERRORS = int(os.getenv("USAGE_STREAM_MAX_ERRORS", 100))
+USAGE_STREAM_MAX_LINE_BYTES = int(os.getenv("USAGE_STREAM_MAX_LINE_BYTES", 4096))
+
+# 전체 사용 기록 목록 조회의 페이지 크기: 기본값과 최대값
+USAGE_LIST_PAGE_SIZE = int(os.getenv("USAGE_LIST_PAGE_SIZE", 100))
+USAGE_LIST_MAX_PAGE_SIZE = int(os.getenv("USAGE_LIST_MAX_PAGE_SIZE", 500))
+# 사용 기록 목록 응답을 DB에서 읽고 JSON으로 써 내려가는 청크 크기(행)
+USAGE_LIST_CHUNK_SIZE = int(os.getenv("USAGE_LIST_CHUNK_SIZE", 2000))
+
+# 메모 검색 결과의 페이지 크기: 기본값과 최대값
+USAGE_MEMO_SEARCH_PAGE_SIZE = int(os.getenv("USAGE_MEMO_SEARCH_PAGE_SIZE", 20))
+USAGE_MEMO_SEARCH_MAX_PAGE_SIZE = int(os.getenv("USAGE_MEMO_SEARCH_MAX_PAGE_SIZE", 100))
+
+# 콜드 아카이브: 사용자 시간대 기준 이 일수보다 오래된 기록을 사용자/월별 gzip NDJSON 파일로 옮깁니다.
+USAGE_ARCHIVE_DIR = os.getenv("USAGE_ARCHIVE_DIR", os.path.join(BASE_DIR, "data", "archive", "usage"))
+USAGE_ARCHIVE_HORIZON_DAYS = int(os.getenv("USAGE_ARCHIVE_HORIZON_DAYS", 180))
+
+# 사용 통계 조회 API의 최대 기간(일)과 top_apps 최대 개수
+USAGE_STATS_MAX_DAYS = int(os.getenv("USAGE_STATS_MAX_DAYS", 366))
+USAGE_STATS_MAX_TOP = int(os.getenv("USAGE_STATS_MAX_TOP", 50))
+
+# 요일 x 시간대 히트맵 조회 기간(일): 기본값과 최대값
+USAGE_HEATMAP_DEFAULT_DAYS = int(os.getenv("USAGE_HEATMAP_DEFAULT_DAYS", 90))
+USAGE_HEATMAP_MAX_DAYS = int(os.getenv("USAGE_HEATMAP_MAX_DAYS", 366))
+
+# AI 요약 비동기 생성: 요약이 없으면 작업을 등록하고 202로 응답합니다. (run_summary_worker 실행 필요)
+SUMMARY_ASYNC = os.getenv("SUMMARY_ASYNC", "false").lower() == "true"
+# 요약 작업 워커의 동시 처리 수와 작업 조회 간격(초)
+SUMMARY_WORKER_THREADS = int(os.getenv("SUMMARY_WORKER_THREADS", 4))
+SUMMARY_WORKER_POLL_INTERVAL = float(os.getenv("SUMMARY_WORKER_POLL_INTERVAL", 1.0))
+# 실패한 작업의 최대 시도 횟수와 재시도 대기 시간(초, 시도마다 2배, 최대값까지)
+SUMMARY_JOB_MAX_ATTEMPTS = int(os.getenv("SUMMARY_JOB_MAX_ATTEMPTS", 5))
+SUMMARY_JOB_BACKOFF_SECONDS = float(os.getenv("SUMMARY_JOB_BACKOFF_SECONDS", 30))
+SUMMARY_JOB_MAX_BACKOFF_SECONDS = float(os.getenv("SUMMARY_JOB_MAX_BACKOFF_SECONDS", 3600))
+# 이 시간(초)이 지나도 끝나지 않은 running 작업은 워커가 중단된 것으로 보고 다시 대기열에 넣습니다.
+SUMMARY_JOB_LEASE_SECONDS = float(os.getenv("SUMMARY_JOB_LEASE_SECONDS", 300))
+# 같은 (사용자, 날짜) 요약을 다른 요청이 생성 중일 때 결과를 기다리는 최대 시간(초)
+SUMMARY_SINGLE_FLIGHT_TIMEOUT = float(os.getenv("SUMMARY_SINGLE_FLIGHT_TIMEOUT", 30))
+
+# 요약 미리 생성(pregenerate_summaries): 동시 생성 수, Gemini 분당 요청 수 제한(0이면 제한 없음), 체크포인트 위치
+SUMMARY_PREGENERATE_THREADS = int(os.getenv("SUMMARY_PREGENERATE_THREADS", 4))
+SUMMARY_GEMINI_RPM = float(os.getenv("SUMMARY_GEMINI_RPM", 60))
+SUMMARY_PREGENERATE_CHECKPOINT_DIR = os.getenv(
+    "SUMMARY_PREGENERATE_CHECKPOINT_DIR", os.path.join(BASE_DIR, "data", "summary_pregenerate")
+)
+
+# 요약 프롬프트의 사용 기록 부분 토큰 예산(어림값, 0이면 제한 없음): 넘으면 사용 시간이 짧은 앱부터 "그 외 앱"으로 합칩니다.
+SUMMARY_PROMPT_TOKEN_BUDGET = int(os.getenv("SUMMARY_PROMPT_TOKEN_BUDGET", 1000))
+# 요약 프롬프트에 넣을 앱별 최대 메모 수
+SUMMARY_PROMPT_MAX_MEMOS = int(os.getenv("SUMMARY_PROMPT_MAX_MEMOS", 5))
+
+# 요약 생성에 쓸 LLM 백엔드 클래스 (apps.summary.services.llm_backends.LLMBackend 하위 클래스)
+# 네트워크 없이 요약 API, 워커, 미리 생성, 캐시를 벤치마크하려면 FakeBackend로 바꿉니다.
+SUMMARY_LLM_BACKEND = os.getenv("SUMMARY_LLM_BACKEND", "apps.summary.services.llm_backends.GeminiBackend")
+# FakeBackend: 응답 지연(초), 오류 비율(0~1), 입력 토큰 수(0이면 프롬프트 길이로 어림), 출력 토큰 수
+SUMMARY_FAKE_LLM_LATENCY = float(os.getenv("SUMMARY_FAKE_LLM_LATENCY", 1.0))
+SUMMARY_FAKE_LLM_ERROR_RATE = float(os.getenv("SUMMARY_FAKE_LLM_ERROR_RATE", 0))
+SUMMARY_FAKE_LLM_INPUT_TOKENS = int(os.getenv("SUMMARY_FAKE_LLM_INPUT_TOKENS", 0))
+SUMMARY_FAKE_LLM_OUTPUT_TOKENS = int(os.getenv("SUMMARY_FAKE_LLM_OUTPUT_TOKENS", 80))
+
+# LLM 호출 보호: 시도별 제한 시간(초), 최대 시도 수, 재시도 간격(초, 지수 증가 상한 안에서 무작위)
+SUMMARY_LLM_TIMEOUT = float(os.getenv("SUMMARY_LLM_TIMEOUT", 20))
+SUMMARY_LLM_MAX_ATTEMPTS = int(os.getenv("SUMMARY_LLM_MAX_ATTEMPTS", 3))
+SUMMARY_LLM_RETRY_BASE_DELAY = float(os.getenv("SUMMARY_LLM_RETRY_BASE_DELAY", 0.5))
+SUMMARY_LLM_RETRY_MAX_DELAY = float(os.getenv("SUMMARY_LLM_RETRY_MAX_DELAY", 4))
+# 재시도 예산: 호출마다 RATIO개씩 최대 MAX개까지 쌓이고 재시도마다 1개를 씁니다. (재시도를 호출 수의 일정 비율로 제한)
+SUMMARY_LLM_RETRY_BUDGET_RATIO = float(os.getenv("SUMMARY_LLM_RETRY_BUDGET_RATIO", 0.2))
+SUMMARY_LLM_RETRY_BUDGET_MAX = float(os.getenv("SUMMARY_LLM_RETRY_BUDGET_MAX", 10))
+# 회로 차단기: 연속 실패 횟수(0이면 사용 안 함)와 열린 뒤 다시 시험 호출할 때까지의 시간(초)
+SUMMARY_LLM_BREAKER_FAILURES = int(os.getenv("SUMMARY_LLM_BREAKER_FAILURES", 5))
+SUMMARY_LLM_BREAKER_RESET_SECONDS = float(os.getenv("SUMMARY_LLM_BREAKER_RESET_SECONDS", 30))
+
+# Gemini API 주소(비워 두면 기본 주소), 비동기 호출의 최대 동시 연결 수와 이를 나눠 가질 클라이언트 수
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL", "")
+GEMINI_MAX_CONNECTIONS = int(os.getenv("GEMINI_MAX_CONNECTIONS", 512))
+GEMINI_ASYNC_CLIENTS = int(os.getenv("GEMINI_ASYNC_CLIENTS", 8))
+
+# Gemini 요약 응답 캐시 (모델, 프롬프트 버전, 사용 기록 텍스트의 해시 기준): 유효 시간(초)과 최대 항목 수
+# 워커와 웹 프로세스가 캐시를 함께 쓰려면 SUMMARY_CACHE_BACKEND를 파일/DB/Redis 캐시로 바꿉니다.
+SUMMARY_CACHE_BACKEND = os.getenv("SUMMARY_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache")
+SUMMARY_CACHE_LOCATION = os.getenv("SUMMARY_CACHE_LOCATION", "summary")
+SUMMARY_CACHE_TIMEOUT = int(os.getenv("SUMMARY_CACHE_TIMEOUT", 7 * 24 * 60 * 60))
+SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", 10000))
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "summary": {
+        "BACKEND": SUMMARY_CACHE_BACKEND,
+        "LOCATION": SUMMARY_CACHE_LOCATION,
+        "TIMEOUT": SUMMARY_CACHE_TIMEOUT,
+        # 최대 항목 수를 넘으면 오래 쓰지 않은 항목부터 1/3씩 지웁니다.
+        "OPTIONS": {"MAX_ENTRIES": SUMMARY_CACHE_MAX_ENTRIES},
+    },
+}
+
 
 LOGGING = {  
     'version': 1,
@@ -173,6 +296,12 @@ LOGGING = {
     'root': {
         'handlers': ['logfire'],
     },
+    'loggers': {
+        # 요약 프롬프트 압축 전후 토큰 수 기록
+        'apps.summary.services.prompt_compaction': {
+            'level': 'INFO',
+        },
+    },
 }
 
 # Add the following lines at the end of the file